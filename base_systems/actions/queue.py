@@ -3,6 +3,7 @@ from evennia.utils.utils import class_from_module, make_iter
 
 from utils.general import get_classpath
 from utils.handlers import HandlerBase
+from utils.startup import mark_startup
 from utils.timing import delay
 
 class ActionQueue(HandlerBase):
@@ -47,6 +48,11 @@ class ActionQueue(HandlerBase):
 			new_list.append( (cpath, data, args) )
 		self._data = new_list
 		super()._save()
+		self.check_startup()
+
+	def check_startup(self):
+		"""queued actions resume when the server starts"""
+		mark_startup(self.obj, "actions", bool(self._data))
 
 	def override(self, action, *args, **kwargs):
 		"""Adds a new action as a "priority" action, cancelling whatever is currently being done"""
@@ -37,9 +37,11 @@ class SitAction(Action):
 			else:
 				self.actor.emote(f"sits {direction}.", action_type="move")
 
+		self.actor.life.settle()
 		if direction == "up":
 			self.actor.tags.remove("lying down", category="status")
 		self.actor.tags.add("sitting", category="status")
+		self.actor.life.schedule()
 		super().do(*args, **kwargs)
 
 
@@ -71,9 +73,11 @@ class LieDownAction(Action):
 			else:
 				self.actor.emote("lies down.", action_type="move")
 
+		self.actor.life.settle()
 		if "sitting" in statuses:
 			self.actor.tags.remove("sitting", category="status")
 		self.actor.tags.add("lying down", category="status")
+		self.actor.life.schedule()
 
 		super().do(*args, **kwargs)
 
@@ -102,10 +106,12 @@ class StandUpAction(Action):
 		nonstanding = [ "sitting", "lying down" ]
 		standing = True
 
+		self.actor.life.settle()
 		for pose in nonstanding:
 			if pose in statuses:
 				self.actor.tags.remove(pose, category="status")
 				standing = False
+		self.actor.life.schedule()
 
 		# if there's a target
 		if self.target:
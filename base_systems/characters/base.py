@@ -166,7 +166,9 @@ class Character(BaseObject):
 
 	@property
 	def life(self):
-#		self.archetype
+		if not hasattr(self, '_life'):
+			# archetypes can replace the life handler, so they load first
+			self.archetype
 		if not hasattr(self, '_life'):
 			self._life = LifeHandler(self)
 		return self._life
@@ -363,7 +365,9 @@ class Character(BaseObject):
 	def at_server_start(self):
 		super().at_server_start()
 #		self.archetype = load_archetype(self, self.archetype_key)
-		self.actions
+		self.actions.check_startup()
+		self.life.settle(quiet=True)
+		self.life.schedule()
 
 	def at_look(self, target, **kwargs):
 		# if self.location and not self.location.nattributes.get("lit", True):
@@ -1,34 +1,83 @@
+import time
+from evennia.utils import delay
+
 from utils.handlers import HandlerBase
+from utils.startup import mark_startup
 
 
 _MAX_ENERGY = 100
 _EXHAUSTION = 10
+# seconds per recovery step
+_RECOVERY_STEP = 10
+
+def _posture_bonus(obj):
+	"""the extra energy regained per step for the object's current posture"""
+	statuses = obj.tags.get(category="status", return_list=True)
+	# if lying down, get a bonus +2
+	if "lying down" in statuses:
+		return 2
+	# otherwise, if sitting, get a bonus +1
+	if "sitting" in statuses:
+		return 1
+	return 0
+
+def _recover(energy, hunger, bonus, steps):
+	"""
+	Applies up to `steps` recovery steps.
 
-_RESTING_EFFECT = "base_systems.effects.effects.RestingEffect"
+	Returns:
+		(energy, hunger, steps) - the new values and the number of steps that regained anything
+	"""
+	taken = 0
+	while taken < steps and energy < _MAX_ENERGY:
+		regain = bonus
+		# use hunger if below threshold
+		if energy < _MAX_ENERGY-hunger:
+			hunger += 1
+			regain += 1
+		if not regain:
+			# nothing will change until the posture does
+			break
+		energy = min(energy + regain, _MAX_ENERGY)
+		taken += 1
+	return energy, hunger, taken
 
 class LifeHandler(HandlerBase):
-	"""manage energy and hunger calculations"""
+	"""
+	manage energy and hunger calculations
+
+	Recovery is derived from the time since the values were last settled and the
+	current posture, so callers changing posture should settle first.
+	"""
+	write_behind = True
+
 	def __init__(self, obj, **kwargs):
+		self._task = None
+		self._due = None
 		super().__init__(obj, "life", "systems", default_data={"hunger":0,"energy":_MAX_ENERGY})
 
 	@property
 	def status(self):
 		"""return a dict of the current life-data"""
-		return dict(self._data)
+		self.settle()
+		return { "energy": self._data['energy'], "hunger": self._data['hunger'] }
 
 	@property
 	def energy(self):
+		self.settle()
 		return self._data.get('energy')
-	
+
 	@energy.setter
 	def energy(self, value):
 		# this is kind of a hacky way to verify it's numeric but it's fine
 		value += 0
+		self.settle()
 		energy = max(0,min(value, _MAX_ENERGY))
+		if energy < _MAX_ENERGY and self._data['energy'] >= _MAX_ENERGY:
+			# recovery starts now
+			self._data['stamp'] = time.time()
 		self._data['energy'] = energy
 		self._save()
-		if self._data['energy'] < _MAX_ENERGY and not self.obj.effects.has(_RESTING_EFFECT):
-			self.obj.effects.add(_RESTING_EFFECT)
 
 		if energy < _EXHAUSTION and not self.obj.tags.has("unconscious", category="status"):
 			# time to collapse
@@ -39,25 +88,29 @@ class LifeHandler(HandlerBase):
 			self.obj.tags.add("unconscious", category="status")
 			self.obj.tags.add("lying down", category="status")
 			self.prompt() # NOTE: may not want this here
+		self.schedule()
 
 
 	@property
 	def hunger(self):
+		self.settle()
 		return self._data.get('hunger')
 
 	@hunger.setter
 	def hunger(self, value):
 		# this is kind of a hacky way to verify it's numeric but it's fine
 		value += 0
+		self.settle()
 		if hgr := self._data.get('hunger'):
 			self._data['hunger'] = max(0,min(value, _MAX_ENERGY))
 		else:
 			self._data['hunger'] = value
 		self._save()
+		self.schedule()
 
-	def recover(self, quiet=False):
+	def settle(self, quiet=False):
 		"""
-		recover energy
+		Applies the recovery accrued since the last settle, sending any threshold messages.
 
 		returns True if fully rested, False otherwise
 		"""
@@ -65,39 +118,70 @@ class LifeHandler(HandlerBase):
 		energy = self._data['energy']
 		hunger = self._data['hunger']
 		message = ""
-		prompt = False
 		if energy < _MAX_ENERGY:
-			diff = _MAX_ENERGY - energy
-			regain = 0
-			# if lying down, get a bonus +2
-			if obj.tags.has("lying down", category="status"):
-				regain += 2
-				prompt = True
-			# otherwise, if sitting, get a bonus +1
-			elif obj.tags.has("sitting", category="status"):
-				regain += 1
-				prompt = True
-			# use hunger if below threshold
-			if energy < _MAX_ENERGY-hunger:
-				hunger += 1
-				regain += 1
-				prompt = True
-			energy += min(diff, regain)
-			self._data = { "energy": energy, "hunger": hunger }
-			self._save()
-			if energy >= _MAX_ENERGY:
-				message = "You feel fully rested."
-		if obj.tags.has("unconscious", category="status") and energy > _EXHAUSTION:
+			now = time.time()
+			stamp = self._data.get('stamp') or now
+			steps = int((now - stamp) // _RECOVERY_STEP)
+			if steps > 0:
+				energy, hunger, _ = _recover(energy, hunger, _posture_bonus(obj), steps)
+				self._data.update({ "energy": energy, "hunger": hunger, "stamp": stamp + steps * _RECOVERY_STEP })
+				self._save()
+				if energy >= _MAX_ENERGY:
+					message = "You feel fully rested."
+			elif 'stamp' not in self._data:
+				self._data['stamp'] = stamp
+				self._save()
+		if energy > _EXHAUSTION and obj.tags.has("unconscious", category="status"):
 			message = "You regain consciousness."
 			obj.tags.remove("unconscious", category="status")
-			prompt = True
-
-		# TODO: only send prompt if the words change
-		if not quiet:
-			if message:
-				obj.msg( (message, {"type": "status"}) )
-			if prompt:
-				obj.prompt()
-		
-		return self.energy == _MAX_ENERGY
-		
+
+		if message and not quiet:
+			obj.msg( (message, {"type": "status"}) )
+			obj.prompt()
+
+		return energy >= _MAX_ENERGY
+
+	def recover(self, quiet=False):
+		"""kept for compatibility; see `settle`"""
+		return self.settle(quiet=quiet)
+
+	def schedule(self):
+		"""
+		Schedules a single wake-up for when the next threshold message is due,
+		replacing any wake-up that no longer matches.
+		"""
+		energy = self._data['energy']
+		due = None
+		if energy < _MAX_ENERGY:
+			unconscious = self.obj.tags.has("unconscious", category="status")
+			bonus = _posture_bonus(self.obj)
+			hunger = self._data['hunger']
+			# the threshold is regaining consciousness, or being fully rested
+			steps = 0
+			while energy < _MAX_ENERGY and not (unconscious and energy > _EXHAUSTION):
+				energy, hunger, taken = _recover(energy, hunger, bonus, 1)
+				if not taken:
+					# stalled, so there's nothing to wake up for
+					steps = None
+					break
+				steps += 1
+			if steps:
+				due = self._data.get('stamp', time.time()) + steps * _RECOVERY_STEP
+		# the wake-up doesn't survive a restart, so it's rescheduled at startup
+		mark_startup(self.obj, "life", due is not None)
+
+		if due == self._due and (self._task or due is None):
+			return
+		if self._task:
+			self._task.cancel()
+			self._task = None
+		self._due = due
+		if due is not None:
+			self._task = delay(max(due - time.time(), 0), self._wake)
+
+	def _wake(self):
+		self._task = None
+		self._due = None
+		self.settle()
+		self.schedule()
+
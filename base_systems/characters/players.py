@@ -75,6 +75,7 @@ class PlayerCharacter(Character):
 		else:
 			# first check if we have a recog for this object
 			recog = self.recog.get(obj)
+			sdesc = recog
 			# set sdesc to recog, using sdesc as a fallback, or the object's key if no sdesc
 			if not recog:
 				if hasattr(obj, "sdesc"):
@@ -263,7 +264,16 @@ class PlayerCharacter(Character):
 		Add an extra message if there is a card here.
 		"""
 		super().emote(*args, **kwargs)
+		self._show_xcards(**kwargs)
 
+	def emote_many(self, *args, **kwargs):
+		"""
+		Add an extra message if there is a card here, once for the whole batch.
+		"""
+		super().emote_many(*args, **kwargs)
+		self._show_xcards(**kwargs)
+
+	def _show_xcards(self, **kwargs):
 		if kwargs.get('action_type') != 'ooc':
 			# not sure that's the right check but it's fine
 			if self.location:
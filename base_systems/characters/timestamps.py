@@ -20,6 +20,7 @@ class TimestampHandler(HandlerBase):
 	- It will be passed exactly	one argument of the timestamp difference since last called.
 	- It will return a boolean representing whether the timestamp should be updated.
 	"""
+	write_behind = True
 
 	def __init__(self, obj):
 		super().__init__(obj, "timestamps")
@@ -1,5 +1,9 @@
 import time
-from evennia.utils import logger, delay
+from evennia.objects.models import ObjectDB
+from evennia.utils import logger, make_iter
+
+from base_systems.effects.timers import EFFECT_TIMERS
+from utils.handlers import HANDLER_WRITES
 
 
 class Effect:
@@ -31,7 +35,7 @@ class Effect:
 		if self.duration:
 			# this is a ticking effect, resume
 			for source in self.sources.keys():
-				delay(1, self.tick, source)
+				EFFECT_TIMERS.schedule(1, self.tick, source)
 
 		# this allows us to save changes
 		self.handler = handler
@@ -82,11 +86,12 @@ class Effect:
 			# schedule next tick
 			if self.duration:
 				self.last_tick = now
-				delay(self.duration, self.tick, source)
-				self.save()
+				EFFECT_TIMERS.schedule(self.duration, self.tick, source)
+				# everything that ticks this turn gets written out together
+				EFFECT_TIMERS.defer_save(self.handler)
 		else:
 			# it's too soon, schedule for when it should be
-			delay(self.duration-since_last, self.tick, source)
+			EFFECT_TIMERS.schedule(self.duration-since_last, self.tick, source)
 
 	# you can override these methods!
 	def at_remove(self, *args, **kwargs):
@@ -170,27 +175,84 @@ class StatBuffEffect(Effect):
 
 
 class AreaEffect(Effect):
+	"""
+	Pulses an effect onto everything inside the owner, including nested contents,
+	unless a container blocks it.
+
+	Each target's pulse from this area is kept at the area's stack count, so pulsing
+	things that are already affected changes nothing and writes nothing.
+	"""
 	pulse = None # the effect to apply
 	duration = 5
 	block = None
 
+	def _blocked(self, objects):
+		"""
+		Returns the pks of the objects whose contents the pulse can't reach, from one tag query.
+		"""
+		if not self.block or not objects:
+			return set()
+		if type(self.block) is tuple:
+			tagname, tagcat = self.block
+		else:
+			tagname, tagcat = self.block, None
+		tagged = set(ObjectDB.db_tags.through.objects.filter(
+				objectdb_id__in=[obj.pk for obj in objects], tag__db_key__in=[ tag.lower() for tag in make_iter(tagname) ],
+				tag__db_category=tagcat.lower() if tagcat else None, tag__db_tagtype__isnull=True,
+			).values_list("objectdb_id", flat=True))
+		if type(self.block) is tuple:
+			return tagged
+		# a plain tag is the reverse: only things with it pass the pulse on
+		return { obj.pk for obj in objects } - tagged
+
+	def get_targets(self):
+		"""
+		Returns everything the pulse reaches.
+		"""
+		area = self.handler.obj
+		# gather everything nested, so the block check is a single query
+		nested = []
+		seen = { area.pk }
+		todo = [area]
+		while todo:
+			for obj in todo.pop().contents:
+				if obj.pk not in seen:
+					seen.add(obj.pk)
+					nested.append(obj)
+					todo.append(obj)
+		blocked = self._blocked([ obj for obj in nested if obj.contents ])
+
+		targets = []
+		todo = [area]
+		seen = { area.pk }
+		while todo:
+			for obj in todo.pop().contents:
+				if obj.pk in seen:
+					continue
+				seen.add(obj.pk)
+				targets.append(obj)
+				if obj.pk not in blocked:
+					todo.append(obj)
+		return targets
+
 	def at_tick(self, source, *args, **kwargs):
 		super().at_tick(source, *args, **kwargs)
-
-		def do_pulse(target):
-			for obj in target.contents:
-				obj.effects.add(self.pulse, source=self.handler.obj)
-				if self.block:
-					if type(self.block) is tuple:
-						tagname, tagcat = self.block
-						if obj.tags.has(tagname, category=tagcat):
-							continue
-					elif not obj.tags.has(self.block):
-						continue
-				do_pulse(obj)
-
-		if self.pulse:
-			do_pulse(self.handler.obj)
-
-
-
+		if not self.pulse:
+			return
+		area = self.handler.obj
+		stacks = self.stacks
+		changed = []
+		for obj in self.get_targets():
+			handler = obj.effects
+			if (current := handler.get(self.pulse)) and current.sources.get(area, 0) >= stacks:
+				# already fully affected by this area
+				continue
+			handler.batched = True
+			try:
+				have = current.sources.get(area, 0) if current else 0
+				handler.add(self.pulse, source=area, stacks=stacks-have)
+			finally:
+				handler.batched = False
+			changed.append(handler)
+		if changed:
+			HANDLER_WRITES.write_many(changed)
@@ -3,6 +3,10 @@ from random import choice, randrange
 from base_systems.effects.base import Effect
 
 class RestingEffect(Effect):
+	"""
+	Obsolete: energy now recovers lazily in the life handler. This is only kept so
+	previously-saved effects can load, settle and remove themselves.
+	"""
 	name = 'resting'
 	duration = 10
 
@@ -12,8 +16,9 @@ class RestingEffect(Effect):
 		"""
 		super().at_tick(*args, **kwargs)
 		obj = self.handler.obj
-		if obj.life.recover():
-			self.remove(stacks="all")
+		obj.life.settle()
+		obj.life.schedule()
+		self.remove(stacks="all")
 
 
 class ImmobileEffect(Effect):
@@ -187,7 +192,9 @@ class FallingEffect(Effect):
 		if self.stacks <= self.ticks:
 			# time to hit the floor
 			obj.emote("hits the ground!")
+			obj.life.settle()
 			obj.tags.add('lying down', category='status')
+			obj.life.schedule()
 			self.remove(stacks="all")
 		elif self.ticks:
 			obj.emote(f"continues falling")
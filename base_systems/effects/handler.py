@@ -2,11 +2,16 @@ from evennia.utils.utils import class_from_module, make_iter
 
 from utils.general import get_classpath
 from utils.handlers import HandlerBase
+from utils.startup import mark_startup
+from core.ic.appearance import touch_appearance
 
 _EFFECT_ATTR = "effects"
 _EFFECT_CAT = "systems"
 
 class EffectsHandler(HandlerBase):
+	# set while a batch is applying effects; the batch writes the data out itself
+	batched = False
+
 	def __init__(self, obj):
 		"""
 		Initialize the handler.
@@ -44,7 +49,15 @@ class EffectsHandler(HandlerBase):
 				data.pop('handler',None)
 				new_list.append( (cpath, data) )
 			self._data = new_list
-		super()._save()
+		if not self.batched:
+			super()._save()
+		else:
+			touch_appearance(self.obj)
+		self.check_startup()
+
+	def check_startup(self):
+		"""ticking effects need to be loaded when the server starts"""
+		mark_startup(self.obj, "effects", any(effect.duration for effect in self.effects))
 
 	def _find_effect(self, effect, name):
 		effect_obj = None
@@ -0,0 +1,74 @@
+import math
+import time
+from collections import defaultdict
+from evennia.utils import logger, delay
+
+
+class TimerWheel:
+	"""
+	A shared one-second scheduler for effect ticks.
+
+	Timers are bucketed by the second they're due in, and a single delayed
+	task turns the wheel once a second while any are pending. Handlers passed
+	to `defer_save` are saved once at the end of the turn, no matter how many
+	of their effects ticked in it.
+	"""
+
+	def __init__(self):
+		self._buckets = defaultdict(list)
+		self._deferred = {}
+		self._task = None
+
+	def __len__(self):
+		return sum(len(bucket) for bucket in self._buckets.values())
+
+	def counts(self):
+		"""
+		Returns:
+			dict: the number of pending timers and of the distinct seconds they're due in
+		"""
+		return { "timers": len(self), "buckets": len(self._buckets) }
+
+	def schedule(self, seconds, callback, *args, **kwargs):
+		"""
+		Call `callback(*args, **kwargs)` on the first turn at least `seconds` from now.
+		"""
+		due = math.ceil(time.time() + seconds)
+		self._buckets[due].append( (callback, args, kwargs) )
+		if not self._task:
+			self._task = delay(1, self.turn)
+
+	def defer_save(self, handler):
+		"""
+		Save handler at the end of the current turn.
+		"""
+		self._deferred[handler] = None
+
+	def turn(self):
+		"""
+		Runs everything that's due, then flushes deferred saves.
+		"""
+		self._task = None
+		now = time.time()
+		for due in sorted(key for key in self._buckets if key <= now):
+			for callback, args, kwargs in self._buckets.pop(due):
+				try:
+					callback(*args, **kwargs)
+				except Exception:
+					logger.log_trace()
+		self.flush()
+		if self._buckets and not self._task:
+			self._task = delay(1, self.turn)
+
+	def flush(self):
+		"""
+		Saves every handler deferred since the last flush.
+		"""
+		deferred, self._deferred = self._deferred, {}
+		for handler in deferred:
+			try:
+				handler.save()
+			except Exception:
+				logger.log_trace()
+
+EFFECT_TIMERS = TimerWheel()
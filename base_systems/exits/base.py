@@ -102,9 +102,7 @@ class ExitAction(Action):
 		if not kwargs.get("quiet"):
 			announce_leave = [obj for obj in source_location.contents if obj != self.actor]
 			announce_arrive = [obj for obj in target_location.contents if obj != self.actor]
-			# TODO: set a linked exit attribute and check that first
 			dest_exit = self.exit_obj.get_return_exit()
-			# dest_exit = dest_exit[0] if len(dest_exit) else None
 			if leave_msg := self.exit_obj.db.leave_traverse:
 				disappear_msg = leave_msg
 			else:
@@ -128,31 +126,22 @@ class ExitAction(Action):
 			arrive_msg = arrive_msg.format(verbs=f"$conj({verb})" or "arrives", exit=in_name)
 			appear_msg = appear_msg.format(verbs=f"$conj({verb})" or "arrives", exit=in_name)
 
+			# the rooms which lose or gain sight of us, cached per edge
+			disappear, appear = pathing.edge_audience(source_location, target_location, self.actor)
+			disappear_to = [ obj for room in disappear for obj in room.contents ]
+			appear_to = [ obj for room in appear for obj in room.contents ]
+
 			# this is a hacky fix for the "gruff voice walks east" problem
 			self.actor.nattributes.add("prev_location", self.exit_obj.location)
-			self.actor.emote(leave_msg, receivers=announce_leave, action_type="move")
-			self.actor.emote(arrive_msg, receivers=announce_arrive, action_type="move")
-
-			# i'm not sure this will work...
-			old_area = set()
-			for _, rooms in pathing.visible_area(source_location, self.actor, source_location.db.visibility or 1).items():
-				old_area.update([r for r, _ in rooms])
-			new_area = set()
-			for _, rooms in pathing.visible_area(target_location, self.actor, target_location.db.visibility or 1).items():
-				new_area.update([r for r, _ in rooms])
-			ignore = set([source_location, target_location])
-			disappear = (old_area - new_area) - ignore
-			appear = (new_area - old_area) - ignore
-			receivers = []
-			for room in disappear:
-				receivers.extend(room.contents)
-			if receivers:
-				self.actor.emote(disappear_msg, receivers=receivers, action_type="move")
-			receivers = []
-			for room in appear:
-				receivers.extend(room.contents)
-			if receivers:
-				self.actor.emote(appear_msg, receivers=receivers, action_type="move")
+			self.actor.emote_many(
+					(
+						(leave_msg, announce_leave),
+						(arrive_msg, announce_arrive),
+						(disappear_msg, disappear_to),
+						(appear_msg, appear_to),
+					),
+					action_type="move"
+				)
 
 			# and end uncertainty
 
@@ -238,6 +227,31 @@ class Exit(BaseObject):
 	@direction.setter
 	def direction(self, value):
 		self.db.direction = self.ndb._direction = value
+		pathing.update_exit(self)
+
+	# keep WorldGraph in step with relinking
+	def _set_location(self, value):
+		ObjectDB.location.fset(self, value)
+		pathing.update_exit(self)
+
+	location = property(ObjectDB.location.fget, _set_location, ObjectDB.location.fdel)
+
+	def _set_destination(self, value):
+		ObjectDB.destination.fset(self, value)
+		pathing.update_exit(self)
+
+	destination = property(ObjectDB.destination.fget, _set_destination, ObjectDB.destination.fdel)
+
+	def at_first_save(self):
+		super().at_first_save()
+		pathing.update_exit(self)
+
+	def delete(self, *args, **kwargs):
+		pk = self.pk
+		if not super().delete(*args, **kwargs):
+			return False
+		pathing.remove_exit(pk)
+		return True
 
 	def at_object_creation(self):
 		super().at_object_creation()
@@ -453,6 +467,10 @@ class Exit(BaseObject):
 		Returns:
 			queryset or exit (Exit): The matching exit(s).
 		"""
+		if not return_all and self.location and self.destination:
+			# the reverse edge in the graph already holds it
+			if ex := pathing.get_exit_for_path(self.destination.id, self.location.id):
+				return ex
 		query = ObjectDB.objects.filter(db_location=self.destination, db_destination=self.location)
 		if return_all:
 			return query
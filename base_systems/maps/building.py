@@ -1,11 +1,134 @@
+import ast
+import json
 from collections import defaultdict
+from django.db import connections, router, transaction
 from evennia.objects.models import ObjectDB
 from evennia.scripts.models import ScriptDB
+from evennia.typeclasses.attributes import Attribute
 from evennia.typeclasses.tags import Tag
 from evennia.utils.search import search_tag, search_script_tag
 from evennia.utils.create import create_object, create_script
+from evennia.utils.dbserialize import to_pickle
 from evennia.utils import logger, is_iter
 
+# identifies a build file written by `write_build`
+_BUILD_FORMAT = "zone-build"
+_BUILD_VERSION = 1
+# rows per bulk query
+_BATCH_SIZE = 500
+
+class UIDRegistry:
+	"""
+	Process-wide map of unique IDs to the objects and scripts that hold them,
+	so that resolving a UID doesn't need an attribute join query.
+
+	It's built in one query per model from the `uid` attributes at server start
+	and kept current by the `uid` setters and the build loaders.
+	"""
+
+	def __init__(self):
+		self._uids = defaultdict(dict)
+		self._keys = {}
+		self.loaded = False
+
+	def build(self):
+		"""
+		(Re)builds the registry from the database.
+		"""
+		self._uids.clear()
+		self._keys.clear()
+		for model, field in ((ObjectDB, "objectdb__id"), (ScriptDB, "scriptdb__id")):
+			uids = Attribute.objects.filter(
+					db_key="uid", db_category="systems", **{f"{field}__isnull": False}
+				).values_list(field, "db_value")
+			for pk, uid in uids:
+				self._link((model, pk), uid)
+		self.loaded = True
+
+	def _link(self, key, uid):
+		if (old_uid := self._keys.get(key)) is not None:
+			self._uids[old_uid].pop(key, None)
+		self._keys[key] = uid
+		self._uids[uid][key] = None
+
+	def set(self, obj, uid):
+		"""
+		Record obj as holding uid. A uid of None removes it.
+		"""
+		if not obj.pk:
+			return
+		if uid:
+			self._link((obj.__dbclass__, obj.pk), uid)
+		else:
+			self.remove(obj)
+
+	def remove(self, obj):
+		"""
+		Forget obj's uid.
+		"""
+		self.discard(obj.__dbclass__, obj.pk)
+
+	def discard(self, model, pk):
+		"""
+		Forget a deleted object by its model and pk.
+		"""
+		if (old_uid := self._keys.pop((model, pk), None)) is not None:
+			self._uids[old_uid].pop((model, pk), None)
+
+	def get_many(self, uids):
+		"""
+		Resolves a collection of uids at once.
+
+		Returns:
+			found (dict): a mapping of uid to the matching object, or None
+
+		Raises:
+			KeyError: If there are somehow multiple objects with the UID
+		"""
+		if not self.loaded:
+			self.build()
+		uids = set(uids)
+		# load anything that isn't already in memory in one query per model
+		missing = defaultdict(list)
+		for uid in uids:
+			for model, pk in self._uids.get(uid, ()):
+				if not model.get_cached_instance(pk):
+					missing[model].append(pk)
+		loaded = {}
+		for model, pks in missing.items():
+			loaded.update( ((model, obj.pk), obj) for obj in model.objects.filter(id__in=pks) )
+
+		found = {}
+		for uid in uids:
+			candidates = []
+			for key in list(self._uids.get(uid, ())):
+				model, pk = key
+				obj = model.get_cached_instance(pk) or loaded.get(key)
+				# drop anything deleted or re-assigned out from under us
+				if not obj or obj.attributes.get("uid", category="systems") != uid:
+					self._uids[uid].pop(key, None)
+					if self._keys.get(key) == uid:
+						del self._keys[key]
+					continue
+				candidates.append(obj)
+			match len(candidates):
+				case 1:
+					found[uid] = candidates[0]
+				case 0:
+					found[uid] = None
+				case _:
+					raise KeyError(f"Too many objects match {uid}! dbrefs for the matches: {' '.join(str(ob.id) for ob in candidates)}")
+		return found
+
+	def get(self, uid):
+		"""
+		Resolves a single uid to its object, or None.
+		"""
+		return self.get_many((uid,))[uid]
+
+UID_REGISTRY = UIDRegistry()
+
+
 def get_obj_family(obj, **kwargs):
 	"""
 	Get the "family" of the object: character, room, exit, or thing
@@ -104,6 +227,7 @@ def update_or_create_object(uid, **kwargs):
 			kwargs['home'] = get_by_id(home)
 
 		obj = create_object(**kwargs)
+		UID_REGISTRY.set(obj, uid)
 		if cmdset:
 			obj.cmdset_storage = cmdset
 	return obj
@@ -137,6 +261,7 @@ def update_or_create_script(uid, **kwargs):
 			kwargs['attributes'].append( ('desc', desc) )
 
 		script = create_script(**kwargs)
+		UID_REGISTRY.set(script, uid)
 	return script
 
 def get_by_id(dbref_or_uid):
@@ -157,62 +282,64 @@ def get_by_uid(uid):
 	Raises:
 		KeyError: If there are somehow multiple objects with the UID 
 	"""
-	candidates = ObjectDB.objects.filter(
-			db_attributes__db_key="uid", db_attributes__db_category="systems", db_attributes__db_value=uid
-		)
-	candidates = list(candidates) + list(ScriptDB.objects.filter(
-			db_attributes__db_key="uid", db_attributes__db_category="systems", db_attributes__db_value=uid
-		))
-	print(candidates)
-	match len(candidates):
-		case 1:
-			return candidates[0]
-		case 0:
-			return None
-		case _:
-			raise KeyError(f"Too many objects match {uid}! dbrefs for the matches: {' '.join(str(ob.id) for ob in candidates)}")
+	return UID_REGISTRY.get(uid)
 
 
-def deref_uids(value):
+def _find_uids(value, uids):
 	"""
-	Replace any UIDs with an object reference.
+	Collect every UID referenced in value into uids.
 	"""
-	# def _unpack_uid(obj):
-	# 	if isinstance(value, str):
-	# 		if value.startswith('uid#'):
-	# 			_, uid = value.split('#', maxsplit=1)
-	# 			return get_by_uid(uid)
-	# 	return obj
-
-	# print(f"dereferencing uids in {value}")
-
 	if isinstance(value, str):
 		if value.startswith('uid#'):
-			_, uid = value.split('#', maxsplit=1)
-			return get_by_uid(uid)
-			print(get_by_uid(uid))
-			return value
-		
+			uids.add(value.split('#', maxsplit=1)[1])
+		return
+
 	if hasattr(value, 'deserialize'):
 		value = value.deserialize()
-	
+
 	if isinstance(value, dict):
-		new_val = {}
 		for key, val in value.items():
-			new_val[deref_uids(key)] = deref_uids(val)
-		return new_val
-		print(new_val)
+			_find_uids(key, uids)
+			_find_uids(val, uids)
+	elif is_iter(value):
+		for val in value:
+			_find_uids(val, uids)
+
+
+def _swap_uids(value, found):
+	"""
+	Replace any UIDs in value with their objects from found.
+	"""
+	if isinstance(value, str):
+		if value.startswith('uid#'):
+			return found[value.split('#', maxsplit=1)[1]]
 		return value
 
+	if hasattr(value, 'deserialize'):
+		value = value.deserialize()
+
+	if isinstance(value, dict):
+		return { _swap_uids(key, found): _swap_uids(val, found) for key, val in value.items() }
+
 	if is_iter(value):
 		cls = type(value)
-		return cls(deref_uids(val) for val in value)
-		print(cls(deref_uids(val) for val in value))
-		return value
+		return cls(_swap_uids(val, found) for val in value)
 
 	return value
 
 
+def deref_uids(value):
+	"""
+	Replace any UIDs with an object reference. All of the UIDs in value
+	are resolved together.
+	"""
+	uids = set()
+	_find_uids(value, uids)
+	if not uids:
+		return value
+	return _swap_uids(value, UID_REGISTRY.get_many(uids))
+
+
 def ref_uids(value):
 	"""
 	Parse an object looking for any UID'd database objects
@@ -294,10 +421,13 @@ def update_object(obj, reset=False, **kwargs):
 		obj.destination = None
 
 	if attrs := kwargs.get('attributes'):
-		attrs = [ (key, deref_uids(val), cat) for key, val, cat in attrs ]
+		attrs = deref_uids([ (key, val, cat) for key, val, cat in attrs ])
 		obj.attributes.batch_add(*attrs) if len(attrs) > 1 else obj.attributes.add(*attrs[0])
 	elif reset:
 		obj.attributes.clear()
+	UID_REGISTRY.set(obj, obj.attributes.get("uid", category="systems"))
+	if hasattr(obj, 'sdesc'):
+		obj.sdesc.reset()
 	
 	if tags := kwargs.get('tags'):
 		obj.tags.batch_add(tags) if len(tags) > 1 else obj.tags.add(*tags[0])
@@ -342,10 +472,11 @@ def update_script(script, reset=False, **kwargs):
 		script.obj = obj
 	
 	if attrs := kwargs.get('attributes'):
-		attrs = [ (key, deref_uids(val), cat) for key, val, cat in attrs ]
+		attrs = deref_uids([ (key, val, cat) for key, val, cat in attrs ])
 		script.attributes.batch_add(*attrs) if len(attrs) > 1 else script.attributes.add(*attrs[0])
 	elif reset:
 		script.attributes.clear()
+	UID_REGISTRY.set(script, script.attributes.get("uid", category="systems"))
 	
 	if tags := kwargs.get('tags'):
 		script.tags.batch_add(tags) if len(tags) > 1 else script.tags.add(*tags[0])
@@ -355,55 +486,329 @@ def update_script(script, reset=False, **kwargs):
 	return script
 
 
-def write_object_creation(obj, file):
-	"""
-	Renders the object in the context of calling `update_or_create_object`
-	"""
-	data = {}
-	uid = obj.uid
-	data['typeclass'] = obj.typeclass_path
-	data['name'] = obj.name
-	data['desc'] = obj.db.desc
-	data['home'] = obj.home.uid
-	if obj.location:
-		data['location'] = obj.location.uid
-	if obj.destination:
-		data['destination'] = obj.destination.uid
-	if attrs := obj.attributes.all():
-		data['attributes'] = [ (attr.key, ref_uids(attr.value), attr.category) for attr in attrs ]
-	if nattrs := obj.nattributes.all():
-		data['nattributes'] = { nattr.key: ref_uids(nattr.value) for nattr in nattrs }
-	if aliases := obj.aliases.all():
-		data['aliases'] = aliases
-	if tags := obj.tags.all(return_key_and_category=True):
-		data['tags'] = tags
-	data['locks'] = str(obj.locks)
-	if cmdset := obj.cmdset_storage:
-		data['cmdset'] = cmdset
-
-	file.write(f"data = {data}\n")
-	file.write(f"obj = update_or_create_object('{uid}', **data)\n")
-
-
-def write_script_creation(script, file):
-	"""
-	Renders the object in the context of calling `update_or_create_script`
-	"""
-	data = {}
-	uid = script.uid
-	data['typeclass'] = script.typeclass_path
-	data['name'] = script.name
-	data['desc'] = script.db.desc
-	data['obj'] = ref_uids(script.obj)
-	data['interval'] = script.interval
-	data['repeats'] = script.repeats
-	data['persistent'] = script.persistent
-	data['start_delay'] = script.start_delay
-	if attrs := script.attributes.all():
-		data['attributes'] = [ (attr.key, ref_uids(attr.value), attr.category) for attr in attrs ]
-	if tags := script.tags.all(return_key_and_category=True):
-		data['tags'] = tags
-	data['locks'] = str(script.locks)
-
-	file.write(f"data = {data}\n")
-	file.write(f"obj = update_or_create_script('{uid}', **data)\n")
\ No newline at end of file
+def _object_record(obj):
+	"""
+	Renders an object as a build record for `write_build`.
+	"""
+	return {
+		"kind": "object",
+		"uid": obj.uid,
+		"typeclass": obj.typeclass_path,
+		"key": obj.key,
+		"home": obj.home.uid if obj.home else None,
+		"location": obj.location.uid if obj.location else None,
+		"destination": obj.destination.uid if obj.destination else None,
+		# values are stored as python literals, since they can hold tuples and sets
+		"attributes": [ (attr.key, attr.category, repr(ref_uids(attr.value))) for attr in obj.attributes.all() ],
+		"tags": obj.tags.all(return_key_and_category=True),
+		"aliases": obj.aliases.all(),
+		"locks": str(obj.locks),
+		"cmdset": obj.db_cmdset_storage,
+	}
+
+
+def _script_record(script):
+	"""
+	Renders a script as a build record for `write_build`.
+	"""
+	return {
+		"kind": "script",
+		"uid": script.uid,
+		"typeclass": script.typeclass_path,
+		"key": script.key,
+		"obj": script.obj.uid if script.obj else None,
+		"interval": script.interval,
+		"repeats": script.repeats,
+		"persistent": script.persistent,
+		"start_delay": script.start_delay,
+		"attributes": [ (attr.key, attr.category, repr(ref_uids(attr.value))) for attr in script.attributes.all() ],
+		"tags": script.tags.all(return_key_and_category=True),
+		"locks": str(script.locks),
+	}
+
+
+def write_build(file, objects=(), scripts=()):
+	"""
+	Writes objects and scripts out as a JSON-lines build file for `import_build`.
+
+	The first line is a header with the table of every uid in the file, followed
+	by one record per object and then per script. Objects should be ordered the
+	way they'd be built, e.g. rooms before exits.
+
+	Returns:
+		int: the number of records written
+	"""
+	records = [ _object_record(obj) for obj in objects ] + [ _script_record(script) for script in scripts ]
+	header = { "format": _BUILD_FORMAT, "version": _BUILD_VERSION, "uids": [ rec['uid'] for rec in records ] }
+	file.write(json.dumps(header) + "\n")
+	for rec in records:
+		file.write(json.dumps(rec) + "\n")
+	return len(records)
+
+
+def read_build(file):
+	"""
+	Reads a build file written by `write_build`.
+
+	Returns:
+		(header, records): the header dict and the list of record dicts
+
+	Raises:
+		ValueError: if the file isn't a build file this can read
+	"""
+	lines = (line for line in file if line.strip())
+	try:
+		header = json.loads(next(lines))
+	except (StopIteration, json.JSONDecodeError):
+		header = {}
+	if header.get("format") != _BUILD_FORMAT or header.get("version", 0) > _BUILD_VERSION:
+		raise ValueError("Not a readable build file.")
+	return header, [ json.loads(line) for line in lines ]
+
+
+def import_build(file):
+	"""
+	Creates or updates everything in a build file written by `write_build`.
+
+	Every uid is resolved in one pass, and objects along with their attributes,
+	tags and aliases are created and updated with bulk queries. The records hold
+	the full state of each object, so creation hooks aren't run for new objects.
+	Scripts still go through `update_or_create_script`, which starts their timers.
+
+	Returns:
+		dict: the number of objects "created" and "updated", and of "scripts"
+	"""
+	header, records = read_build(file)
+	obj_recs = [ rec for rec in records if rec['kind'] == "object" ]
+	script_recs = [ rec for rec in records if rec['kind'] == "script" ]
+
+	# parse every value first, so that their uids are resolved along with everything else
+	for rec in records:
+		rec['attributes'] = [ (key, category, ast.literal_eval(value)) for key, category, value in rec.get('attributes', []) ]
+	uids = set(header.get("uids", ())) | { rec['uid'] for rec in records }
+	for rec in records:
+		uids.update( rec[field] for field in ("home", "location", "destination", "obj") if rec.get(field) )
+		_find_uids([ value for _, _, value in rec['attributes'] ], uids)
+	found = UID_REGISTRY.get_many(uids)
+
+	with transaction.atomic():
+		new, existing = _bulk_objects(obj_recs, found)
+		for rec in obj_recs:
+			if not any(key == "uid" and category == "systems" for key, category, _ in rec['attributes']):
+				rec['attributes'].append( ("uid", "systems", rec['uid']) )
+			rec['attributes'] = [ (key, category, _swap_uids(value, found)) for key, category, value in rec['attributes'] ]
+		targets = [ (found[rec['uid']], rec) for rec in obj_recs ]
+		_bulk_attributes(targets)
+		_bulk_tags(targets)
+
+	# the handlers may have cached their data before it was written
+	for obj in new + existing:
+		obj.attributes.reset_cache()
+		obj.tags.reset_cache()
+		obj.aliases.reset_cache()
+		if hasattr(obj, 'sdesc'):
+			obj.sdesc.reset()
+	for obj in new:
+		UID_REGISTRY.set(obj, obj.attributes.get("uid", category="systems"))
+
+	for rec in script_recs:
+		kwargs = { field: rec[field] for field in ("typeclass", "key", "interval", "repeats", "persistent", "start_delay", "tags", "locks") if field in rec }
+		kwargs['tags'] = [ tuple(tag) for tag in kwargs.get('tags', []) ]
+		if rec.get('obj'):
+			kwargs['obj'] = found.get(rec['obj'])
+		if attrs := [ (key, _swap_uids(value, found), category) for key, category, value in rec['attributes'] ]:
+			kwargs['attributes'] = attrs
+		update_or_create_script(rec['uid'], **kwargs)
+
+	# attachments and exits were written directly, so rebuild what's derived from them
+	from core.ic.parts import PARTS_INDEX
+	from base_systems.maps.pathing import build_graph
+	PARTS_INDEX.build()
+	build_graph()
+
+	return { "created": len(new), "updated": len(existing), "scripts": len(script_recs) }
+
+
+def _bulk_objects(records, found):
+	"""
+	Creates the objects in records which don't exist yet and updates the fields
+	of all of them, adding any new ones to found.
+
+	Returns:
+		(new, existing): the lists of created and updated objects
+	"""
+	new = {}
+	existing = []
+	for rec in records:
+		if obj := found.get(rec['uid']):
+			if rec['typeclass'] != obj.typeclass_path:
+				obj.swap_typeclass(rec['typeclass'])
+			existing.append(obj)
+		else:
+			obj = ObjectDB(
+					db_key=rec['key'], db_typeclass_path=rec['typeclass'],
+					db_lock_storage=rec.get('locks') or "", db_cmdset_storage=rec.get('cmdset'),
+				)
+			new[rec['uid']] = obj
+			found[rec['uid']] = obj
+	_insert_objects(new)
+	new = list(new.values())
+	for obj in new:
+		ObjectDB.cache_instance(obj, new=True)
+
+	# contents caches of anything in memory will need to be reloaded
+	moved = set()
+	new_pks = { obj.pk for obj in new }
+	for rec in records:
+		obj = found[rec['uid']]
+		old_location = obj.db_location_id
+		obj.db_key = rec['key']
+		if rec.get('cmdset'):
+			obj.db_cmdset_storage = rec['cmdset']
+		for field in ("home", "location", "destination"):
+			if uid := rec.get(field):
+				setattr(obj, f"db_{field}", found.get(uid))
+		if obj.db_location_id != old_location or obj.pk in new_pks:
+			moved.update( (old_location, obj.db_location_id) )
+	ObjectDB.objects.bulk_update(
+			[ found[rec['uid']] for rec in records ],
+			["db_key", "db_cmdset_storage", "db_home", "db_location", "db_destination"],
+			batch_size=_BATCH_SIZE,
+		)
+	for pk in moved:
+		if pk and (loc := ObjectDB.get_cached_instance(pk)):
+			loc.contents_cache.init()
+	return new, existing
+
+
+def _returns_bulk_rows(model):
+	"""
+	Whether bulk inserts into model's database fill in the new primary keys.
+	"""
+	return connections[router.db_for_write(model)].features.can_return_rows_from_bulk_insert
+
+
+def _insert_rows(model, rows):
+	"""
+	Inserts new rows of a model, making sure each one gets its primary key.
+	"""
+	if _returns_bulk_rows(model):
+		model.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+	else:
+		for row in rows:
+			row.save()
+
+
+def _insert_objects(new):
+	"""
+	Inserts new objects, keyed by uid, making sure each one gets its primary key.
+
+	Saving them one at a time would run their creation hooks, so where the
+	database can't return the new rows they're found again by a placeholder key.
+	"""
+	objs = list(new.values())
+	if _returns_bulk_rows(ObjectDB):
+		ObjectDB.objects.bulk_create(objs, batch_size=_BATCH_SIZE)
+		return
+	marked = {}
+	for uid, obj in new.items():
+		marker = f"{_BUILD_FORMAT}#{uid}"
+		marked[marker] = (obj, obj.db_key)
+		obj.db_key = marker
+	ObjectDB.objects.bulk_create(objs, batch_size=_BATCH_SIZE)
+	markers = list(marked)
+	for i in range(0, len(markers), _BATCH_SIZE):
+		for marker, pk in ObjectDB.objects.filter(db_key__in=markers[i:i+_BATCH_SIZE]).values_list("db_key", "id"):
+			marked[marker][0].pk = pk
+	for obj, key in marked.values():
+		obj.db_key = key
+
+
+def _bulk_attributes(targets):
+	"""
+	Adds or overwrites the attributes in each record on its object.
+
+	Args:
+		targets (list): (obj, record) tuples
+	"""
+	through = ObjectDB.db_attributes.through
+	pks = [ obj.pk for obj, _ in targets ]
+	current = {}
+	for i in range(0, len(pks), _BATCH_SIZE):
+		rows = through.objects.filter(
+				objectdb_id__in=pks[i:i+_BATCH_SIZE], attribute__db_attrtype__isnull=True,
+			).values_list("objectdb_id", "attribute__db_key", "attribute__db_category", "attribute_id")
+		current.update( ((pk, key.lower(), category.lower() if category else None), attr_id) for pk, key, category, attr_id in rows )
+
+	updates = {}
+	creates = []
+	for obj, rec in targets:
+		# the last value for a key wins, the same as adding them in order
+		attrs = { (key.lower(), category.lower() if category else None): value for key, category, value in rec['attributes'] }
+		for (key, category), value in attrs.items():
+			if (attr_id := current.get((obj.pk, key, category))) is not None:
+				updates[attr_id] = value
+			else:
+				creates.append( (obj.pk, Attribute(
+						db_key=key, db_category=category, db_value=to_pickle(value),
+						db_model="objectdb", db_lock_storage="",
+					)) )
+
+	attr_ids = list(updates)
+	for i in range(0, len(attr_ids), _BATCH_SIZE):
+		attrs = list(Attribute.objects.filter(id__in=attr_ids[i:i+_BATCH_SIZE]))
+		for attr in attrs:
+			attr.db_value = to_pickle(updates[attr.id])
+			attr.db_strvalue = None
+		Attribute.objects.bulk_update(attrs, ["db_value", "db_strvalue"])
+
+	_insert_rows(Attribute, [ attr for _, attr in creates ])
+	through.objects.bulk_create(
+			[ through(objectdb_id=pk, attribute_id=attr.id) for pk, attr in creates ],
+			batch_size=_BATCH_SIZE,
+		)
+
+
+def _bulk_tags(targets):
+	"""
+	Adds the tags and aliases in each record to its object.
+
+	Args:
+		targets (list): (obj, record) tuples
+	"""
+	wanted = defaultdict(set)
+	for obj, rec in targets:
+		for key, category in rec.get('tags', []):
+			wanted[obj.pk].add( (str(key).strip().lower(), category.strip().lower() if category else None, None) )
+		for alias in rec.get('aliases', []):
+			wanted[obj.pk].add( (str(alias).strip().lower(), None, "alias") )
+	needed = set().union(*wanted.values()) if wanted else set()
+	if not needed:
+		return
+
+	tags = {}
+	keys = list({ key for key, _, _ in needed })
+	for i in range(0, len(keys), _BATCH_SIZE):
+		for tag in Tag.objects.filter(db_model="objectdb", db_key__in=keys[i:i+_BATCH_SIZE]):
+			tags.setdefault( (tag.db_key, tag.db_category, tag.db_tagtype), tag )
+	missing = [
+			Tag(db_key=key, db_category=category, db_tagtype=tagtype, db_model="objectdb")
+			for key, category, tagtype in needed if (key, category, tagtype) not in tags
+		]
+	_insert_rows(Tag, missing)
+	tags.update( ((tag.db_key, tag.db_category, tag.db_tagtype), tag) for tag in missing )
+
+	through = ObjectDB.db_tags.through
+	pks = list(wanted)
+	current = set()
+	for i in range(0, len(pks), _BATCH_SIZE):
+		current.update(through.objects.filter(objectdb_id__in=pks[i:i+_BATCH_SIZE]).values_list("objectdb_id", "tag_id"))
+	through.objects.bulk_create(
+			[
+				through(objectdb_id=pk, tag_id=tag_id)
+				for pk, entries in wanted.items()
+				for tag_id in { tags[entry].id for entry in entries }
+				if (pk, tag_id) not in current
+			],
+			batch_size=_BATCH_SIZE,
+		)
@@ -1,3 +1,4 @@
+import os
 from collections import defaultdict
 from django.conf import settings
 from evennia import CmdSet, create_object, InterruptCommand
@@ -15,7 +16,7 @@ from base_systems.characters.base import Character
 from base_systems.things.base import Thing
 from base_systems.meta.base import MetaThing
 
-from .building import get_obj_family, gen_zone_ids, write_object_creation, write_script_creation
+from .building import get_obj_family, gen_zone_ids, import_build, write_build
 from .pathing import compass_rose, compass_words, dir_to_abbrev
 
 class BuilderCommand(Command):
@@ -80,7 +81,7 @@ class BuilderCommand(Command):
 					# reroute the old exit.
 					exit_obj.destination = destination
 					if direction:
-						exit_obj.db.direction = direction
+						exit_obj.direction = direction
 					if aliases:
 						[exit_obj.aliases.add(alias) for alias in aliases]
 					string += (
@@ -108,7 +109,7 @@ class BuilderCommand(Command):
 				# storing a destination is what makes it an exit!
 				exit_obj.destination = destination
 				if direction:
-					exit_obj.db.direction = direction
+					exit_obj.direction = direction
 				string = (
 					""
 					if not aliases
@@ -445,7 +446,7 @@ class CmdGenIDs(Command):
 
 class CmdBuildWrite(Command):
 	"""
-	generate a build script for the current UID'd game world
+	generate a build file for the current UID'd game world
 
 	Usage:
 		generate build
@@ -460,46 +461,20 @@ class CmdBuildWrite(Command):
 	def func(self):
 		from time import time
 
-		filename = f"world/builds/{int(time())}.py"
-		self.msg(f"Writing rebuild script to {filename}....")
+		filename = f"world/builds/{int(time())}.jsonl"
+		self.msg(f"Writing build file to {filename}....")
+		# build order matters: rooms before the exits and things in them
+		objects = [
+			obj
+			for typeclass in (Room, Exit, Thing, Character, MetaThing)
+			for obj in typeclass.objects.all_family()
+			if obj.uid
+		]
+		scripts = [ script for script in Script.objects.all_family() if script.uid ]
 		with open(filename, "w+") as file:
-			file.write("from base_systems.maps.building import update_or_create_object, update_or_create_script, deref_uids\n")
-			file.write("affected = []\n")
-			self.msg("Writing out Room recreations....")
-			for obj in Room.objects.all_family():
-				if obj.uid:
-					write_object_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			self.msg("Writing out Exit recreations....")
-			for obj in Exit.objects.all_family():
-				if obj.uid:
-					write_object_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			self.msg("Writing out Object recreations....")
-			for obj in Thing.objects.all_family():
-				if obj.uid:
-					write_object_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			self.msg("Writing out Character recreations....")
-			for obj in Character.objects.all_family():
-				if obj.uid:
-					write_object_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			for obj in MetaThing.objects.all_family():
-				if obj.uid:
-					write_object_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			self.msg("Writing out Script recreations....")
-			for obj in Script.objects.all_family():
-				if obj.uid:
-					write_script_creation(obj, file)
-					file.write("affected.append(obj)\n")
-			# ensure all object references in attributes are dereferenced
-			file.write("for obj in affected:\n")
-			file.write("  unpacked = [ (attr.key, deref_uids(attr.value), attr.category) for attr in obj.attributes.all()]\n")
-			file.write("  obj.attributes.batch_add(*unpacked)\n")
-
-		self.msg("Rebuild script complete.")
+			count = write_build(file, objects, scripts)
+
+		self.msg(f"Build file complete: {count} records.")
 
 class CmdZone(Command):
 	"""
@@ -558,6 +533,15 @@ class CmdZone(Command):
 
 
 class CmdBuildLatest(CmdBatchCode):
+	"""
+	apply the most recent build file
+
+	Usage:
+		build latest
+
+	Applies the newest file in world/builds. Build files are imported in bulk,
+	while older python build scripts are run as batch code.
+	"""
 	key = "build latest"
 	aliases = []
 	locks = 'cmd:pperm(Developer)'
@@ -565,19 +549,35 @@ class CmdBuildLatest(CmdBatchCode):
 	def parse(self):
 		super().parse()
 		self.switches = []
-		import os
+		self.build_file = None
 		files = []
 		with os.scandir(os.path.abspath('./world/builds/')) as builds:
 			for item in builds:
-				if item.name.endswith('.py'):
-					files.append('builds/'+item.name[:-3])
+				if item.name.endswith('.py') or item.name.endswith('.jsonl'):
+					files.append(item.name)
 		if files:
-			files.sort()
-			self.args = files[-1]
+			# the names are timestamps, so the newest sorts last
+			latest = max(files, key=lambda name: name.split('.')[0])
+			if latest.endswith('.jsonl'):
+				self.build_file = os.path.join(os.path.abspath('./world/builds/'), latest)
+			else:
+				self.args = 'builds/'+latest[:-3]
+
+	def func(self):
+		if not self.build_file:
+			return super().func()
+		self.msg(f"Importing {os.path.basename(self.build_file)}....")
+		try:
+			with open(self.build_file) as file:
+				counts = import_build(file)
+		except ValueError as err:
+			self.msg(f"Build failed: {err}")
+			return
+		self.msg(f"Build applied: {counts['created']} objects created, {counts['updated']} updated and {counts['scripts']} scripts.")
 
 	def at_post_cmd(self):
 		super().at_post_cmd()
-		if self.args:
+		if self.args and not self.build_file:
 			self.msg("Make sure to $h(reload) to update the pathfinding.")
 
 
@@ -1,6 +1,11 @@
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+import os
+import pickle
 import networkx
+from django.conf import settings
 from evennia import search_object
+from evennia.objects.models import ObjectDB
+from evennia.server.models import ServerConfig
 from evennia.utils import logger
 
 from base_systems.exits.base import Exit
@@ -9,25 +14,221 @@ WorldGraph = networkx.DiGraph()
 compass_rose = [ 'n', 'ne', 'e', 'se', 's', 'sw', 'w', 'nw' ]
 compass_words = { 'n': 'north', 'ne': 'northeast', 'e': 'east', 'se': 'southeast', 's': 'south', 'sw': 'southwest', 'w': 'west', 'nw': 'northwest',  }
 
+# field-of-view cones keyed by (room id, direction, vis); cleared whenever WorldGraph changes
+FOVCache = {}
+
+# the rooms which lose and gain sight of a traveller crossing an edge, keyed by
+# (source id, destination id) and each end's view directions and vis; built from FOVCache
+AudienceCache = {}
+
+def clear_fov():
+	"""
+	Drops every cached field of view. Call this whenever WorldGraph changes.
+	"""
+	FOVCache.clear()
+	AudienceCache.clear()
+
+# shortest-path trees into a target, keyed by (target id, weight), and
+# recent directional drives, keyed by (start id, direction, steps)
+_ROUTE_CACHE_SIZE = 256
+_RouteTrees = OrderedDict()
+_DriveRoutes = OrderedDict()
+
+def clear_routes():
+	"""
+	Drops every cached route. Call this whenever WorldGraph changes.
+	"""
+	_RouteTrees.clear()
+	_DriveRoutes.clear()
+
+def _graph_changed():
+	clear_fov()
+	clear_routes()
+	_bump_version()
+
+def _lru_get(cache, key, compute):
+	"""
+	Gets key from an LRU cache, computing and storing it on a miss.
+	"""
+	if key in cache:
+		cache.move_to_end(key)
+		return cache[key]
+	value = cache[key] = compute()
+	if len(cache) > _ROUTE_CACHE_SIZE:
+		cache.popitem(last=False)
+	return value
+
+# which edge each exit currently makes up, by exit id
+_ExitEdges = {}
+
+_SNAPSHOT_PATH = os.path.join(settings.GAME_DIR, "server", "worldgraph.pickle")
+# bumped whenever WorldGraph changes, so a snapshot can tell if it's still current
+_VERSION_KEY = "worldgraph_version"
+
+def _graph_version():
+	return ServerConfig.objects.conf(_VERSION_KEY, default=0)
+
+def _bump_version():
+	ServerConfig.objects.conf(_VERSION_KEY, _graph_version() + 1)
+
 def build_graph():
 	WorldGraph.clear()
+	_ExitEdges.clear()
+	_graph_changed()
 	exits = Exit.objects.all_family()
 	for ex in exits:
 		if ex.location and ex.destination:
-			weightings = { f"view_{d}": None for d in compass_words.values()}
-			weightings |= { d: None for d in compass_words.values()}
-			weightings |= ex.weights
-			if direction := ex.direction:
-				weightings |= { f"view_{direction}": 1, direction: 1 }
-				dir_key = [ key for key, val in compass_words.items() if val == direction ]
-				if dir_key:
-					dir_key = dir_key[0]
-					i = compass_rose.index(dir_key)
-					if i == 7:
-						i = -1
-					fan = (compass_words[compass_rose[i-1]], compass_words[compass_rose[i+1]])
-					weightings |= { f"view_{fan[0]}": 2, f"view_{fan[1]}": 2 }
-			WorldGraph.add_edge(ex.location.id, ex.destination.id, dbref=f"#{ex.id}", **weightings) #weighting categories will be added as keywords
+			_add_edge(ex)
+
+def _edge_weights(ex):
+	"""
+	Computes the weighting categories for an exit's edge.
+	"""
+	weightings = { f"view_{d}": None for d in compass_words.values()}
+	weightings |= { d: None for d in compass_words.values()}
+	weightings |= ex.weights
+	if direction := ex.direction:
+		weightings |= { f"view_{direction}": 1, direction: 1 }
+		dir_key = [ key for key, val in compass_words.items() if val == direction ]
+		if dir_key:
+			dir_key = dir_key[0]
+			i = compass_rose.index(dir_key)
+			if i == 7:
+				i = -1
+			fan = (compass_words[compass_rose[i-1]], compass_words[compass_rose[i+1]])
+			weightings |= { f"view_{fan[0]}": 2, f"view_{fan[1]}": 2 }
+	return weightings
+
+def _add_edge(ex):
+	edge = (ex.location.id, ex.destination.id)
+	WorldGraph.add_edge(*edge, dbref=f"#{ex.id}", obj=ex, **_edge_weights(ex)) #weighting categories will be added as keywords
+	_ExitEdges[ex.id] = edge
+
+def update_exit(ex):
+	"""
+	Patches the edge for an exit that was created, relinked or redirected.
+	"""
+	if not ex.pk:
+		return
+	_remove_edge(ex.pk)
+	if ex.location and ex.destination:
+		_add_edge(ex)
+	_graph_changed()
+
+def remove_exit(pk):
+	"""
+	Removes the edge for an exit by its id, falling back to any other exit along the same edge.
+	"""
+	if _remove_edge(pk):
+		_graph_changed()
+
+def _remove_edge(pk):
+	"""
+	Removes an exit's edge from WorldGraph, returning False if it didn't have one.
+	"""
+	if not (edge := _ExitEdges.pop(pk, None)):
+		return False
+	if WorldGraph.get_edge_data(*edge, default={}).get('dbref') != f"#{pk}":
+		# another exit already owns this edge
+		return True
+	WorldGraph.remove_edge(*edge)
+	for other in [ other for other, other_edge in _ExitEdges.items() if other_edge == edge ]:
+		ex = search_object(f"#{other}", exact=True, use_dbref=True)
+		if ex and ex[0].location and ex[0].destination and (ex[0].location.id, ex[0].destination.id) == edge:
+			_add_edge(ex[0])
+			return True
+		# it's gone or moved without us hearing about it
+		del _ExitEdges[other]
+	for node in edge:
+		if WorldGraph.has_node(node) and not WorldGraph.degree(node):
+			WorldGraph.remove_node(node)
+	return True
+
+def _exit_rows():
+	"""
+	The id, location, destination and direction of every exit, in two queries.
+	"""
+	exits = Exit.objects.all_family()
+	directions = dict(
+			ObjectDB.db_attributes.through.objects.filter(
+				objectdb_id__in=exits.values("id"), attribute__db_key="direction", attribute__db_category__isnull=True,
+			).values_list("objectdb_id", "attribute__db_value")
+		)
+	return sorted(
+			(pk, loc, dest, directions.get(pk))
+			for pk, loc, dest in exits.values_list("id", "db_location_id", "db_destination_id")
+		)
+
+def _graph_matches(rows):
+	"""
+	Checks that WorldGraph agrees with the exits, in case one was changed
+	without going through its setters.
+	"""
+	linked = [ row for row in rows if row[1] and row[2] ]
+	if len(linked) != len(_ExitEdges):
+		return False
+	for pk, loc, dest, direction in linked:
+		if _ExitEdges.get(pk) != (loc, dest):
+			return False
+		data = WorldGraph.get_edge_data(loc, dest, default=None)
+		if data is None:
+			return False
+		if data.get('dbref') != f"#{pk}":
+			# another exit owns the edge
+			continue
+		if { word for word in compass_words.values() if data.get(word) == 1 } != ({direction} if direction else set()):
+			return False
+	return True
+
+def save_graph():
+	"""
+	Writes WorldGraph to disk so the next start can skip rebuilding it.
+
+	Nothing is written if the graph doesn't match the exits, so the next start rebuilds it.
+	"""
+	rows = _exit_rows()
+	if not _graph_matches(rows):
+		logger.log_warn("WorldGraph is out of date with the exits; it will be rebuilt on the next start.")
+		if os.path.exists(_SNAPSHOT_PATH):
+			os.remove(_SNAPSHOT_PATH)
+		return
+	graph = WorldGraph.copy()
+	for _, _, data in graph.edges(data=True):
+		data.pop('obj', None)
+	with open(_SNAPSHOT_PATH, "wb") as file:
+		pickle.dump((_graph_version(), graph), file)
+
+def load_graph():
+	"""
+	Loads WorldGraph from the last snapshot if it's still valid, rebuilding it otherwise.
+	"""
+	try:
+		with open(_SNAPSHOT_PATH, "rb") as file:
+			version, graph = pickle.load(file)
+	except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+		version, graph = None, None
+	else:
+		# a snapshot is only good for the run right after the clean stop that wrote it
+		os.remove(_SNAPSHOT_PATH)
+
+	if not graph or version != _graph_version():
+		build_graph()
+		return
+	WorldGraph.clear()
+	WorldGraph.update(graph)
+	_ExitEdges.clear()
+	_ExitEdges.update( (int(data['dbref'][1:]), (u, v)) for u, v, data in graph.edges(data=True) )
+	# the graph itself is unchanged, so the version stays the same
+	clear_fov()
+	clear_routes()
+
+def _view_directions(room, looker):
+	"""The directions looker can see out of room in."""
+	return [
+			ex.direction
+			for ex in room.contents_get(content_type='exit')
+			if ex.get_lock(looker, "view") and ex.direction
+		]
 
 def visible_area(room, looker, vis, directions=None):
 	"""
@@ -42,63 +243,93 @@ def visible_area(room, looker, vis, directions=None):
 	"""
 	data = defaultdict(list)
 	if not directions:
-		directions = [
-				ex.direction
-				for ex in room.contents_get(content_type='exit')
-				if ex.get_lock(looker, "view") and ex.direction
-			]
-	if area_dict := room.ndb.area:
-		# we cache a list of rooms in the fov and just validate that they're still visible
-		for d in directions:
-			for r in area_dict.get(d,[]):
-				try:
-					path = networkx.dijkstra_path(WorldGraph, room.id, r.id, weight=f"view_{d}")
-					data[d].append( (r, len(path)-1) )
-				except networkx.NetworkXNoPath:
-					continue
-	else:
-		fov = networkx.DiGraph()
-		room.ndb.area = defaultdict(list)
-		for d in directions:
-			cone = networkx.ego_graph(WorldGraph, room.id, radius=vis, center=False, distance=f"view_{d}")
-			fov = networkx.compose(fov,cone)
-		for n in fov.nodes:
-			if not (n_room := looker.search(f"#{n}", use_dbref=True, exact=True)):
-				logger.log_warn("Node {n} in graph has no matching dbobj id")
+		directions = _view_directions(room, looker)
+	seen = set()
+	for d in directions:
+		for n_room, compass, dist in _fov_cone(room, d, vis):
+			# cones overlap at their edges
+			if n_room in seen or not n_room.pk:
 				continue
-			if ret := _compass_avg(room, n_room):
-				data[ret[0]].append((n_room, ret[1]))
-				room.ndb.area[ret[0]].append(n_room)
+			seen.add(n_room)
+			data[compass].append((n_room, dist))
+	room.ndb.area = defaultdict(list)
 	for key, val in data.items():
-		if key in directions:
-			data[key] = sorted(val, key=lambda x:x[1])
+		data[key] = sorted(val, key=lambda x:x[1])
+		room.ndb.area[key] = [ r for r, _ in data[key] ]
 
 	return data
 
-def _compass_avg(room, target):
+def edge_audience(source, target, looker):
+	"""
+	Finds who loses and gains sight of looker moving from source to target,
+	not counting the two rooms themselves.
+
+	Returns:
+		(set, set): the rooms which lose sight of looker, and the rooms which gain it
+	"""
+	src_view = (tuple(_view_directions(source, looker)), source.db.visibility or 1)
+	dst_view = (tuple(_view_directions(target, looker)), target.db.visibility or 1)
+	key = (source.id, target.id, src_view, dst_view)
+	if (audience := AudienceCache.get(key)) is None:
+		old_area = _area_rooms(source, *src_view)
+		new_area = _area_rooms(target, *dst_view)
+		ignore = { source, target }
+		audience = AudienceCache[key] = ( (old_area - new_area) - ignore, (new_area - old_area) - ignore )
+	return audience
+
+def _area_rooms(room, directions, vis):
+	"""Every room visible from room in the directions, as a set."""
+	return { n_room for d in directions for n_room, _, _ in _fov_cone(room, d, vis) if n_room.pk }
+
+def _fov_cone(room, direction, vis):
 	"""
-	Averages the shortest path from room to target to the nearest compass rose direction.
+	Gets the cached cone of rooms visible from room in direction, computing it if needed.
+
+	Returns:
+		list: (room, compass direction, distance) tuples for every room in the cone
+	"""
+	key = (room.id, direction, vis)
+	if (cone := FOVCache.get(key)) is None:
+		cone = FOVCache[key] = _build_cone(room, direction, vis)
+	return cone
+
+def _build_cone(room, direction, vis):
+	"""
+	Computes the cone of rooms visible from room in direction, in one traversal per weighting.
+	"""
+	# every room within vis along the view weighting
+	dists = networkx.single_source_dijkstra_path_length(WorldGraph, room.id, cutoff=vis, weight=f"view_{direction}")
+	dists.pop(room.id, None)
+	if not dists:
+		return []
+	# the unweighted paths to them, for their compass direction
+	paths = networkx.single_source_shortest_path(WorldGraph, room.id, cutoff=vis)
+	rooms = { obj.id: obj for obj in ObjectDB.objects.filter(id__in=dists.keys()) }
+	cone = []
+	for n in dists:
+		if not (n_room := rooms.get(n)):
+			logger.log_warn(f"Node {n} in graph has no matching dbobj id")
+			continue
+		if ret := _compass_avg(paths[n]):
+			cone.append( (n_room, ret[0], ret[1]) )
+	return cone
+
+def _compass_avg(path):
+	"""
+	Averages a path between rooms to the nearest compass rose direction.
 
 	Args:
-		room (Room): the starting location
-		target (Room): the ending location
+		path (list): the room ids along the path, starting with the origin
 	
 	Returns:
 		tuple or None: a (str, int) describing the average compass rose direction, or None if path includes non-compass directions
 	"""
-	path = networkx.dijkstra_path(WorldGraph, room.id, target.id)
 	dirs = []
-	for i, r in enumerate(path):
-		if i == 0:
-			continue
-		u = path[i-1]
-		v = r
-		exid = WorldGraph[u][v]['dbref']
-		if not (ex := search_object(exid, exact=True, use_dbref=True)):
-			logger.log_warn("Edge {u},{v} had invalid dbref {exid}")
+	for u, v in zip(path, path[1:]):
+		if not (ex := get_exit_for_path(u, v)):
+			logger.log_warn(f"Edge {u},{v} had invalid dbref {WorldGraph[u][v]['dbref']}")
 			return None
-		ex = ex[0]
-		dir_key = dir_to_abbrev(ex.direction)
+		dir_key = dir_to_abbrev(ex.direction or '')
 		if dir_key not in compass_rose:
 			return None
 		ind = compass_rose.index(dir_key)
@@ -112,11 +343,25 @@ def _compass_avg(room, target):
 	return compass_words[compass_rose[avg]], len(dirs)
 
 
+def _route_tree(end, weight):
+	"""
+	The shortest-path tree into end, as predecessors toward it. One tree serves every start.
+	"""
+	def _compute():
+		pred, _ = networkx.dijkstra_predecessor_and_distance(WorldGraph.reverse(copy=False), end, weight=weight)
+		return pred
+	return _lru_get(_RouteTrees, (end, weight), _compute)
+
 def path_to_target(start, end, weight='static'):
 	try:
-		path = networkx.dijkstra_path(WorldGraph, start, end, weight=weight)
-	except networkx.NetworkXNoPath:
+		tree = _route_tree(end, weight)
+	except networkx.NodeNotFound:
+		return None
+	if start not in tree:
 		return None
+	path = [start]
+	while path[-1] != end:
+		path.append(tree[path[-1]][0])
 	return path
 
 def step_to_target(obj, target, weight='static'):
@@ -164,26 +409,37 @@ def get_exit_for_path(node_a, node_b):
 		Exit or None: the Exit leading from node_a to node_b or None if no object is found
 	"""
 	edge_data = WorldGraph.get_edge_data(node_a, node_b, default={})
-	return edge_data.get('obj')
+	if (ex := edge_data.get('obj')) is None and (dbref := edge_data.get('dbref')):
+		# edges loaded from a snapshot only have the dbref until first use
+		if ex := search_object(dbref, exact=True, use_dbref=True):
+			ex = edge_data['obj'] = ex[0]
+	return ex or None
 
 def get_path_in_direction(start, moving, steps):
 	if type(start) is not int:
 		start = start.id
+	if not (drive := _lru_get(_DriveRoutes, (start, moving, steps), lambda: _drive_route(start, moving, steps))):
+		return None
+	destination, route, crashed = drive
+	# hand out a copy, since callers store and extend routes
+	return (destination, list(route), crashed)
+
+def _drive_route(start, moving, steps):
 	# TODO: catch/prevent missing directions (i don't remember what i meant here)
 	compass_index = compass_rose.index(dir_to_abbrev(moving))
-	G = networkx.ego_graph(WorldGraph, start, radius=steps, center=True, distance=moving)
-	routes = networkx.shortest_path(G, source=start, weight=moving)
+	routes = networkx.single_source_dijkstra_path(WorldGraph, start, cutoff=steps, weight=moving)
 	if not routes:
 		return None
 	routes = sorted(routes.items(), key=lambda e: len(e[1]))
 	destination, route = routes[-1]
+	route = list(route)
 	if len(route) < steps:
 		new_steps = steps-len(route)
 		veer_a = get_path_in_direction(destination, compass_words[compass_rose[compass_index-1]], new_steps)
-		veer_b = get_path_in_direction(destination, compass_words[compass_rose[compass_index+1]], new_steps)
+		veer_b = get_path_in_direction(destination, compass_words[compass_rose[(compass_index+1) % 8]], new_steps)
 		if not (veer_a or veer_b) or (veer_a and veer_b):
 			return (destination, route, True)
-		destination, append = veer_a or veer_b
+		destination, append, _ = veer_a or veer_b
 		route += append
 	
 	return (destination, route, False)
@@ -3,13 +3,22 @@ Partial-match cmdparser that will select the best matching available commands to
 """
 
 import re
+import weakref
 from django.conf import settings
+from evennia.locks import lockfuncs
 from evennia.utils import logger
 
 from os.path import commonprefix
 
 _CMD_IGNORE_PREFIXES = settings.CMD_IGNORE_PREFIXES
 _RE_SPLIT = re.compile(r'[^a-zA-Z0-9]')
+# lockfuncs which only look at the caller's identity and permissions, so their
+# results hold for as long as _lock_stamp does
+_STATELESS_LOCKFUNCS = {
+	lockfuncs.true, lockfuncs.all, lockfuncs.false, lockfuncs.none, lockfuncs.superuser,
+	lockfuncs.perm, lockfuncs.perm_above, lockfuncs.pperm, lockfuncs.pperm_above,
+	lockfuncs.id, lockfuncs.dbref,
+}
 
 
 def create_match(cmdname, string, raw_cmdname, cmd_obj):
@@ -50,6 +59,112 @@ def create_match(cmdname, string, raw_cmdname, cmd_obj):
 	return (cmdname, args, cmd_obj, incmd, len(overlap), raw_cmdname)
 
 
+class _TrieNode:
+	def __init__(self):
+		self.children = {}
+		# every (order, cmdname, raw_cmdname, cmd) that passes through this node
+		self.below = []
+
+
+class CommandIndex:
+	"""
+	Prefix tries over the command names in a cmdset, and the lock results
+	for its commands per caller.
+	"""
+	def __init__(self, cmdset):
+		self.version = _cmdset_version(cmdset)
+		self.locks = weakref.WeakKeyDictionary()
+		self._cacheable = {}
+		self._tries = {}
+		self._cmdset = list(cmdset)
+
+	def trie(self, include_prefixes):
+		if (root := self._tries.get(include_prefixes)) is None:
+			root = self._tries[include_prefixes] = _TrieNode()
+			order = 0
+			for cmd in self._cmdset:
+				for raw_cmdname in [cmd.key] + cmd.aliases:
+					if not raw_cmdname:
+						continue
+					if include_prefixes or len(raw_cmdname) == 1:
+						cmdname = raw_cmdname
+					else:
+						cmdname = raw_cmdname.lstrip(_CMD_IGNORE_PREFIXES)
+					node = root
+					entry = (order, cmdname, raw_cmdname, cmd)
+					order += 1
+					for char in cmdname:
+						node = node.children.setdefault(char, _TrieNode())
+						node.below.append(entry)
+		return root
+
+	def access(self, cmd, caller):
+		"""
+		Checks the caller's "cmd" access to cmd, reusing the result while
+		the caller's permissions are unchanged. Commands whose lock depends on
+		anything else, e.g. `is_ooc()` or `holds()`, are always checked.
+		"""
+		if (cacheable := self._cacheable.get(id(cmd))) is None:
+			cacheable = self._cacheable[id(cmd)] = _stateless_lock(cmd)
+		if not cacheable or (stamp := _lock_stamp(caller)) is None:
+			return cmd.access(caller, "cmd")
+		try:
+			cached_stamp, results = self.locks.get(caller, (None, None))
+		except TypeError:
+			# can't be weakly referenced
+			return cmd.access(caller, "cmd")
+		if cached_stamp != stamp:
+			results = {}
+			self.locks[caller] = (stamp, results)
+		if (allowed := results.get(id(cmd))) is None:
+			allowed = results[id(cmd)] = cmd.access(caller, "cmd")
+		return allowed
+
+
+def _cmdset_version(cmdset):
+	return tuple(id(cmd) for cmd in cmdset)
+
+
+def _stateless_lock(cmd):
+	"""
+	Returns True if cmd's "cmd" lock only uses stateless lockfuncs.
+	"""
+	try:
+		_, funcs, _ = cmd.lockhandler.locks.get("cmd", (None, (), None))
+	except AttributeError:
+		return False
+	return all(func in _STATELESS_LOCKFUNCS for func, _, _ in funcs)
+
+
+def _lock_stamp(caller):
+	"""
+	Returns the caller state that command locks are checked against, or None
+	if the caller can't be cached.
+	"""
+	if not (perms := getattr(caller, "permissions", None)):
+		return None
+	stamp = [getattr(caller, "is_superuser", False), tuple(perms.all())]
+	if account := getattr(caller, "account", None):
+		stamp += [account.is_superuser, tuple(account.permissions.all()), account.attributes.has("_quell")]
+	return tuple(stamp)
+
+
+def get_command_index(cmdset):
+	"""
+	Returns the CommandIndex for cmdset, building it if the cmdset is new or
+	has changed since it was last indexed.
+	"""
+	index = getattr(cmdset, "_command_index", None)
+	if not index or index.version != _cmdset_version(cmdset):
+		index = CommandIndex(cmdset)
+		try:
+			cmdset._command_index = index
+		except AttributeError:
+			# not a CmdSet, so there's nowhere to keep it
+			pass
+	return index
+
+
 def build_matches(raw_string, cmdset, include_prefixes=False):
 	"""
 	Build match tuples by matching raw_string against available commands.
@@ -57,7 +172,7 @@ def build_matches(raw_string, cmdset, include_prefixes=False):
 	Args:
 		raw_string (str): Input string that can look in any way; the only assumption is
 			that the sought command's name/alias must be *first* in the string.
-		cmdset: a list of valid Commands to pick from.
+		cmdset: a CmdSet or list of valid Commands to pick from, or its CommandIndex.
 		include_prefixes (bool): If set, include prefixes like @, ! etc (specified in settings)
 			in the match, otherwise strip them before matching.
 
@@ -65,35 +180,32 @@ def build_matches(raw_string, cmdset, include_prefixes=False):
 		matches (list) A list of match tuples created by `create_match`.
 
 	"""
-	matches = []
-	stripped_string = raw_string.lstrip(_CMD_IGNORE_PREFIXES) if len(raw_string) > 1 else raw_string
+	index = cmdset if isinstance(cmdset, CommandIndex) else get_command_index(cmdset)
+	if include_prefixes:
+		string = raw_string
+	else:
+		string = raw_string.lstrip(_CMD_IGNORE_PREFIXES) if len(raw_string) > 1 else raw_string
+	lowered = string.lower()
 
-	#	matchlen = 0
+	# a name matches when the input, up to the first separator after the
+	# shared prefix, is a prefix of it. walking the trie down the input finds
+	# each of those separators, and the names which branch off there.
+	found = []
 	try:
-		if include_prefixes:
-			# use the cmdname as-is
-			for cmd in cmdset:
-				keys = [cmd.key] + cmd.aliases
-				new_matches = [create_match(cmdname, raw_string, cmdname, cmd) for cmdname in keys if cmdname]
-				matches.extend([match for match in new_matches if match[4] and match[3] in match[0]])
-
+		node = index.trie(include_prefixes)
+		for i, char in enumerate(lowered):
+			if i and _RE_SPLIT.match(char):
+				found.extend( (entry, i) for entry in node.below if len(entry[1]) == i or entry[1][i] != char )
+			if not (node := node.children.get(char)):
+				break
 		else:
-			# strip prefixes set in settings
-			for cmd in cmdset:
-				new_matches = []
-				for raw_cmdname in [cmd.key] + cmd.aliases:
-					cmdname = (
-						raw_cmdname.lstrip(_CMD_IGNORE_PREFIXES)
-						if len(raw_cmdname) > 1
-						else raw_cmdname
-					)
-					new_matches.append(create_match(cmdname, stripped_string, raw_cmdname, cmd))
-
-				matches.extend([match for match in new_matches if match[4] and match[3] in match[0]])
+			if lowered:
+				found.extend( (entry, len(lowered)) for entry in node.below )
 
 	except Exception:
 		logger.log_trace("cmdhandler error. raw_input:%s" % raw_string)
-	return matches
+	found.sort(key=lambda item: item[0][0])
+	return [ (cmdname, string[i:], cmd, lowered[:i], i, raw_cmdname) for (_, cmdname, raw_cmdname, cmd), i in found ]
 
 
 def cmdparser(raw_string, cmdset, caller, **kwargs):
@@ -113,11 +225,12 @@ def cmdparser(raw_string, cmdset, caller, **kwargs):
 	if not raw_string:
 		return []
 
-	# only check for commands we are actually allowed to call.
-	cmdset = [cmd for cmd in cmdset if cmd.access(caller, "cmd")]
+	index = get_command_index(cmdset)
 
 	# find matches, using the fuzziest matching first
-	matches = build_matches(raw_string, cmdset, include_prefixes=False)
+	matches = build_matches(raw_string, index, include_prefixes=False)
+	# only keep commands we are actually allowed to call.
+	matches = [match for match in matches if index.access(match[2], caller)]
 
 	if not len(matches):
 		# there are no commands that match at all
@@ -127,7 +240,8 @@ def cmdparser(raw_string, cmdset, caller, **kwargs):
 
 	if len(matches) > 1 and _CMD_IGNORE_PREFIXES:
 		# check for a disambiguating prefix
-		trimmed = build_matches(raw_string, cmdset, include_prefixes=True)
+		trimmed = build_matches(raw_string, index, include_prefixes=True)
+		trimmed = [match for match in trimmed if index.access(match[2], caller)]
 		if len(trimmed):
 			trimmed_score = max([mat[4] for mat in trimmed])
 			if trimmed_score >= max_score:
@@ -0,0 +1,59 @@
+"""
+Tracks a version for each object's appearance, so rendered looks can be
+cached until something they're built from changes.
+
+An object's version changes whenever its attributes, tags, aliases or
+handler data are saved, its decor is placed or removed, or its name,
+sdesc or recogs change.
+"""
+from itertools import count
+from evennia.typeclasses.attributes import AttributeHandler
+
+# object pk -> the version its appearance was last changed at
+_VERSIONS = {}
+_COUNTER = count(1)
+
+
+def touch_appearance(*objs):
+	"""
+	Marks the appearance of each of objs as changed.
+	"""
+	for obj in objs:
+		if obj and (pk := getattr(obj, "pk", None)):
+			_VERSIONS[pk] = next(_COUNTER)
+
+def appearance_version(obj):
+	"""
+	Returns the current appearance version of obj.
+	"""
+	return _VERSIONS.get(obj.pk, 0) if obj else 0
+
+
+class AppearanceAttributeHandler(AttributeHandler):
+	"""
+	An AttributeHandler which marks the object's appearance as changed
+	whenever its attributes do.
+
+	Values which are changed in place, e.g. `obj.db.things.append(thing)`,
+	are saved without going through the handler, so they aren't noticed.
+	"""
+
+	def add(self, *args, **kwargs):
+		result = super().add(*args, **kwargs)
+		touch_appearance(self.obj)
+		return result
+
+	def batch_add(self, *args, **kwargs):
+		result = super().batch_add(*args, **kwargs)
+		touch_appearance(self.obj)
+		return result
+
+	def remove(self, *args, **kwargs):
+		result = super().remove(*args, **kwargs)
+		touch_appearance(self.obj)
+		return result
+
+	def clear(self, *args, **kwargs):
+		result = super().clear(*args, **kwargs)
+		touch_appearance(self.obj)
+		return result
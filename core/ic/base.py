@@ -1,17 +1,19 @@
 import string
 from collections import Counter
+from functools import partial
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 from evennia.utils import lazy_property, logger, dbref, make_iter, iter_to_str, variable_from_module
 from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultObject
+from evennia.typeclasses.attributes import ModelAttributeBackend
 from evennia.contrib.rpg.traits import TraitHandler
 
 from utils.colors import strip_ansi
 from utils.strmanip import isare, numbered_name, strip_extra_spaces
 from base_systems.effects.handler import EffectsHandler
-from base_systems.maps.building import get_by_uid
+from base_systems.maps.building import get_by_uid, UID_REGISTRY
 
 from . import sdescs, emotes
 from .behaviors import BehaviorSet, NoSuchBehavior
@@ -19,7 +21,8 @@ from .decor import DecorHandler
 from .descs import DescsHandler
 from .features import FeatureHandler
 from .meta import MetaDataHandler
-from .parts import PartsCacher, PartsHandler
+from .appearance import AppearanceAttributeHandler, appearance_version, touch_appearance
+from .parts import PARTS_INDEX, PartsCacher, PartsHandler, PartTagHandler
 from .poses import PoseHandler
 from .reactions import ReactionHandler
 from .sides import SidesHandler
@@ -32,6 +35,33 @@ parser = FuncParser(ACTOR_STANCE_CALLABLES | LOCAL_FUNCPARSER_CALLABLES)
 # FIXME: I don't need this to be separate, do I?
 _AT_SEARCH_RESULT = variable_from_module(*settings.SEARCH_AT_RESULT.rsplit(".", 1))
 
+_FORMATTER = string.Formatter()
+# (typeclass, template) -> the display components that template uses
+_DISPLAY_PLANS = {}
+
+def _display_plan(cls, template):
+	"""
+	Returns the (field, method name) pairs of the get_display_* components
+	referenced by template, resolved once per typeclass.
+	"""
+	if (plan := _DISPLAY_PLANS.get((cls, template))) is None:
+		plan = []
+		for _, field, _, _ in _FORMATTER.parse(template):
+			if not field or "_" in field or any(k == field for k, _ in plan):
+				continue
+			attr = f"get_display_{field}"
+			if callable(getattr(cls, attr, None)):
+				plan.append( (field, attr) )
+		plan = _DISPLAY_PLANS[(cls, template)] = tuple(plan)
+	return plan
+
+def _punctuate(message):
+	"""Strips an emote and makes sure it ends in punctuation."""
+	message = message.strip()
+	if strip_ansi(message)[-1] not in string.punctuation:
+		message += "."
+	return message
+
 class BaseObject(DefaultObject):
 	appearance_template = """
 {header}
@@ -55,6 +85,9 @@ $head({name})
 {footer}
 """
 
+	# serve repeated looks from a per-looker cache while get_appearance_stamp is unchanged
+	appearance_cache = False
+
 	@property
 	def sides(self):
 		return SidesHandler(self)
@@ -106,6 +139,7 @@ $head({name})
 			# if we get to this point we are ready to change attachment
 			old_location = self.attributes.get("attached", category="systems")
 			self.attributes.add("attached", obj, category="systems")
+			PARTS_INDEX.set(self, obj)
 
 			# update the contents cache
 			if old_location:
@@ -150,6 +184,7 @@ $head({name})
 			source.parts_cache.remove(self)
 			source.behaviors.unmerge(self)
 			self.attributes.remove("attached", category="systems")
+		PARTS_INDEX.remove(self)
 		self.parts_cache.init()
 		for obj in self.parts_cache.get():
 			base.parts_cache.remove(obj)
@@ -177,10 +212,26 @@ $head({name})
 
 		return self._baseobj
 
+	@lazy_property
+	def effects(self):
+		return EffectsHandler(self)
+
 	@lazy_property
 	def parts_cache(self):
 		return PartsCacher(self)
 
+	@lazy_property
+	def attributes(self):
+		return AppearanceAttributeHandler(self, ModelAttributeBackend)
+
+	@lazy_property
+	def tags(self):
+		return PartTagHandler(self)
+
+	@lazy_property
+	def aliases(self):
+		return emotes.NameAliasHandler(self)
+
 	@lazy_property
 	def behaviors(self):
 		return BehaviorSet(self)
@@ -195,22 +246,14 @@ $head({name})
 
 	def __getattr__(self, attr):
 		if attr.startswith("do_"):
-			attr = attr[3:]
-			if not self.behaviors.can_do(attr):
-				raise NoSuchBehavior(f"'{type(self).__name__}' has no attribute 'do_{attr}'")
-			def func(*args, **kwargs):
-				return self.behaviors.do(attr, self, *args, **kwargs)
-			return func
+			return self.behaviors.bound(attr[3:])
 
 		elif attr.startswith("can_"):
 			attr = attr[4:]
 			return self.behaviors.can_do(attr)
 
 		elif attr.startswith("on_"):
-			attr = attr[3:]
-			def func(*args, **kwargs):
-				self.react.on(attr, *args, **kwargs)
-			return func
+			return partial(self.react.on, attr[3:])
 
 		else:
 			raise AttributeError(f"'{type(self).__name__}' has no attribute '{attr}'")
@@ -292,6 +335,7 @@ $head({name})
 		if get_by_uid(value):
 			raise KeyError(f"Object {value} already exists.")
 		self.attributes.add('uid', value, category="systems")
+		UID_REGISTRY.set(self, value)
 
 	def search(
 		self,
@@ -514,7 +558,8 @@ $head({name})
 				return False
 			return _open_up(obj.location)
 
-		if self.tags.has("hidden", category="systems"):
+		# a category lookup stays cached, unlike a miss on a single tag
+		if "hidden" in self.tags.get(category="systems", return_list=True):
 			return False
 		if not looker:
 			# i hate this
@@ -578,9 +623,12 @@ $head({name})
 #		self.effects.save()
 
 	def at_server_start(self):
+		"""
+		Resumes this object's ongoing work. Only objects marked by `utils.startup`
+		are started by the server; everything else loads on first access.
+		"""
 		# this has no supers from here
-		self.effects = EffectsHandler(self)
-		self.parts
+		self.effects.check_startup()
 		# self.sdesc.get()
 
 	def at_object_creation(self):
@@ -865,11 +913,16 @@ $head({name})
 				self.msg("There's no one to see that.")
 				return
 
-		message = message.strip()
-		if strip_ansi(message)[-1] not in string.punctuation:
-			message += "."
+		emotes.send(self, _punctuate(message), receivers, **kwargs)
+
+	def emote_many(self, batch, **kwargs):
+		"""
+		Sends several emotes at once, each to its own receivers.
 
-		emotes.send(self, message, receivers, **kwargs)
+		Args:
+			batch (iterable): (message, receivers) tuples
+		"""
+		emotes.send_many(self, [ (_punctuate(message), receivers) for message, receivers in batch ], **kwargs)
 
 	def format_appearance(self, appearance, looker, **kwargs):
 		return strip_extra_spaces(appearance)
@@ -964,12 +1017,16 @@ $head({name})
 
 	def at_object_receive(self, obj, source, **kwargs):
 		# print(f"received {obj}")
+		emotes.invalidate_names(self)
+		emotes.invalidate_names(obj)
 		self.on_object_enter(obj, source, **kwargs)
 		for obj in self.contents:
 			obj.on_arrival(obj, source, **kwargs)
 
 	def at_object_leave(self, obj, destination, **kwargs):
 		super().at_object_leave(obj, destination, **kwargs)
+		emotes.invalidate_names(self)
+		emotes.invalidate_names(obj)
 		self.decor.remove(obj)
 		self.posing.remove(obj)
 		self.on_object_leave(obj, destination, **kwargs)
@@ -1004,11 +1061,21 @@ $head({name})
 		return super().at_object_delete()
 
 
+	def at_object_post_copy(self, new_obj, **kwargs):
+		super().at_object_post_copy(new_obj, **kwargs)
+		# copied attributes bypass the partof and uid setters
+		PARTS_INDEX.set(new_obj, new_obj.partof)
+		UID_REGISTRY.set(new_obj, new_obj.uid)
+		new_obj.sdesc.reset()
+
 	def delete(self, full=False):
 		self.effects.clear()
 		parts = list(self.parts.all())
+		pk = self.pk
 		if not super().delete():
 			return False
+		PARTS_INDEX.discard(pk)
+		UID_REGISTRY.discard(self.__dbclass__, pk)
 		if full:
 			for obj in parts:
 				obref = f"{obj.key}(#{obj.id})"
@@ -1069,20 +1136,46 @@ $head({name})
 		if "link" not in kwargs:
 			kwargs["link"] = True if not kwargs.get("look_in") else False
 
-		format_dict = {}
-		for attr in dir(self):
-			match attr.split("_"):
-				case ["get", "display", k]:
-					k_attr = getattr(self, attr)
-					if callable(k_attr):
-						format_dict[k] = k_attr(looker, **kwargs)
-				case _:
-					continue
-
 		template = self.covered_template if self.effects.has(name='covered') else self.appearance_template
 		template = kwargs.get('template', template)
 
-		return self.format_appearance(template.format(**format_dict), looker, **kwargs)
+		cache_key = None
+		if self.appearance_cache and looker:
+			cache_key = (looker.id, template, tuple(sorted(kwargs.items())))
+			try:
+				hash(cache_key)
+			except TypeError:
+				cache_key = None
+		if cache_key:
+			if self.ndb._appearances is None:
+				self.ndb._appearances = {}
+			cached = self.ndb._appearances.get(cache_key)
+			if cached and cached[0] == self.get_appearance_stamp(looker):
+				return cached[1]
+
+		format_dict = { k: getattr(self, attr)(looker, **kwargs) for k, attr in _display_plan(type(self), template) }
+		appearance = self.format_appearance(template.format(**format_dict), looker, **kwargs)
+
+		if cache_key:
+			# stamped after rendering, since the first look can set things up
+			self.ndb._appearances[cache_key] = (self.get_appearance_stamp(looker), appearance)
+		return appearance
+
+	def get_appearance_stamp(self, looker, **kwargs):
+		"""
+		Returns the appearance versions of everything return_appearance is built
+		from: this object, its contents and parts, and the looker. A cached
+		appearance is reused for as long as this stays the same.
+
+		Only turn on `appearance_cache` for classes whose look doesn't depend on
+		anything else, e.g. non-persistent attributes or other locations.
+		"""
+		return (
+			appearance_version(self),
+			appearance_version(looker),
+			tuple( (obj.pk, appearance_version(obj)) for obj in self.contents ),
+			tuple( (obj.pk, appearance_version(obj)) for obj in self.parts_cache.get() ),
+		)
 
 	def format_appearance(self, appearance, looker, **kwargs):
 		return strip_extra_spaces(appearance)
@@ -1103,6 +1196,7 @@ $head({name})
 	def at_rename(self, old_name, new_name, **kwargs):
 		"""custom code to run when renamed"""
 		super().at_rename(old_name, new_name)
+		touch_appearance(self)
 		self.sdesc.update()
 	
 	def basetype_setup(self):
@@ -1178,4 +1272,8 @@ $head({name})
 
 			del self._createdict
 
+		# copies and batch-created objects can come with an attachment already set
+		PARTS_INDEX.set(self, self.partof)
+		# the sdesc may have been cached before the attributes were added
+		self.sdesc.reset()
 		self.basetype_posthook_setup()
\ No newline at end of file
@@ -1,10 +1,15 @@
 from copy import copy
+from functools import partial
 from evennia.utils import logger
 
 from utils.general import get_classpath
 
 
 BEHAVIOR_REGISTRY = {}
+# behavior class -> its behavior method names
+_METHOD_TABLES = {}
+# frozenset of behavior classes -> the (behaviors, default) dispatch tables they compose into
+_DISPATCH_TABLES = {}
 
 # decorator for behavior classes
 def behavior(cls):
@@ -15,6 +20,7 @@ def behavior(cls):
 	# instead of having to inherit from Behavior, we'll just require a priority
 	if hasattr(cls, 'priority'):
 		BEHAVIOR_REGISTRY[key] = cls
+		_METHOD_TABLES[cls] = _find_methods(cls)
 	else:
 		logger.log_err(f"Invalid behavior class! {get_classpath(cls)}")
 	return cls
@@ -22,11 +28,19 @@ def behavior(cls):
 class NoSuchBehavior(Exception):
 	pass
 
+def _find_methods(cls):
+	return tuple( item for item in dir(cls) if not item.startswith("_") and callable(getattr(cls, item)) )
+
 def _get_methods(cls):
 	"""
-	Retrieves a list of behavior methods on the class.
+	Retrieves the behavior methods on the class, cached per class.
 	"""
-	return list([ item for item in dir(cls) if not item.startswith("_") and callable(getattr(cls, item)) ])
+	if (methods := _METHOD_TABLES.get(cls)) is None:
+		methods = _METHOD_TABLES[cls] = _find_methods(cls)
+	return methods
+
+def _by_priority(item):
+	return item[0].priority
 
 class BehaviorSet:
 	"""
@@ -47,22 +61,15 @@ class BehaviorSet:
 		return copy(self._behave_set)
 	
 	def _add_methods(self, cls, default=False, **kwargs):
+		# the dispatch lists are shared with _DISPATCH_TABLES, so they're replaced rather than changed in place
 		new_tuple = (cls, kwargs)
 		for method in _get_methods(cls):
-			if method in self.behaviors:
-				if new_tuple not in self.behaviors[method]:
-					self.behaviors[method].append(new_tuple)
-					self.behaviors[method].sort(key=lambda x: x[0].priority, reverse=True)
-			else:
-				self.behaviors[method] = [new_tuple]
+			if new_tuple not in (behaves := self.behaviors.get(method, [])):
+				self.behaviors[method] = sorted(behaves + [new_tuple], key=_by_priority, reverse=True)
 			# NOTE: with this new 'list of methods' implementation, is _default obsolete?
-			if default:
-				if method in self._default:
-					if new_tuple not in self._default[method]:
-						self._default[method].append(new_tuple)
-						self._default[method].sort(key=lambda x: x[0].priority, reverse=True)
-				else:
-					self._default[method] = [new_tuple]
+			if default and new_tuple not in (behaves := self._default.get(method, [])):
+				self._default[method] = sorted(behaves + [new_tuple], key=_by_priority, reverse=True)
+		self._bound = {}
 
 	def _del_methods(self, cls, default=False, **kwargs):
 		for method in _get_methods(cls):
@@ -79,17 +86,26 @@ class BehaviorSet:
 				self._default[method] = behaves
 			else:
 				del self._default[method]
+		self._bound = {}
 
 	def load(self):
 		self.behaviors = {}
 		self._default = {}
 		self._behave_set = self.obj.attributes.get("behaviors", category="systems").deserialize()
+		classes = []
 		for registry_key in self._behave_set:
 			if cls := BEHAVIOR_REGISTRY.get(registry_key):
-				self._add_methods(cls, default=True)
+				classes.append(cls)
 			else:
 				logger.log_err(f"Behavior '{registry_key}' not found in registry")
 				continue
+		signature = frozenset(classes)
+		if not (tables := _DISPATCH_TABLES.get(signature)):
+			for cls in classes:
+				self._add_methods(cls, default=True)
+			tables = _DISPATCH_TABLES[signature] = (self.behaviors, self._default)
+		self.behaviors, self._default = dict(tables[0]), dict(tables[1])
+		self._bound = {}
 		for obj in self.obj.parts.all():
 			self.merge(obj)
 	
@@ -152,6 +168,20 @@ class BehaviorSet:
 		func = getattr(clsobj, method)
 		return func(*args, **(cls_kwargs | kwargs))
 
+	def bound(self, method):
+		"""
+		Returns the highest-priority implementation of method, bound to the owner.
+
+		Raises:
+			NoSuchBehavior if nothing implements method
+		"""
+		if not (func := self._bound.get(method)):
+			if not (behave := self.behaviors.get(method)):
+				raise NoSuchBehavior(f"'{type(self.obj).__name__}' has no attribute 'do_{method}'")
+			clsobj, cls_kwargs = behave[0]
+			func = self._bound[method] = partial(getattr(clsobj, method), self.obj, **cls_kwargs)
+		return func
+
 
 class Behavior:
 	priority = -1
@@ -3,6 +3,7 @@ from evennia.utils.utils import iter_to_str
 from random import randint
 
 from utils.strmanip import isare, numbered_name
+from .appearance import touch_appearance
 
 
 class DecorHandler:
@@ -79,6 +80,7 @@ class DecorHandler:
 		obj.attributes.add('wearing', decorated, category='systems')
 
 		self._desc = None
+		touch_appearance(self.obj, self.obj.baseobj)
 
 		return True
 	
@@ -109,6 +111,7 @@ class DecorHandler:
 				decorated.remove(self.obj)
 				obj.attributes.add('wearing', decorated, category='systems')
 			self._desc = None
+			touch_appearance(self.obj, self.obj.baseobj)
 
 			return True
 		
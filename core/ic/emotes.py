@@ -4,16 +4,18 @@ See core contrib for docs
 import re
 import string
 from re import escape as re_escape
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from string import punctuation
 
 from django.conf import settings
 from evennia.objects.models import ObjectDB
+from evennia.typeclasses.tags import AliasHandler
 from evennia.utils import interactive, logger
 from evennia.utils.utils import lazy_property, is_iter, make_iter, variable_from_module, string_partial_matching, string_suggestions
 from evennia.utils.dbserialize import deserialize
 
 from utils.strmanip import numbered_name, strip_extra_spaces
+from .appearance import touch_appearance
 from utils.colors import strip_ansi
 
 _VOICE_PARTS = ["quality", "style", "voice"]
@@ -62,6 +64,175 @@ class LanguageError(Exception):
 	pass
 
 
+# ------------------------------------------------------------
+# Candidate name index
+# ------------------------------------------------------------
+
+_RE_NAME_WORDS = re.compile(r"\w+", re.UNICODE)
+
+# how many built indexes to keep around at once
+_NAME_INDEX_SIZE = 256
+_NAME_INDEXES = OrderedDict()
+# pk of looker, location or candidate -> index keys that depend on it
+_NAME_INDEX_DEPS = defaultdict(set)
+
+def _trie_add(trie, word, hit):
+	node = trie
+	for char in word:
+		node = node.setdefault(char, {})
+		node.setdefault(None, []).append(hit)
+
+def _trie_get(trie, word):
+	node = trie
+	for char in word:
+		if not (node := node.get(char)):
+			return []
+	return node[None]
+
+
+class NameIndex:
+	"""
+	The referrable names for a set of candidates, split into words and
+	stored in a prefix trie and a suffix trie. A query word matches a name
+	word it starts or ends, and a query matches a name if all its words
+	match in order - the same rules the old per-call regexes used.
+	"""
+
+	def __init__(self, candidate_map):
+		"""
+		Args:
+			candidate_map (list): a list of (obj, name) tuples
+		"""
+		self.entries = candidate_map
+		self.looker = None
+		self.candidates = []
+		self.deps = set()
+		self.exact = defaultdict(set)
+		self._spans = []
+		self._prefixes = {}
+		self._suffixes = {}
+		for i, (obj, name) in enumerate(candidate_map):
+			self.exact[name.lower().strip()].add(obj)
+			spans = []
+			for t, word in enumerate(_RE_NAME_WORDS.finditer(name)):
+				spans.append(word.span())
+				token = word.group().lower()
+				_trie_add(self._prefixes, token, (i, t))
+				_trie_add(self._suffixes, token[::-1], (i, t))
+			self._spans.append(spans)
+
+	def names(self):
+		return [name for _, name in self.entries]
+
+	def match(self, words):
+		"""
+		Find the longest leading run of words which still matches any names.
+
+		Args:
+			words (list of str): the query words, in order
+
+		Returns:
+			(matches, count): the (obj, name) entries matching the first `count` words
+		"""
+		positions = None
+		count = 0
+		for word in words:
+			size = len(word)
+			word = word.lower()
+			# a word can match the start or the end of a name word
+			hits = []
+			for i, t in _trie_get(self._prefixes, word):
+				start = self._spans[i][t][0]
+				hits.append( (i, start, start+size) )
+			for i, t in _trie_get(self._suffixes, word[::-1]):
+				end = self._spans[i][t][1]
+				hits.append( (i, end-size, end) )
+
+			# keep the earliest end point for each name which is still in the running
+			ends = {}
+			for i, start, end in hits:
+				if positions is not None:
+					if i not in positions or start < positions[i]:
+						continue
+				if i not in ends or end < ends[i]:
+					ends[i] = end
+			if not ends:
+				break
+			positions = ends
+			count += 1
+
+		if not positions:
+			return [], 0
+		return [self.entries[i] for i in positions], count
+
+
+def get_name_index(looker, candidates, build, kind=None):
+	"""
+	Get the cached name index for looker and this set of candidates,
+	building it if necessary.
+
+	Args:
+		looker (Object): the object doing the searching
+		candidates (iterable): the objects being searched
+		build (callable): called as `build(looker, candidates)` to make the
+			list of (obj, name) tuples for a new index
+		kind (str, optional): distinguishes indexes built differently
+
+	Returns:
+		NameIndex
+	"""
+	candidates = list(candidates)
+	# the index holds on to its looker and candidates, so their ids can't be reused while it's cached
+	key = (kind, id(looker), frozenset(id(obj) for obj in candidates))
+	if index := _NAME_INDEXES.get(key):
+		_NAME_INDEXES.move_to_end(key)
+		return index
+
+	index = NameIndex(build(looker, candidates))
+	index.looker = looker
+	index.candidates = candidates
+	_NAME_INDEXES[key] = index
+	location = getattr(looker, "location", None)
+	index.deps = {obj.pk for obj in (looker, location, *candidates) if obj}
+	for pk in index.deps:
+		_NAME_INDEX_DEPS[pk].add(key)
+	if len(_NAME_INDEXES) > _NAME_INDEX_SIZE:
+		old_key, old_index = _NAME_INDEXES.popitem(last=False)
+		for pk in old_index.deps:
+			_NAME_INDEX_DEPS[pk].discard(old_key)
+	return index
+
+def invalidate_names(obj):
+	"""
+	Drop any cached name indexes which depend on obj, as a looker, a
+	location or a candidate.
+	"""
+	# how it looks depends on the same names
+	touch_appearance(obj)
+	if not obj or not (keys := _NAME_INDEX_DEPS.pop(obj.pk, None)):
+		return
+	for key in keys:
+		_NAME_INDEXES.pop(key, None)
+
+class NameAliasHandler(AliasHandler):
+	"""
+	An AliasHandler which drops the cached name indexes that include the
+	object's aliases whenever they change.
+	"""
+
+	def add(self, key=None, category=None, data=None):
+		super().add(key=key, category=category, data=data)
+		invalidate_names(self.obj)
+
+	def remove(self, key=None, category=None):
+		super().remove(key=key, category=category)
+		invalidate_names(self.obj)
+
+	def clear(self, category=None):
+		super().clear(category=category)
+		invalidate_names(self.obj)
+
+
 # emoting mechanisms
 def _get_case_ref(string):
     """
@@ -170,6 +341,27 @@ def parse_language(speaker, emote):
 	return emote, mapping
 
 
+def _emote_candidates(caller, candidates):
+	"""
+	The (obj, name) pairs which can be referenced in an emote by caller.
+	"""
+	candidate_map = []
+	for obj in candidates:
+		if obj == caller:
+			candidate_map.append( (obj, obj.key) )
+			continue
+		# check if sender has any recogs for obj and add
+		if hasattr(caller, "recog"):
+			if recog := caller.recog.get(obj):
+				candidate_map.append((obj, recog))
+		# check if obj has an sdesc and add
+		if hasattr(obj, "sdesc"):
+			candidate_map.append((obj, obj.sdesc.get(strip=True)))
+		# if no sdesc, include key plus aliases instead
+		else:
+			candidate_map.extend( [(obj, obj.key)] + [(obj, alias) for alias in obj.aliases.all()] )
+	return candidate_map
+
 def parse_sdesc_markers(caller, candidates, emote, case_sensitive=True, **kwargs):
 	"""
 	Replaces user-friendly @ markers to embedded object references for formatting.
@@ -202,21 +394,7 @@ def parse_sdesc_markers(caller, candidates, emote, case_sensitive=True, **kwargs
 	"""
 	# build a list of candidates with all possible referrable names
 	# include 'me' keyword for self-ref
-	candidate_map = []
-	for obj in candidates:
-		if obj == caller:
-			candidate_map.append( (obj, obj.key) )
-			continue
-		# check if sender has any recogs for obj and add
-		if hasattr(caller, "recog"):
-			if recog := caller.recog.get(obj):
-				candidate_map.append((obj, recog))
-		# check if obj has an sdesc and add
-		if hasattr(obj, "sdesc"):
-			candidate_map.append((obj, obj.sdesc.get(strip=True)))
-		# if no sdesc, include key plus aliases instead
-		else:
-			candidate_map.extend( [(obj, obj.key)] + [(obj, alias) for alias in obj.aliases.all()] )
+	names = get_name_index(caller, candidates, _emote_candidates, kind="emote")
 
 	# escape mapping syntax on the form {#id} if it exists already in emote,
 	# if so it is replaced with just "id".
@@ -264,27 +442,13 @@ def parse_sdesc_markers(caller, candidates, emote, case_sensitive=True, **kwargs
 		
 		# to find the longest match, we start from the marker and lengthen the 
 		# match query one word at a time.
-		rquery = r''
-		bestmatches = []
 		# preserve punctuation when splitting
 		tail = re.split(r'(\W)', tail)
-		iend = 0
-		for i, item in enumerate(tail):
-			# don't add non-word characters to the search query
-			if not item.isalpha():
-				continue
-			# rquery = "".join([r"\b(" + re.escape(word) + r").*" for word in word_list])
-			rquery += r"(\b" + re.escape(item) + "|" + re.escape(item) + r"\b).*"
-			# match candidates against the current set of words
-			matches = ((re.search(rquery, text, _RE_FLAGS), obj, text) for obj, text in candidate_map)
-			matches = [(obj, match.group()) for match, obj, text in matches if match]
-			if len(matches) == 0:
-				# no matches at this length, keep previous iteration as best
-				break
-			# since this is the longest match so far, set latest match set as best matches
-			bestmatches = matches
-			# save current index as end point of matched text
-			iend = i
+		# don't add non-word characters to the search query
+		words = [ (i, item) for i, item in enumerate(tail) if item.isalpha() ]
+		bestmatches, count = names.match([item for _, item in words])
+		# save the index of the last matched word as the end point of matched text
+		iend = words[count-1][0] if count else 0
 
 		# save search string
 		matched_text = "".join(tail[:iend+1])
@@ -307,10 +471,9 @@ def parse_sdesc_markers(caller, candidates, emote, case_sensitive=True, **kwargs
 		elif nmatches == 1:
 			obj = objlist[0]
 		elif nmatches == 0:
-			_, cand_words = zip(*candidate_map)
-			suggestions = string_suggestions(matched_text, cand_words)
+			suggestions = string_suggestions(matched_text, names.names())
 			if suggestions and caller.is_connected:
-				objlist = [ tup[0] for tup in candidate_map if tup[1] in suggestions ]
+				objlist = [ tup[0] for tup in names.entries if tup[1] in suggestions ]
 				obj = yield from _do_multimatch(caller, matched_text, objlist)
 				if not obj:
 					errors.append("Emote cancelled.")
@@ -385,6 +548,38 @@ def send(sender, message, receivers=None, include=None, volume=1, **kwargs):
 	else:
 		_do_emote(sender.baseobj.location, base_emote, volume)
 
+@interactive
+def send_many(sender, batch, **kwargs):
+	"""
+	Sends several emotes from one sender, each to its own receivers.
+
+	References are matched against every receiver in the batch through a single
+	name index, and a message repeated in the batch is only parsed once.
+
+	Args:
+		sender (Object): the one sending the emotes
+		batch (iterable): (message, receivers) tuples. Empty receivers are skipped.
+	"""
+	batch = [ (message, list(receivers)) for message, receivers in batch if receivers ]
+	# keep the order for the name index, but only once each
+	candidates = list(dict.fromkeys(obj for _, receivers in batch for obj in receivers))
+
+	parsed = {}
+	for message, receivers in batch:
+		if message not in parsed:
+			base_emote, obj_mapping = yield from parse_sdesc_markers(sender, candidates, message)
+			if not base_emote:
+				return
+			try:
+				base_emote, language_mapping = parse_language(sender, base_emote)
+			except (EmoteError, LanguageError) as err:
+				sender.msg(str(err))
+				return
+			parsed[message] = (base_emote, obj_mapping, language_mapping)
+		base_emote, obj_mapping, language_mapping = parsed[message]
+		# process_emote adds the sender to the mapping
+		process_emote(sender, receivers, base_emote, dict(obj_mapping), language_mapping, **kwargs)
+
 def process_emote(
 		caller, receivers, emote, obj_mapping, language_mapping, include=None, exclude=[],
 		outkwargs=None, case_sensitive=True, anonymous_add="first", **kwargs
@@ -452,38 +647,95 @@ def process_emote(
 	# we escape the object mappings since we'll do the language ones first
 	emote = _RE_REF.sub(r"{{#\1}}", emote)
 
+	# receivers who would see the same thing share one rendering
+	mapped = set(obj_mapping.values())
+	mapped |= {obj.baseobj for obj in mapped if hasattr(obj, "baseobj")}
+	renders = {}
+
 	# broadcast emote to everyone
 	for receiver in receivers:
 		if receiver in exclude:
 			continue
-		# first handle the language mapping, which always produce different keys ##nn
-		if hasattr(receiver, "process_language") and callable(receiver.process_language):
-			receiver_lang_mapping = {
-				key: receiver.process_language(saytext, sender, langname)
-				for key, (langname, saytext) in language_mapping.items()
-			}
-		else:
-			receiver_lang_mapping = {
-				key: saytext for key, (langname, saytext) in language_mapping.items()
-			}
-		# map the language {##num} markers. This will convert the escaped sdesc markers on
-		# the form {{#num}} to {#num} markers ready to sdesc-map in the next step.
-		sendemote = emote.format(**receiver_lang_mapping)
-
-		# map the ref keys to sdescs
-		receiver_sdesc_mapping = dict(
-			(
-				ref,
-				obj.get_display_name(receiver, ref=ref, from_obj=sender, # why does get_display_name get `from_obj` ???
-					noid=True, article=True, link=True, strip=True, contents=False
-				),
-			)
-			for ref, obj in obj_mapping.items()
-		)
+		view = _emote_view_key(receiver, obj_mapping, mapped)
+		if view not in renders:
+			renders[view] = _render_emote(receiver, sender, emote, obj_mapping, language_mapping)
 
 		# do the template replacement of the sdesc/recog {#num} markers
-		receiver.msg(text=(sendemote.format(**receiver_sdesc_mapping), outkwargs), from_obj=sender)
+		receiver.msg(text=(renders[view], outkwargs), from_obj=sender)
+
+
+def _emote_view_key(receiver, obj_mapping, mapped):
+	"""
+	A key which is identical for any two receivers who would see the
+	same rendering of an emote: same class, same recogs and same
+	visibility of everything referenced.
+	"""
+	if receiver in mapped:
+		# referenced receivers see themselves differently
+		return (id(receiver),)
+	recog = receiver.recog if hasattr(receiver, "recog") else None
+	return (
+		type(receiver),
+		bool(getattr(receiver, "account", None)),
+		tuple(recog.get(obj) if recog else None for obj in mapped),
+		tuple(obj.is_visible(receiver) for obj in obj_mapping.values()),
+	)
+
+
+def _render_emote(receiver, sender, emote, obj_mapping, language_mapping):
+	"""
+	Render the emote as seen by receiver.
+	"""
+	# first handle the language mapping, which always produce different keys ##nn
+	if hasattr(receiver, "process_language") and callable(receiver.process_language):
+		receiver_lang_mapping = {
+			key: receiver.process_language(saytext, sender, langname)
+			for key, (langname, saytext) in language_mapping.items()
+		}
+	else:
+		receiver_lang_mapping = {
+			key: saytext for key, (langname, saytext) in language_mapping.items()
+		}
+	# map the language {##num} markers. This will convert the escaped sdesc markers on
+	# the form {{#num}} to {#num} markers ready to sdesc-map in the next step.
+	sendemote = emote.format(**receiver_lang_mapping)
+
+	# map the ref keys to sdescs
+	receiver_sdesc_mapping = dict(
+		(
+			ref,
+			obj.get_display_name(receiver, ref=ref, from_obj=sender, # why does get_display_name get `from_obj` ???
+				noid=True, article=True, link=True, strip=True, contents=False
+			),
+		)
+		for ref, obj in obj_mapping.items()
+	)
 
+	return sendemote.format(**receiver_sdesc_mapping)
+
+
+def _search_candidates(sender, candidates):
+	"""
+	The (obj, name) pairs which sender can search for.
+	"""
+	candidate_map = []
+	for obj in candidates:
+		if obj == sender:
+			candidate_map.append( (obj, obj.key) )
+			continue
+		# check if sender has any recogs for obj and add
+		if hasattr(sender, "recog"):
+			if recog := sender.recog.get(obj):
+				candidate_map.append((obj, recog))
+		# check if obj has an sdesc and add
+		if hasattr(obj, "sdesc"):
+			candidate_map.append((obj, obj.sdesc.get(sender, strip=True)))
+		# if no sdesc, use key instead
+		else:
+			candidate_map.append( (obj, obj.key) )
+		# add in aliases
+		candidate_map.extend( [(obj, alias) for alias in obj.aliases.all()] )
+	return candidate_map
 
 def ic_search(sender, candidates, search_term, partial=False, exact=False, **kwargs):
 	"""
@@ -518,51 +770,22 @@ def ic_search(sender, candidates, search_term, partial=False, exact=False, **kwa
 
 	# build a list of candidates with all possible referrable names
 	# include 'me' keyword for self-ref
-	candidate_map = []
-	for obj in candidates:
-		if obj == sender:
-			candidate_map.append( (obj, obj.key) )
-			continue
-		# check if sender has any recogs for obj and add
-		if hasattr(sender, "recog"):
-			if recog := sender.recog.get(obj):
-				candidate_map.append((obj, recog))
-		# check if obj has an sdesc and add
-		if hasattr(obj, "sdesc"):
-			candidate_map.append((obj, obj.sdesc.get(sender, strip=True)))
-		# if no sdesc, use key instead
-		else:
-			candidate_map.append( (obj, obj.key) )
-		# add in aliases
-		candidate_map.extend( [(obj, alias) for alias in obj.aliases.all()] )
+	names = get_name_index(sender, candidates, _search_candidates, kind="search")
 
 	# check for exact matches first
-	objlist = { obj for obj, name in candidate_map if name.lower().strip() == search_term.lower().strip() }
+	objlist = names.exact.get(search_term.lower().strip(), set())
 	if objlist or exact:
 		objlist = list(objlist)
 		return (objlist, '') if partial else objlist
 	# to find the longest match, we start from the beginning and lengthen the 
 	# match query one word at a time.
-	bestmatches = []
 	# preserve punctuation when splitting
 	tail = re.split(r'(\W)', search_term)
-	iend = 0
-	rquery = r''
-	for i, item in enumerate(tail):
-		# don't add non-word characters to the search query
-		if not item.isalpha():
-			continue
-		rquery += r"(\b" + re.escape(item) + "|" + re.escape(item) + r"\b).*"
-		# match candidates against the current set of words
-		matches = ((re.search(rquery, text, _RE_FLAGS), obj, text) for obj, text in candidate_map)
-		matches = [(obj, match.group(), text) for match, obj, text in matches if match]
-		if len(matches) == 0:
-			# no matches at this length, keep previous iteration as best
-			break
-		# otherwise, since this is the longest match so far, set latest match set as best matches
-		bestmatches = matches
-		# save current index as end point of matched text
-		iend = i
+	# don't add non-word characters to the search query
+	words = [ (i, item) for i, item in enumerate(tail) if item.isalpha() ]
+	bestmatches, count = names.match([item for _, item in words])
+	# save the index of the last matched word as the end point of matched text
+	iend = words[count-1][0] if count else 0
 
 	objlist = list( { match[0] for match in bestmatches } )
 
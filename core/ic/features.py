@@ -61,6 +61,8 @@ class FeatureHandler:
 		data += self.features
 		self.obj.attributes.add(self.feature_attr, data, category=_FEATURE_CAT)
 		self._cache()
+		# features make up sdescs
+		self.obj.sdesc.reset()
 
 	@property
 	def all(self):
@@ -92,7 +94,7 @@ class FeatureHandler:
 					# the location is a valid part, do we need a subtype
 					if stype := feature_dict.get("subtype"):
 						# get the right part
-						parts = [p for p in parts if p.tags.has(stype, category="subtype")]
+						parts = self.obj.parts.search(part_loc, part=True, subtype=stype)
 					# we have a valid part, check visibility
 					if not any(part.is_visible(self.obj) for part in parts):
 						# not visible, don't add it
@@ -1,12 +1,92 @@
 from collections import defaultdict
-from evennia import DefaultObject
+from evennia.objects.models import ObjectDB
+from evennia.typeclasses.attributes import Attribute
+from evennia.typeclasses.tags import TagHandler
 from evennia.utils import iter_to_str, interactive, make_iter, logger
 from evennia.utils.dbserialize import deserialize, pack_dbobj
 
 from utils.handlers import HandlerBase
+from .appearance import touch_appearance
 
 _PARTS_ATTR = "parts"
 _PARTS_CAT = "systems"
+# the tag categories the part type index is keyed on
+_TYPE_CATS = ("part", "subtype")
+# changes to these tags also invalidate what's derived from the parts
+_STATE_CATS = ("status",)
+
+class PartsIndex:
+	"""
+	Process-wide map of which objects are attached to which, so that
+	loading an object's parts doesn't need to scan the whole world.
+
+	It's built in one query from the `attached` attributes at server start
+	and kept current by the `partof` setter and deleter on `BaseObject`.
+	"""
+
+	def __init__(self):
+		self._children = defaultdict(dict)
+		self._parents = {}
+		self.loaded = False
+
+	def build(self):
+		"""
+		(Re)builds the index from the database.
+		"""
+		self._children.clear()
+		self._parents.clear()
+		attached = Attribute.objects.filter(
+				db_key="attached", db_category="systems", objectdb__isnull=False
+			).values_list("objectdb__id", "db_value")
+		for child_pk, value in attached:
+			# attached objects are stored packed, so we can get the pk without loading anything
+			if type(value) is tuple and len(value) == 4 and value[0] == "__packed_dbobj__":
+				self._link(child_pk, value[3])
+		self.loaded = True
+
+	def _link(self, child_pk, parent_pk):
+		if (old_pk := self._parents.get(child_pk)) is not None:
+			self._children[old_pk].pop(child_pk, None)
+		self._parents[child_pk] = parent_pk
+		self._children[parent_pk][child_pk] = None
+
+	def set(self, obj, parent):
+		"""
+		Record obj as being attached to parent. A parent of None removes it.
+		"""
+		if not obj.pk:
+			return
+		if parent and getattr(parent, "pk", None):
+			self._link(obj.pk, parent.pk)
+		else:
+			self.remove(obj)
+
+	def remove(self, obj):
+		"""
+		Remove obj's own attachment from the index.
+		"""
+		if (old_pk := self._parents.pop(obj.pk, None)) is not None:
+			self._children[old_pk].pop(obj.pk, None)
+
+	def discard(self, pk):
+		"""
+		Forget a deleted object entirely, both as a part and as a parent.
+		"""
+		if (old_pk := self._parents.pop(pk, None)) is not None:
+			self._children[old_pk].pop(pk, None)
+		for child_pk in self._children.pop(pk, {}):
+			self._parents.pop(child_pk, None)
+
+	def children(self, pk):
+		"""
+		Returns the pks of everything directly attached to pk.
+		"""
+		if not self.loaded:
+			self.build()
+		return list(self._children.get(pk, ()))
+
+PARTS_INDEX = PartsIndex()
+
 
 class PartsCacher:
 	"""
@@ -33,7 +113,10 @@ class PartsCacher:
 		self._pkcache = {}
 		self._pkdirect = {}
 		self._idcache = obj.__class__.__instance_cache__
-		self._typecache = defaultdict(dict)
+		self._typecache = None
+		self._types = {}
+		# caches built from the parts by other systems, dropped whenever the parts change
+		self.derived = {}
 		self.init()
 
 	def load(self):
@@ -43,11 +126,38 @@ class PartsCacher:
 		Returns:
 			Objects (list of ObjectDB)
 		"""
-		everything = DefaultObject.objects.all_family()
+		direct = self._attached_to(self.obj)
+		if self.obj.partof:
+			# subparts are only tracked by the base object
+			return direct, direct
+
+		objects = []
+		seen = {self.obj.pk}
+		queue = list(direct)
+		while queue:
+			obj = queue.pop(0)
+			if obj.pk in seen:
+				continue
+			seen.add(obj.pk)
+			objects.append(obj)
+			queue.extend(self._attached_to(obj))
+		return objects, direct
+
+	def _attached_to(self, parent):
+		"""
+		Returns the objects the index says are directly attached to parent,
+		dropping any stale entries.
+		"""
+		return [obj for obj in self._resolve(PARTS_INDEX.children(parent.pk)) if obj.attributes.get("attached", category="systems") == parent]
 
-		direct = list(obj for obj in everything if obj != self.obj and obj.partof == self.obj)
-		objects = list(obj for obj in everything if obj != self.obj and obj.baseobj == self.obj)
-		return objects+direct, direct
+	def _resolve(self, pks):
+		"""
+		Turns a list of pks into objects, using the idmapper cache where possible.
+		"""
+		found = {pk: self._idcache[pk] for pk in pks if pk in self._idcache}
+		if missing := [pk for pk in pks if pk not in found]:
+			found |= {obj.pk: obj for obj in ObjectDB.objects.filter(id__in=missing)}
+		return [found[pk] for pk in pks if pk in found]
 
 	def init(self):
 		"""
@@ -57,6 +167,10 @@ class PartsCacher:
 		objects, direct = self.load()
 		self._pkcache = {obj.pk: obj for obj in objects}
 		self._pkdirect = {obj.pk: obj for obj in direct}
+		# the type index is rebuilt on the next lookup
+		self._typecache = None
+		self._types = {}
+		self.derived.clear()
 
 	def get(self, direct=False):
 		"""
@@ -95,6 +209,9 @@ class PartsCacher:
 		self._pkcache[obj.pk] = obj
 		if obj.partof == self.obj:
 			self._pkdirect[obj.pk] = obj
+		if self._typecache is not None:
+			self._index_types(obj.pk, self._tags_of(obj))
+		self.derived.clear()
 
 	def remove(self, obj):
 		"""
@@ -107,6 +224,8 @@ class PartsCacher:
 		pk = obj.pk
 		self._pkcache.pop(pk, None)
 		self._pkdirect.pop(pk, None)
+		self._unindex_types(pk)
+		self.derived.clear()
 
 	def clear(self):
 		"""
@@ -114,9 +233,126 @@ class PartsCacher:
 
 		"""
 		self._pkcache = {}
-		self._typecache = defaultdict(dict)
 		self.init()
 
+	def find(self, part, subtype=None):
+		"""
+		Returns the cached objects with a part tag, in cache order.
+
+		Args:
+			part (str): the part tag key
+			subtype (str or list, optional): subtype tags the parts must also have
+		"""
+		if self._typecache is None:
+			self._build_types()
+		part = part.strip().lower()
+		subtypes = [ sub.strip().lower() for sub in make_iter(subtype) ] if subtype else [None]
+		pks = list(self._typecache.get((part, subtypes[0]), ()))
+		for sub in subtypes[1:]:
+			others = self._typecache.get((part, sub), {})
+			pks = [ pk for pk in pks if pk in others ]
+		try:
+			return [self._idcache[pk] for pk in pks]
+		except KeyError:
+			# the idmapper cache dropped one of them, so load it again
+			return self._resolve(pks)
+
+	def retag(self, obj):
+		"""
+		Re-indexes a cached object after its part or subtype tags changed.
+		"""
+		if self._typecache is not None and obj.pk in self._pkcache:
+			self._unindex_types(obj.pk)
+			self._index_types(obj.pk, self._tags_of(obj))
+		self.derived.clear()
+
+	def _build_types(self):
+		"""
+		Builds the (part, subtype) index over every cached object, in one query.
+		"""
+		found = defaultdict(list)
+		if pks := list(self._pkcache):
+			rows = ObjectDB.db_tags.through.objects.filter(
+					objectdb_id__in=pks, tag__db_category__in=_TYPE_CATS, tag__db_tagtype__isnull=True,
+				).values_list("objectdb_id", "tag__db_key", "tag__db_category")
+			for pk, key, category in rows:
+				found[pk].append((key, category))
+		self._typecache = defaultdict(dict)
+		self._types = {}
+		for pk in pks:
+			self._index_types(pk, found.get(pk, ()))
+		return self._typecache
+
+	def _tags_of(self, obj):
+		return [ (key, category) for category in _TYPE_CATS for key in obj.tags.get(category=category, return_list=True) ]
+
+	def _index_types(self, pk, tags):
+		parts = [ key for key, category in tags if category == "part" ]
+		subtypes = [None] + [ key for key, category in tags if category == "subtype" ]
+		keys = self._types[pk] = [ (part, sub) for part in parts for sub in subtypes ]
+		for key in keys:
+			self._typecache[key][pk] = None
+
+	def _unindex_types(self, pk):
+		for key in self._types.pop(pk, ()):
+			if (pks := self._typecache.get(key)) is not None:
+				pks.pop(pk, None)
+
+
+class PartTagHandler(TagHandler):
+	"""
+	A TagHandler which keeps the part type indexes of whatever the object is
+	attached to in step with its part and subtype tags, and drops the derived
+	part caches when its status changes.
+	"""
+
+	def add(self, key=None, category=None, data=None):
+		super().add(key=key, category=category, data=data)
+		touch_appearance(self.obj)
+		if key and category:
+			self._changed(category)
+
+	def remove(self, key=None, category=None):
+		super().remove(key=key, category=category)
+		touch_appearance(self.obj)
+		# without a key, removing goes through `clear`
+		if key and category:
+			self._changed(category)
+
+	def clear(self, category=None):
+		super().clear(category=category)
+		touch_appearance(self.obj)
+		if not category:
+			self._retag()
+			self._touch()
+		else:
+			self._changed(category)
+
+	def _changed(self, category):
+		category = category.strip().lower()
+		if category in _TYPE_CATS:
+			self._retag()
+		elif category in _STATE_CATS:
+			self._touch()
+
+	def _retag(self):
+		obj = self.obj
+		if not (source := obj.attributes.get("attached", category="systems")):
+			return
+		source.parts_cache.retag(obj)
+		if (base := obj.baseobj) != source:
+			base.parts_cache.retag(obj)
+
+	def _touch(self):
+		obj = self.obj
+		targets = [obj]
+		if source := obj.attributes.get("attached", category="systems"):
+			targets += [source, obj.baseobj]
+		for target in targets:
+			# nothing's derived from a parts cache that hasn't been loaded
+			if cache := target.__dict__.get("parts_cache"):
+				cache.derived.clear()
+
 
 class PartsHandler(HandlerBase):
 	# TODO: remove buff mods from parts that they're inheriting from being attached to the base
@@ -125,11 +361,7 @@ class PartsHandler(HandlerBase):
 	@property
 	def missing(self):
 		if not hasattr(self, "_missing"):
-			parts = self.obj.parts_cache.get()
-			missing = []
-			for val in self.required:
-				if not any([obj.tags.has(val, category='part') for obj in parts]):
-					missing.append(val)
+			missing = [ val for val in self.required if not self.obj.parts_cache.find(val) ]
 			self._missing = missing
 		
 		return self._missing
@@ -310,6 +542,7 @@ class PartsHandler(HandlerBase):
 		if "part of" not in self.obj.sdesc.get():
 			# FIXME: make this work properly wihout overriding existing prefixes
 			self.obj.db._sdesc_prefix = "part of"
+			self.obj.sdesc.update()
 
 		self.obj.attributes.add("_parts_chain", first, category="systems")
 		if len(second) == 1:
@@ -409,10 +642,14 @@ class PartsHandler(HandlerBase):
 
 		return True
 
-	def search(self, search_term, part=False):
-		candidates = self.all()
+	def search(self, search_term, part=False, subtype=None):
+		"""
+		Finds attached objects by name, or by part tag if `part` is True.
+
+		Keyword args:
+			part (bool): search by part tag instead of by name
+			subtype (str or list): for part searches, subtype tags the parts must also have
+		"""
 		if part:
-			obj_list = [ obj for obj in candidates if obj.tags.has(search_term, category='part')]
-		else:
-			obj_list = self.obj.search(search_term, candidates=candidates, quiet=True)
-		return obj_list
+			return self.obj.parts_cache.find(search_term, subtype=subtype)
+		return self.obj.search(search_term, candidates=self.all(), quiet=True)
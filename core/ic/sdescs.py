@@ -7,6 +7,8 @@ from evennia.utils.utils import is_iter, iter_to_str
 from utils.strmanip import strip_extra_spaces
 from utils.colors import strip_ansi
 
+from .emotes import invalidate_names
+
 _VOICE_PARTS = ["quality", "style", "voice"]
 
 class SdescError(Exception):
@@ -16,11 +18,16 @@ class RecogError(Exception):
 	pass
 
 
-# TODO: this needs to be updated to dynamically load changed feature attributes again
+# how often SdescHandler.get was served from cache vs recalculated
+CACHE_STATS = {"hits": 0, "misses": 0}
 
 class SdescHandler:
 	"""
 	This Handler wraps all operations with sdescs.
+
+	The sdesc is calculated once and cached until `reset` is called, which
+	happens whenever the features, the sdesc list, the build or the prefix
+	change.
 	"""
 	def __init__(self, obj):
 		"""
@@ -32,6 +39,7 @@ class SdescHandler:
 		"""
 		self.obj = obj
 		self.base_dict = None
+		self._last_sdesc = None
 		self._load()
 
 	def _load(self):
@@ -40,6 +48,7 @@ class SdescHandler:
 		"""
 		# TODO: figure out how to make this only 2 attribute fetches, maybe?
 		self.sdesc = None
+		self._stripped = None
 		self.slist = deserialize(self.obj.attributes.get("_sdesc_list",[], category="systems"))
 		self.base_dict = deserialize(self.obj.attributes.get("build",{}, category="systems"))
 		self._prefix = self.obj.attributes.get("_sdesc_prefix","")
@@ -75,6 +84,14 @@ class SdescHandler:
 
 		return self.get()
 
+	def reset(self):
+		"""
+		Mark the cached sdesc as out of date, to be recalculated on next access.
+		"""
+		self.sdesc = None
+		self._stripped = None
+		invalidate_names(self.obj)
+
 	def update(self):
 		self._load()
 		if self.slist:
@@ -118,16 +135,25 @@ class SdescHandler:
 		if self._prefix:
 			sdesc = f"{self._prefix} {sdesc}" 
 		self.sdesc = sdesc
+		if sdesc != self._last_sdesc:
+			self._last_sdesc = sdesc
+			invalidate_names(self.obj)
 
 
 	def get(self, viewer=None, strip=False, **kwargs):
 		"""
-		gaaaaaaaaaaaaaaaahhhhhhhhhhhh
+		Returns the sdesc, recalculating it only if it's been reset.
 		"""
-		# if not self.sdesc:
-		# 	self.update()
-		self.update() # FIXME
-		return strip_ansi(self.sdesc) if strip else self.sdesc
+		if self.sdesc is None:
+			CACHE_STATS["misses"] += 1
+			self.update()
+		else:
+			CACHE_STATS["hits"] += 1
+		if not strip:
+			return self.sdesc
+		if self._stripped is None:
+			self._stripped = strip_ansi(self.sdesc)
+		return self._stripped
 
 
 class VdescHandler:
@@ -264,6 +290,7 @@ class RecogHandler:
 
 		# mapping #dbref:obj
 		self.obj2recog[obj] = cleaned_recog
+		invalidate_names(self.obj)
 		return cleaned_recog
 
 	def get(self, obj):
@@ -312,3 +339,4 @@ class RecogHandler:
 		if obj in self.obj2recog:
 			del self.obj2recog[obj]
 			self._save()
+			invalidate_names(self.obj)
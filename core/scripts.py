@@ -1,6 +1,6 @@
 from evennia.scripts.scripts import DefaultScript
 
-from base_systems.maps.building import get_by_uid
+from base_systems.maps.building import get_by_uid, UID_REGISTRY
 from utils.table import EvTable
 
 
@@ -14,6 +14,14 @@ class Script(DefaultScript):
 		if get_by_uid(value):
 			raise KeyError(f"Object {value} already exists.")
 		self.attributes.add('uid', value, category="systems")
+		UID_REGISTRY.set(self, value)
+
+	def delete(self):
+		pk = self.pk
+		if not super().delete():
+			return False
+		UID_REGISTRY.discard(self.__dbclass__, pk)
+		return True
 
 
 
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+from evennia.utils.dbserialize import dbunserialize
+
+
+def split_scene_content(apps, schema_editor):
+    """
+    Moves the serialized line lists out of Scene.db_content and into
+    individual SceneLine rows.
+    """
+    Scene = apps.get_model("db", "Scene")
+    SceneLine = apps.get_model("db", "SceneLine")
+    for scene in Scene.objects.exclude(db_content=""):
+        try:
+            lines = list(dbunserialize(scene.db_content))
+        except Exception:
+            # not a serialized list; keep the raw text as lines
+            lines = scene.db_content.splitlines()
+        SceneLine.objects.bulk_create(
+            SceneLine(db_scene=scene, db_index=i, db_text=str(text))
+            for i, text in enumerate(lines)
+        )
+        scene.db_content = ""
+        scene.save(update_fields=["db_content"])
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SceneLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "db_index",
+                    models.PositiveIntegerField(
+                        help_text="The position of this line in the scene.",
+                        verbose_name="index",
+                    ),
+                ),
+                ("db_text", models.TextField(blank=True, verbose_name="text")),
+                (
+                    "db_scene",
+                    models.ForeignKey(
+                        help_text="The scene this line belongs to.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="db_lines",
+                        to="db.scene",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Scene Line",
+                "verbose_name_plural": "Scene Lines",
+                "ordering": ("db_scene", "db_index"),
+                "indexes": [
+                    models.Index(
+                        fields=["db_scene", "db_index"],
+                        name="db_scenelin_db_scen_4c7a44_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(split_scene_content, migrations.RunPython.noop),
+    ]
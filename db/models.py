@@ -3,7 +3,6 @@ from evennia.locks.lockhandler import LockHandler
 from evennia.typeclasses.tags import Tag, TagHandler
 from evennia.utils.idmapper.models import SharedMemoryModel
 from evennia.utils.utils import crop, lazy_property
-from evennia.utils.dbserialize import dbunserialize
 
 from .managers import ReportManager, ArticleManager, SceneManager
 
@@ -214,53 +213,86 @@ class Article(Note):
 
 
 
+class SceneLine(models.Model):
+	"""
+	A single line of a scene log. Lines are appended with increasing
+	indexes, so logging a line never rewrites the rest of the scene.
+	"""
+
+	class Meta:
+		verbose_name = "Scene Line"
+		verbose_name_plural = "Scene Lines"
+		ordering = ("db_scene", "db_index")
+		indexes = [models.Index(fields=("db_scene", "db_index"))]
+
+	db_scene = models.ForeignKey(
+		"Scene",
+		related_name="db_lines",
+		on_delete=models.CASCADE,
+		help_text="The scene this line belongs to.",
+	)
+	db_index = models.PositiveIntegerField("index", help_text="The position of this line in the scene.")
+	db_text = models.TextField("text", blank=True)
+
+
 class SceneLinesHandler:
-	lines = []
-	
+	"""
+	Manages the lines of a scene, stored as individual SceneLine rows.
+	"""
+
 	def __init__(self, scene):
 		self.scene = scene
-		lines = scene.db_content
-		self.lines = dbunserialize(lines)
-	
-	def serialize(self):
-		return dbserialize(self.lines)
+		self._count = None
+
+	@property
+	def _query(self):
+		return SceneLine.objects.filter(db_scene=self.scene)
+
+	def __len__(self):
+		if self._count is None:
+			self._count = self._query.count()
+		return self._count
+
+	def all(self):
+		"""returns all of the lines in order"""
+		return list(self._query.values_list("db_text", flat=True))
 
 	def add(self, message, **kwargs):
 		"""Add a new line or lines to the scene"""
-		if type(message) is list:
-			self.lines += message
-		else:
-			self.lines.append(message)
-		self.save()
-	
-	def save(self):
-		self.scene.db_content = self.serialize()
-		self.scene.save()
+		messages = message if type(message) is list else [message]
+		start = len(self)
+		SceneLine.objects.bulk_create(
+			SceneLine(db_scene=self.scene, db_index=start+i, db_text=text) for i, text in enumerate(messages)
+		)
+		self._count = start + len(messages)
 
 	def find(self, search_term, **kwargs):
 		"""returns the most recent matching line"""
-		for i, line in reversed(list(enumerate(self.lines))):
-			if search_term.lower() in line.lower():
-				return i
-	
+		return self._query.filter(db_text__icontains=search_term).order_by("-db_index").values_list("db_index", flat=True).first()
+
 	def get(self, index):
 		"""gets the line at a specific index"""
-		return self.lines[index]
+		if index < 0:
+			index += len(self)
+		if (line := self._query.filter(db_index=index).values_list("db_text", flat=True).first()) is None:
+			raise IndexError("scene line index out of range")
+		return line
 
 	def crop(self, start_index, end_index=-1):
 		"""cuts out the lines from start_index to end_index"""
 		if end_index < 0:
-			self.lines = self.lines[:start_index]
+			self._query.filter(db_index__gte=start_index).delete()
 
 		elif start_index < end_index:
 			# TODO: log this to admin logs
-			cropped = self.lines[start_index:end_index]
-			self.lines = self.lines[:start_index] + self.lines[end_index:]
-		
+			self._query.filter(db_index__gte=start_index, db_index__lt=end_index).delete()
+			# close the gap
+			self._query.filter(db_index__gte=end_index).update(db_index=models.F("db_index") - (end_index-start_index))
+
 		else:
 			raise ValueError('start_index must be smaller than end_index')
-		
-		self.save()
+
+		self._count = None
 
 
 class Scene(Note):
@@ -16,9 +16,13 @@ at_server_cold_start()
 at_server_cold_stop()
 
 """
-from evennia import ObjectDB
 from evennia.utils import logger
-from base_systems.maps.pathing import build_graph
+from base_systems.maps.pathing import load_graph, save_graph
+from core.ic.parts import PARTS_INDEX
+from base_systems.maps.building import UID_REGISTRY
+from utils.handlers import HANDLER_WRITES
+from utils.startup import run_phases, start_objects, startup_objects
+from base_systems.effects.timers import EFFECT_TIMERS
 
 def at_server_init():
 	"""
@@ -40,11 +44,12 @@ def at_server_start():
 	This is called every time the server starts up, regardless of
 	how it was shut down.
 	"""
-#	logger.log_msg(ObjectDB.objects.all())
-	for obj in ObjectDB.objects.all():
-		if hasattr(obj, "at_server_start"):
-			obj.at_server_start()
-	build_graph()
+	run_phases("server startup", (
+		("parts index", PARTS_INDEX.build),
+		("uid registry", UID_REGISTRY.build),
+		("objects", start_objects),
+		("map graph", load_graph),
+	))
 
 
 def at_server_stop():
@@ -52,9 +57,10 @@ def at_server_stop():
 	This is called just before the server is shut down, regardless
 	of it is for a reload, reset or shutdown.
 	"""
-	for obj in ObjectDB.objects.all():
-		if hasattr(obj, "effects"):
-			obj.effects.save()
+	# effect handlers that ticked since their last write are the only dirty ones
+	EFFECT_TIMERS.flush()
+	HANDLER_WRITES.flush()
+	save_graph()
 
 
 def at_server_reload_start():
@@ -85,7 +91,7 @@ def at_server_cold_stop():
 	reset.
 	"""
 	# Clear all queued actions
-	from base_systems.characters.base import Character
-	for obj in Character.objects.all_family():
-		obj.actions.clear(shutdown=True)
+	for obj in startup_objects("actions"):
+		if hasattr(obj, "actions"):
+			obj.actions.clear(shutdown=True)
 
@@ -222,6 +222,9 @@ SSL_PROTOCOL_CLASS = "server.portal.telnet.SSLProtocol"
 
 TRAIT_CLASS_PATHS = ["systems.skills.traits.DescTrait"]
 
+# Batch the attribute writes of handlers with write_behind set, once per reactor turn
+HANDLER_WRITE_BEHIND = True
+
 
 ######################################################################
 # Connection Wizard settings and data
@@ -27,4 +27,7 @@ DATABASES = {
 PASSWORD_HASHERS = ("django.contrib.auth.hashers.MD5PasswordHasher",)
 
 # Disable Django's built-in logging.
-LOGGING = {}
\ No newline at end of file
+LOGGING = {}
+
+# Write handler data straight through, since there's no reactor to flush it.
+HANDLER_WRITE_BEHIND = False
@@ -296,6 +296,7 @@ class WitchAbilities(Behavior):
 					if key in obj_opts:
 						build[key] = obj_opts[key]
 				fam.attributes.add('build', build, category="systems")
+				fam.sdesc.update()
 			else:
 				famname = obj_opts.pop('key', obj_opts.pop('name', 'familiar'))
 				fam = create_object(
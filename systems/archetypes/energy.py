@@ -65,3 +65,10 @@ class VampireLifeHandler:
 	def recover(self, **kwargs):
 		"""vampires can't naturally recover energy"""
 		return True
+
+	def settle(self, **kwargs):
+		"""vampires can't naturally recover energy"""
+		return True
+
+	def schedule(self):
+		pass
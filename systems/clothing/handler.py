@@ -83,10 +83,7 @@ class ClothingHandler(HandlerBase):
 		covered_parts = []
 		for cov in obj.tags.get(category="parts_coverage", return_list=True):
 			part, *subs = cov.split(',', maxsplit=1)
-			result = self.obj.parts.search(part, part=True)
-			if subs:
-				result = [p for p in result if p.tags.has(subs, category='subtype')]
-			covered_parts += result
+			covered_parts += self.obj.parts.search(part, part=True, subtype=subs)
 		return covered_parts
 		
 
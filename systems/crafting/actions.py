@@ -8,6 +8,7 @@ from base_systems.prototypes.spawning import spawn
 from core.ic.base import BaseObject
 from base_systems.actions.base import Action, InterruptAction
 from data.recipes import RECIPE_DICTS
+from systems.crafting.index import MaterialIndex
 from utils.colors import get_name_from_rgb, rgb_to_hex, strip_ansi
 from utils.menus import FormatEvMenu
 from utils.strmanip import numbered_name, strip_extra_spaces
@@ -27,11 +28,9 @@ class AssembleAction(Action):
 		super().__init__(**kwargs)
 
 	def _get_base_obj(self, base, candidates):
-		base_cands = [obj for obj in candidates if obj.tags.has(base, category="recipe_key")]
-		if len(base_cands) <= 0:
+		if not (base_obj := candidates.first(base, "recipe_key")):
 			self.actor.msg("You don't have enough ingredients for that.") 
 			return
-		base_obj = base_cands[0]
 		base_obj.location = self.actor
 
 		return base_obj
@@ -39,29 +38,27 @@ class AssembleAction(Action):
 	def _get_addon_objs(self, addon_list, candidates):
 		add_objs = []
 		for addon in addon_list:
-			add_cands  = [obj for obj in candidates if (obj.tags.has(addon, category="recipe_key") or obj.tags.has(addon, category="craft_material")) and obj not in add_objs]
-			if len(add_cands) <= 0:
+			if not (add_obj := candidates.first(addon, "recipe_key", "craft_material")):
 				self.actor.msg("You don't have enough pieces for that.") 
 				return
-			add_objs.append(add_cands[0])
+			candidates.use(add_obj)
+			add_objs.append(add_obj)
 		
 		return add_objs
 
 	def start(self, *args, **kwargs):
 		candidates = [obj for obj in self.actor.contents + self.actor.location.contents if
 		              obj.at_pre_craft(self.actor) and obj not in self.actor.clothing.all]
-		candidate_mats = [obj for obj in candidates if obj.tags.has(category="craft_material")]
-		candidate_tools = [obj for obj in candidates if obj.tags.has(category="craft_tool")]
 
 		reserved = self.actor.ndb.craft_pieces or []
-		candidates = reserved + candidates
+		candidates = MaterialIndex(reserved + candidates)
 
 		base = self.recipe["base"].lower()
 		adds_list = [ add.lower() for add in self.recipe["adds"] ]
 		self.duration = 2
 		if not (base_obj := self._get_base_obj(base, candidates)):
 			return
-		candidates.remove(base_obj)
+		candidates.use(base_obj)
 		if not (addon_objs := self._get_addon_objs(adds_list, candidates)):
 			return
 		self.base_obj = base_obj
@@ -153,25 +150,23 @@ class CraftAction(Action):
 		self.i = 0
 		candidates = [obj for obj in self.actor.contents + self.actor.location.contents if
 		              obj.at_pre_craft(self.actor) and obj not in self.actor.clothing.all]
-		candidate_mats = [obj for obj in candidates if obj.tags.has(category="craft_material")]
-		candidate_tools = [obj for obj in candidates if obj.tags.has(category="craft_tool")]
-
 		ingredients = [obj for obj in self.ingredients if obj.at_pre_craft(self.actor)]
-		candidate_mats = ingredients + candidate_mats
+		index = MaterialIndex(ingredients + candidates)
+		candidate_mats = [obj for obj in candidates if index.has(obj, category="craft_material")]
+		candidate_tools = [obj for obj in candidates if index.has(obj, category="craft_tool")]
 
-		mat_list = candidate_mats
-		tool_list = candidate_tools
+		mat_index = index.select(ingredients + candidate_mats)
+		tool_index = index.select(candidate_tools)
 		reserved = self.actor.ndb.craft_pieces or []
 
 		recipe_key = self.recipe['recipe']
 		recipe = self.recipe
 
-		candidate_pieces = [obj for obj in mat_list if obj.tags.has(recipe_key, category="recipe_key")]
-		for obj in candidate_pieces:
+		for obj in list(mat_index.find(recipe_key, "recipe_key")):
 			if len(reserved) >= self.quantity:
 				break
 			reserved.append(obj)
-			mat_list.remove(obj)
+			mat_index.use(obj)
 
 		if count := len(reserved):
 			res_names = Counter([obj.sdesc.get() for obj in reserved])
@@ -221,11 +216,10 @@ class CraftAction(Action):
 	#	crafter.msg(f"getting tools {tool_tags}")
 		tools = []
 		for tool_type in tool_tags:
-			tool_cands = [obj for obj in tool_list if obj.tags.has(tool_type, category="craft_tool")]
-	#		crafter.msg(f"candidates for {tool_type}: {tool_cands}")
-			if len(tool_cands) > 0:
+	#		crafter.msg(f"candidates for {tool_type}")
+			if tool := tool_index.first(tool_type, "craft_tool"):
 	#			crafter.msg(f"got our {tool_type}")
-				tools.append(tool_cands[0])
+				tools.append(tool)
 			else:
 	#			crafter.msg("no {tool_type} found")
 				self.actor.msg(f"You don't have any {tool_type} available.")
@@ -236,8 +230,7 @@ class CraftAction(Action):
 		mat_names = []
 		for mat_type, quant, portion, visible in ingredients:
 			quant = quant*self.quantity
-			ingr_obj = [obj for obj in mat_list if obj.tags.has(mat_type, category="craft_material")]
-			for obj in ingr_obj:
+			for obj in mat_index.find(mat_type, "craft_material"):
 				if visible:
 					for mat in obj.materials.all:
 						mat_name = obj.materials.get(mat)
@@ -3,15 +3,17 @@ Automation of crafted objects, for code-level building.
 """
 from collections import Counter
 from copy import copy
+from itertools import islice
 from random import choice, choices
 from evennia import ObjectDB
 from evennia.utils import delay, logger, iter_to_str
 from base_systems.prototypes.spawning import spawn
 from core.ic.base import BaseObject
+from systems.crafting.index import MaterialIndex
 
 from data.recipes import RECIPE_DICTS
 from data import materials
-from utils.colors import get_name_from_rgb
+from utils.colors import get_names_from_rgb
 
 ##############################################
 #			   Recipes
@@ -30,39 +32,34 @@ def assemble(recipe, object_list):
 	count = recipe.get('quantity',1)
 	# logger.log_msg(f"assembling {base} from {iter_to_str(adds_list)}")
 
-	base_cands = [obj for obj in object_list if obj.tags.has(base, category="recipe_key")]
-	filtered_bases = []
-	for base_cand in base_cands:
+	index = MaterialIndex(object_list)
+
+	def _needs_addons(base_cand):
 		if not (base_parts := base_cand.parts.all()):
-			filtered_bases.append(base_cand)
-			continue
+			return True
 		accounted_for = []
 		for addon in adds_list:
 			if any(obj.tags.has(addon, category='recipe_key') for obj in base_parts):
 				# this addon is already accounted for
 				accounted_for.append(addon)
-		if len(adds_list) > len(accounted_for):
-			filtered_bases.append(base_cand)
+		return len(adds_list) > len(accounted_for)
 
-	for i in range(min(count, len(filtered_bases))):
-		base_obj = filtered_bases[i]
+	# only check as many bases as will be used
+	filtered_bases = list(islice(filter(_needs_addons, index.find(base, "recipe_key")), count))
+
+	for base_obj in filtered_bases:
 		# TODO: this will require a special SHAPE recipe type to do right so parts can be shaped
 		if shape := recipe.get('shape'):
 			base_obj.db.piece = f"{shape} {base_obj.db.piece}"
-		subtypes = base_obj.tags.get(category="subtypes", return_list=True)
+		subtypes = [ (sub, "subtypes") for sub in index.tags(base_obj, "subtypes") ]
 
 		add_objs = []
 		for addon in adds_list:
-			addon = addon.lower()
-			add_cands  = [obj for obj in object_list
-										if (obj.tags.has(addon, category="recipe_key") or obj.tags.has(addon, category="craft_material"))
-										and obj not in add_objs]
-			if subtypes:
-				add_cands = [ obj for obj in add_cands if all(obj.tags.has(subtypes, category="subtypes", return_list=True)) ]
-			if not add_cands:
+			if not (add_obj := index.first(addon, "recipe_key", "craft_material", require=subtypes)):
 				logger.log_err(f"Not enough candidates for {addon} - current picks are {add_objs}")
 				return None
-			add_objs.append(add_cands[0])
+			index.use(add_obj)
+			add_objs.append(add_obj)
 		
 		materials = base_obj.materials.get("all", as_data=True)
 		for obj in add_objs:
@@ -103,6 +100,8 @@ def craft(recipe_dict, material_dict, object_list):
 	_ = recipe.pop("tools","")
 	ingredients = recipe.pop("ingredients",[])
 	material_list = []
+	# materials still needing a color word, named together once they're all picked
+	to_name = []
 	for ingredient in ingredients:
 		invisible = not ingredient.visible
 		if not (materials := material_dict.get(ingredient.type,[])):
@@ -119,17 +118,21 @@ def craft(recipe_dict, material_dict, object_list):
 			if pigment := data.pop('pigment', None):
 				if not type(pigment[0]) is int:
 					pigment = choice(pigment)
-			if 'color' in data:
-				colorword = get_name_from_rgb(pigment) or ''
-				# set color to pigment word only if not already set to a non-empty value
-				data['color'] = data.get('color') or colorword
+			# set color to pigment word only if not already set to a non-empty value
+			if needs_name := 'color' in data and not data['color']:
+				data['color'] = ''
 			data = { prop: choice(val) if type(val) in (list, tuple) else val for prop, val in data.items() }
 			if pigment:
 				data['pigment'] = pigment
+			if needs_name and pigment:
+				to_name.append(data)
 			update_mats.append( (mat, data) )
 
 		material_list += update_mats
 
+	for data, colorword in zip(to_name, get_names_from_rgb([ data['pigment'] for data in to_name ])):
+		data['color'] = colorword or ''
+
 	quality = 3
 	quality_str = [ value for key, value in quality_dict.items() if key <= quality ][-1]
 
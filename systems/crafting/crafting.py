@@ -14,6 +14,7 @@ from utils.strmanip import strip_extra_spaces, numbered_name
 from utils.colors import strip_ansi
 
 from data.recipes import RECIPE_DICTS
+from systems.crafting.index import MaterialIndex
 
 import inflect
 
@@ -39,27 +40,25 @@ def assemble(recipe, crafter):
 #	crafter.msg(f"{base} {adds_list} {obj_list}")
 	duration = 3
 
-	base_cands = [obj for obj in obj_list if obj.tags.has(base, category="recipe_key")]
+	pieces = MaterialIndex(obj_list, categories=("recipe_key",))
+	materials = MaterialIndex(mat_list, categories=("craft_material",))
 
-#	crafter.msg(f"base candidates {base_cands}")
-
-	if len(base_cands) <= 0:
+	if not (base_obj := pieces.first(base, "recipe_key")):
 		crafter.msg("You don't have enough ingredients for that.") 
 		return -1
 
-	base_obj = base_cands[0]
 	base_obj.location = crafter
 
 	add_objs = []
 	for addon in adds_list:
 		crafter.msg(f"checking for {addon}")
-		add_cands  = [obj for obj in obj_list if obj.tags.has(addon, category="recipe_key") and obj not in add_objs]
-		add_cands += [obj for obj in mat_list if obj.tags.has(addon, category="craft_material") and obj not in add_objs]
-		crafter.msg(f"{add_cands}")
-		if len(add_cands) <= 0:
+		add_obj = pieces.first(addon, "recipe_key") or materials.first(addon, "craft_material")
+		if not add_obj:
 			crafter.msg("You don't have enough ingredients for that.") 
 			return -1
-		add_objs.append(add_cands[0])
+		pieces.use(add_obj)
+		materials.use(add_obj)
+		add_objs.append(add_obj)
 
 	for obj in add_objs:
 		obj.move_to(base_obj,quiet=True)
@@ -96,12 +95,13 @@ def craft(recipe_dict, crafter, quantity=1):
 		return -1
 	recipe = dict(recipe)
 
+	materials = MaterialIndex(mat_list, categories=("recipe_key", "craft_material"))
 	if not recipe_dict.pop("last",False):
-		candidate_pieces = [obj for obj in mat_list if obj.tags.has(recipe_key, category="recipe_key")]
-		for obj in candidate_pieces:
+		for obj in list(materials.find(recipe_key, "recipe_key")):
 			if len(reserved) >= quantity:
 				break
 			reserved.append(obj)
+			materials.use(obj)
 			crafter.ndb.craft_pieces.append(obj)
 			crafter.ndb.craft_materials.remove(obj)
 
@@ -155,12 +155,11 @@ def craft(recipe_dict, crafter, quantity=1):
 
 #	crafter.msg(f"getting tools {tool_tags}")
 	tools = []
+	tool_index = MaterialIndex(tool_list, categories=("craft_tool",))
 	for tool_type in tool_tags:
-		tool_cands = [obj for obj in tool_list if obj.tags.has(tool_type, category="craft_tool")]
-#		crafter.msg(f"candidates for {tool_type}: {tool_cands}")
-		if len(tool_cands) > 0:
+		if tool := tool_index.first(tool_type, "craft_tool"):
 #			crafter.msg(f"got our {tool_type}")
-			tools.append(tool_cands[0])
+			tools.append(tool)
 		else:
 #			crafter.msg("no {tool_type} found")
 			crafter.msg(f"You don't have any {tool_type} available.")
@@ -171,8 +170,7 @@ def craft(recipe_dict, crafter, quantity=1):
 	mat_names = []
 	for type, quant, portion, visible in ingredients:
 		quant = quant*quantity
-		ingr_obj = [obj for obj in mat_list if obj.tags.has(type, category="craft_material")]
-		for obj in ingr_obj:
+		for obj in materials.find(type, "craft_material"):
 			if visible:
 				for mat in obj.materials.all:
 					if mat not in mat_names:
@@ -0,0 +1,123 @@
+"""
+One-shot tag index over a list of crafting candidates.
+"""
+from collections import defaultdict
+from heapq import merge
+from evennia.objects.models import ObjectDB
+
+# the tag categories crafting looks up candidates by
+_CATEGORIES = ("recipe_key", "craft_material", "craft_tool", "subtypes")
+
+
+class MaterialIndex:
+	"""
+	Indexes a list of objects by their crafting tags, using a single query.
+
+	Lookups return unused objects in the order of the original list, and objects
+	are consumed from the index with `use` as they're picked.
+	"""
+	def __init__(self, objects, categories=_CATEGORIES):
+		self.categories = categories
+		self.objects = []
+		# (key, category) -> positions, in list order
+		self._by_tag = defaultdict(list)
+		# position -> {(key, category)}
+		self._tags = []
+		# pk -> positions of that object
+		self._positions = defaultdict(list)
+		self._used = set()
+		objects = list(objects)
+		found = defaultdict(set)
+		if pks := { obj.pk for obj in objects if obj.pk }:
+			rows = ObjectDB.db_tags.through.objects.filter(
+					objectdb_id__in=pks, tag__db_category__in=categories, tag__db_tagtype__isnull=True,
+				).values_list("objectdb_id", "tag__db_key", "tag__db_category")
+			for pk, key, category in rows:
+				found[pk].add((key, category))
+		for obj in objects:
+			self._append(obj, found.get(obj.pk, set()))
+
+	def __len__(self):
+		return len(self.objects) - len(self._used)
+
+	def _append(self, obj, tags):
+		pos = len(self.objects)
+		self.objects.append(obj)
+		self._tags.append(tags)
+		self._positions[obj.pk].append(pos)
+		for tag in tags:
+			self._by_tag[tag].append(pos)
+
+	def add(self, obj):
+		"""
+		Adds a new object to the end of the index, e.g. one that was just crafted.
+		"""
+		tags = set()
+		for category in self.categories:
+			tags.update( (key, category) for key in obj.tags.get(category=category, return_list=True) )
+		self._append(obj, tags)
+
+	def use(self, obj):
+		"""
+		Consumes obj, so it won't be found again.
+		"""
+		self._used.update(self._positions.get(obj.pk, ()))
+
+	def has(self, obj, key=None, category=None):
+		"""
+		Checks obj for a tag, or for any tag in the category if key is None.
+		"""
+		if not (positions := self._positions.get(obj.pk)):
+			return False
+		tags = self._tags[positions[0]]
+		if key is None:
+			return any(cat == category for _, cat in tags)
+		return (key.lower(), category) in tags
+
+	def tags(self, obj, category):
+		"""
+		Returns the keys of obj's tags in the category.
+		"""
+		if not (positions := self._positions.get(obj.pk)):
+			return []
+		return [ key for key, cat in self._tags[positions[0]] if cat == category ]
+
+	def select(self, objects):
+		"""
+		Returns a new index over objects, reusing the tags already fetched for them.
+		"""
+		index = MaterialIndex([], self.categories)
+		for obj in objects:
+			if positions := self._positions.get(obj.pk):
+				index._append(obj, self._tags[positions[0]])
+			else:
+				index.add(obj)
+		return index
+
+	def find(self, key, *categories, require=None):
+		"""
+		Yields the unused objects with the key as a tag in any of the categories.
+
+		Args:
+			key (str): the tag key
+			*categories (str): the tag categories to match in
+		Keyword args:
+			require (iterable of tuples): (key, category) tags the objects must also have
+		"""
+		key = key.lower()
+		require = set(require or ())
+		found = [ self._by_tag.get((key, category), []) for category in categories ]
+		last = None
+		for pos in merge(*found):
+			if pos == last or pos in self._used:
+				continue
+			last = pos
+			if require and not require <= self._tags[pos]:
+				continue
+			yield self.objects[pos]
+
+	def first(self, key, *categories, **kwargs):
+		"""
+		Returns the first unused match from `find`, or None.
+		"""
+		return next(self.find(key, *categories, **kwargs), None)
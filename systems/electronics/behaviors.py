@@ -1,30 +1,62 @@
 from evennia.utils import logger, iter_to_str
 from core.ic.behaviors import Behavior, NoSuchBehavior, behavior
 
+# device component -> the part tag it's found by
+_COMPONENTS = {
+	"cpu": "cpu",
+	"screen": "display_screen",
+	"simchip": "simcard",
+	"psu": "power_source",
+}
+# the key the topology is cached under on the parts cache
+_TOPOLOGY_KEY = "device"
+
+def _working(obj):
+	"""whether obj is neither disabled nor overloaded"""
+	return not any(obj.tags.has(['disabled', 'overloaded'], category='status', return_list=True))
+
+
+class DeviceTopology:
+	"""
+	The components of an electronic device and which of its parts are usable.
+
+	It's cached on the device's parts cache, which drops it whenever a part is
+	attached or detached, or the status of the device or a part changes.
+	"""
+	def __init__(self, base):
+		self.base = base
+		for attr, part in _COMPONENTS.items():
+			found = base.parts.search(part, part=True)
+			setattr(self, attr, found[0] if found else None)
+		psu = self.psu
+		self.powered = bool(psu) and _working(psu) and psu.tags.has("powered on", category="status")
+		self._usable = {}
+
+	def usable(self, obj):
+		"""Checks if obj is working and the device is powered on"""
+		if obj.baseobj != self.base:
+			# status changes on other devices won't reach this cache
+			return _working(obj) and self.powered
+		if (usable := self._usable.get(obj.pk)) is None:
+			usable = self._usable[obj.pk] = _working(obj) and self.powered
+		return usable
+
+
+def device_topology(obj):
+	"""Returns the cached topology of the device obj is a part of"""
+	base = obj.baseobj
+	derived = base.parts_cache.derived
+	if not (topology := derived.get(_TOPOLOGY_KEY)):
+		topology = derived[_TOPOLOGY_KEY] = DeviceTopology(base)
+	return topology
+
 def _check_if_usable(*objs):
 	"""Checks if an electronic device is usable"""
-	# check if object itself is disabled
-	for obj in objs:
-		if any(obj.tags.has(['disabled', 'overloaded'], category='status', return_list=True)):
-			return False
-
 	bases = {obj.baseobj for obj in objs}
 	if len(bases) > 1:
 		raise ValueError('Can only check parts of the same base object at once, but bases differ.')
-	# oh my god is this hacky
-	for b in bases:
-		base = b
-	# check if base is powered on
-	psu = base.baseobj.parts.search('power_source', part=True)
-	if not psu:
-		# there's nothing
-		return False
-	psu = psu[0]
-	if any(psu.tags.has(['disabled', 'overloaded'], category='status', return_list=True)):
-		return False
-	if not psu.tags.has("powered on", category="status"):
-		return False
-	return True
+	topology = device_topology(objs[0])
+	return all(topology.usable(obj) for obj in objs)
 
 @behavior
 class PowerOnOff(Behavior):
@@ -33,13 +65,11 @@ class PowerOnOff(Behavior):
 	def power(obj, doer, state, **kwargs):
 		"""Turn an object on or off"""
 		obj = obj.baseobj
-		# find the central processor
-		psu = obj.baseobj.parts.search('power_source', part=True)
-		if not psu:
+		# find the power source
+		if not (psu := device_topology(obj).psu):
 			# there's nothing
 			return
-		psu = psu[0]
-		if any(psu.tags.has(['disabled', 'overloaded'], category='status', return_list=True)):
+		if not _working(psu):
 			status = obj.tags.get(category="status", return_list=True)
 			doer.msg(f"{obj.get_display_name(doer)} is {iter_to_str(status)}.")
 			return
@@ -115,20 +145,20 @@ class AppDevice(Behavior):
 
 	def use(obj, doer, *args, **kwargs):
 		# find the central processor
-		cpu = obj.baseobj.parts.search('cpu', part=True)
-		if not cpu:
+		if not (cpu := device_topology(obj).cpu):
 			# there's nothing
 			return
-		cpu = cpu[0]
 		if not _check_if_usable(cpu):
 			return
+		if not (apps := getattr(cpu, 'apps', None)):
+			return
 		if not args:
 			args = ['menu']
 		if app_key := cpu.db.active_app:
-			app = cpu.apps.get(app_key)
+			app = apps.get(app_key)
 			app.use(doer, *args, **kwargs)
 		else:
-			cpu.apps.use(doer, *args, **kwargs)
+			apps.use(doer, *args, **kwargs)
 
 
 @behavior
@@ -137,27 +167,24 @@ class ElecDisplay(Behavior):
 
 	def screen_render(obj, doer, **kwargs):
 		# this needs both a working display screen and an active cpu
-		screen = obj.baseobj.parts.search('display_screen', part=True)
-		if not screen:
+		topology = device_topology(obj)
+		if not (screen := topology.screen):
 			# there's nothing
 			doer.msg('no screen')
 			return
-		cpu = obj.baseobj.parts.search('cpu', part=True)
-		if not cpu:
+		if not (cpu := topology.cpu):
 			# there's nothing
 			doer.msg('no cpu')
 			return ''
 
-		screen = screen[0]
-		cpu = cpu[0]
 		if not _check_if_usable(cpu, screen):
 			return
-		if not hasattr(cpu, 'apps'):
+		if not (apps := getattr(cpu, 'apps', None)):
 			return ''
 		
 		appkey = kwargs.pop('appkey', cpu.db.active_app)
 
-		return cpu.apps.display(appkey=appkey, **kwargs)
+		return apps.display(appkey=appkey, **kwargs)
 
 	# TODO: maybe turn the screen on and off?
 
@@ -195,25 +222,25 @@ class ElecMicrophone(Behavior):
 		if not mic:
 			# there's nothing
 			return
-		cpu = obj.parts.search('cpu', part=True)
-		if not cpu:
+		if not (cpu := device_topology(obj).cpu):
 			# there's nothing
 			return
-		cpu = cpu[0]
 		if not _check_if_usable(cpu) or not _check_if_usable(mic):
 			return
+		if not (apps := getattr(cpu, 'apps', None)):
+			return
 
 		if app_key := kwargs.get('app_key'):
-			app = cpu.apps.get(app_key)
+			app = apps.get(app_key)
 		elif app_key := cpu.db.active_app:
-			app = cpu.apps.get(app_key)
+			app = apps.get(app_key)
 		else:
-			app = cpu.apps
+			app = apps
 		if not app:
-			app = cpu.apps
+			app = apps
 		logger.log_msg(app)
 		if not hasattr(app, 'listen') or not callable(app.listen):
-			app = cpu.apps
+			app = apps
 		app.listen(source, message, **kwargs)
 
 @behavior
@@ -224,19 +251,17 @@ class PhoneCalls(Behavior):
 		"""Receive an audio message input"""
 		ours = ours.baseobj
 		# get cpu first
-		cpu = ours.parts.search('cpu', part=True)
-		if not cpu:
+		if not (cpu := device_topology(ours).cpu):
 			# there's nothing
 			return
 
-		cpu = cpu[0]
 		if not _check_if_usable(cpu):
 			return
 
-		if not hasattr(cpu, 'apps'):
+		if not (apps := getattr(cpu, 'apps', None)):
 			return
 		
-		if not (app := cpu.apps.get(app_key)):
+		if not (app := apps.get(app_key)):
 			return
 		if not cpu.db.active_app:
 			cpu.db.active_app = app_key
@@ -9,9 +9,13 @@ from evennia.utils import delay, is_iter, iter_to_str, logger
 
 from core.ic.behaviors import NoSuchBehavior
 from utils.menus import FormatEvMenu
+from systems.electronics.behaviors import device_topology
 
 APP_REGISTRY = ClassRegistry('key', unique=True)
 
+# each installed app's state is saved in its own attribute, so a change only rewrites that app
+_APP_CAT = "apps"
+
 class AppHandler:
 	status = ''
 
@@ -21,20 +25,31 @@ class AppHandler:
 
 	def load(self):
 		app_data = {}
-		if db_data := self.obj.attributes.get("app_data", category="software"):
-			db_data = db_data.deserialize()
-			for key, val in db_data.items():
-				app_data[key] = APP_REGISTRY.get(key, self, **val)
-		
+		# attribute keys are lowercased, so map them back to the app keys
+		app_keys = { key.lower(): key for key in APP_REGISTRY.keys() }
+		for attr in self.obj.attributes.all(category=_APP_CAT):
+			if key := app_keys.get(attr.key):
+				app_data[key] = APP_REGISTRY.get(key, self, **attr.value.deserialize())
 		self.app_data = app_data
-
-	def save(self):
-		app_data = {}
-		for key, item in self.app_data.items():
+		# move over any apps saved as a single dict
+		if db_data := self.obj.attributes.get("app_data", category="software"):
+			for key, val in db_data.deserialize().items():
+				self.app_data[key] = APP_REGISTRY.get(key, self, **val)
+				self.save(key)
+			self.obj.attributes.remove("app_data", category="software")
+
+	def save(self, app_key=None):
+		"""
+		Saves the state of one installed app, or of all of them if no key is given.
+		"""
+		keys = [app_key] if app_key else list(self.app_data)
+		for key in keys:
+			if not (item := self.app_data.get(key)):
+				self.obj.attributes.remove(key, category=_APP_CAT)
+				continue
 			data = dict(vars(item))
 			data.pop('handler')
-			app_data[key] = data
-		self.obj.attributes.add("app_data", app_data, category="software")
+			self.obj.attributes.add(key, data, category=_APP_CAT)
 
 	def display(self, appkey=None, **kwargs):
 		screen = 'Your Background Here'
@@ -81,7 +96,7 @@ class AppHandler:
 		new_app = APP_REGISTRY.get(app_key, self, *args, **kwargs)
 		if new_app.at_install():
 			self.app_data[app_key] = new_app
-			self.save()
+			self.save(app_key)
 			return True
 		else:
 			# somehow installation failed
@@ -90,7 +105,7 @@ class AppHandler:
 	def delete_app(self, app_key):
 		if self.app_data.get(app_key):
 			del self.app_data[app_key]
-			self.save()
+			self.save(app_key)
 			return True
 		# TODO: better handling of no match vs multimatch
 		return False
@@ -318,7 +333,7 @@ class NaviApp(BaseApp):
 				self.stop()
 				return
 		self.route[flat_route[-1]] = None
-		self.handler.save()
+		self.handler.save(self.key)
 	
 	def check_route(self):
 		location, direction = pathing.get_room_and_dir(self.handler.obj)
@@ -380,7 +395,7 @@ class NaviApp(BaseApp):
 
 	def start(self):
 		self.active = True
-		self.handler.save()
+		self.handler.save(self.key)
 		delay(1,self.tick)
 
 	def stop(self):
@@ -388,7 +403,7 @@ class NaviApp(BaseApp):
 		self.active = False
 		self.last_check = None
 		self.up_next = None
-		self.handler.save()
+		self.handler.save(self.key)
 
 class PhoneCalls(BaseApp):
 	key = "Phone"
@@ -397,12 +412,7 @@ class PhoneCalls(BaseApp):
 
 	def _get_simchip(self):
 		"""returns the simcard object, or None"""
-		phone = self.handler.obj.baseobj
-		sim = phone.parts.search('simcard', part=True)
-		if not sim:
-			return None
-		else:
-			return sim[0]
+		return device_topology(self.handler.obj).simchip
 
 	def get_number(self, **kwargs):
 		if not (sim := self._get_simchip()):
@@ -537,12 +547,7 @@ class ContactList(BaseApp):
 
 	def _get_simchip(self):
 		"""returns the simcard object, or None"""
-		phone = self.handler.obj.baseobj
-		sim = phone.parts.search('simcard', part=True)
-		if not sim:
-			return None
-		else:
-			return sim[0]
+		return device_topology(self.handler.obj).simchip
 
 	def get_number(self, **kwargs):
 		if not (sim := self._get_simchip()):
@@ -652,12 +657,7 @@ class TextMessages(BaseApp):
 
 	def _get_simchip(self):
 		"""returns the simcard object, or None"""
-		phone = self.handler.obj.baseobj
-		sim = phone.parts.search('simcard', part=True)
-		if not sim:
-			return None
-		else:
-			return sim[0]
+		return device_topology(self.handler.obj).simchip
 
 	def display_contact(self, number, **kwargs):
 		number = str(number)
@@ -1,57 +1,177 @@
-from random import choice, randint
-from evennia import AttributeProperty
+from bisect import bisect_right, insort
+from random import choice, randint, randrange
+from evennia import ObjectDB
+from evennia.utils import lazy_property
 from core.scripts import Script
 
+# assignable numbers are 7 digits
+_LOW_NUMBER = 1000000
+_HIGH_NUMBER = 10000000
+
+
+def _shard_key(number):
+	"""records are saved in one attribute per final three digits, so a change only rewrites one of them"""
+	return f"numbers_{number[-3:].zfill(3)}"
+
+def _assignable(number):
+	"""returns the number as an int if it's in the assignable range, otherwise None"""
+	if number.isdigit() and _LOW_NUMBER <= (value := int(number)) < _HIGH_NUMBER:
+		return value
+
+def _get_phone(pk):
+	if pk is None:
+		return None
+	try:
+		# pk lookups are served from the idmapper cache
+		return ObjectDB.objects.get(id=pk)
+	except ObjectDB.DoesNotExist:
+		return None
+
+
+class PhoneBookIndex:
+	"""
+	The in-memory phonebook, indexed by number and by phone.
+
+	Records are stored as number -> phone pk, saved to the script in shards.
+	"""
+	def __init__(self, script):
+		self.script = script
+		# shard key -> {number: phone pk}
+		self.shards = {}
+		# number -> phone pk
+		self.owners = {}
+		# phone pk -> [numbers]
+		self.phones = {}
+		# sorted assigned numbers within the assignable range
+		self.used = []
+		self.load()
+
+	def __len__(self):
+		return len(self.owners)
+
+	def __contains__(self, number):
+		return number in self.owners
+
+	def load(self):
+		self.shards = {}
+		self.owners = {}
+		self.phones = {}
+		used = []
+		attrs = self.script.attributes
+		for attr in attrs.all(category="phonebook"):
+			records = dict(attr.value)
+			self.shards[attr.key] = records
+			self.owners.update(records)
+			for number, pk in records.items():
+				self.phones.setdefault(pk, []).append(number)
+				if (value := _assignable(number)) is not None:
+					used.append(value)
+		self.used = sorted(used)
+		# move over any records saved as a single dict of phones
+		if legacy := attrs.get("numbers"):
+			changed = set()
+			for number, phone in legacy.deserialize().items():
+				if phone:
+					number = str(number)
+					self.add(number, phone.pk, save=False)
+					changed.add(_shard_key(number))
+			for key in changed:
+				self.save(key)
+			attrs.remove("numbers")
+
+	def save(self, key):
+		if records := self.shards.get(key):
+			self.script.attributes.add(key, records, category="phonebook")
+		else:
+			self.shards.pop(key, None)
+			self.script.attributes.remove(key, category="phonebook")
+
+	def get(self, number):
+		return self.owners.get(number)
+
+	def numbers_for(self, pk):
+		return self.phones.get(pk, [])
+
+	def add(self, number, pk, save=True):
+		if number in self.owners:
+			self.remove(number, save=False)
+		key = _shard_key(number)
+		self.shards.setdefault(key, {})[number] = pk
+		self.owners[number] = pk
+		self.phones.setdefault(pk, []).append(number)
+		if (value := _assignable(number)) is not None:
+			insort(self.used, value)
+		if save:
+			self.save(key)
+
+	def remove(self, number, save=True):
+		key = _shard_key(number)
+		del self.shards[key][number]
+		pk = self.owners.pop(number)
+		numbers = self.phones[pk]
+		numbers.remove(number)
+		if not numbers:
+			del self.phones[pk]
+		if (value := _assignable(number)) is not None:
+			del self.used[bisect_right(self.used, value)-1]
+		if save:
+			self.save(key)
+
+	def free_number(self):
+		"""
+		Picks a uniformly random unassigned number, or None if they're all taken.
+		"""
+		free = (_HIGH_NUMBER - _LOW_NUMBER) - len(self.used)
+		if free <= 0:
+			return None
+		target = randrange(free)
+		# the target-th free number comes after `low` used numbers
+		used = self.used
+		low, high = 0, len(used)
+		while low < high:
+			mid = (low + high) // 2
+			if used[mid] - _LOW_NUMBER - mid <= target:
+				low = mid + 1
+			else:
+				high = mid
+		return str(_LOW_NUMBER + target + low)
+
+
 class PhoneBookScript(Script):
 	key = "phonebook"
-	numbers = AttributeProperty(default=None)
 
-	def at_script_creation(self, **kwargs):
-		super().at_script_creation(**kwargs)
-		self.numbers = {}
-	
+	@lazy_property
+	def book(self):
+		return PhoneBookIndex(self)
+
 	def add_record(self, number, phone, **kwargs):
 		# TODO: add some validation here or something
-		if existing := self.numbers.get(number):
+		number = str(number)
+		if existing := self.get_by_number(number):
 			return existing == phone
 		else:
-			self.numbers[number] = phone
+			self.book.add(number, phone.pk)
 			return True
-	
+
 	def del_record(self, number, phone, **kwargs):
-		if self.numbers.get(number) == phone:
+		number = str(number)
+		if number in self.book and self.book.get(number) == phone.pk:
 			# only clear if the number is actually attached to the given phone
-			del self.numbers[number]
+			self.book.remove(number)
 			return True
-	
+
 	def get_by_number(self, number, **kwargs):
 		number = str(number)
-		return self.numbers.get(number)
-	
+		return _get_phone(self.book.get(number))
+
 	def get_by_phone(self, phone, **kwargs):
-		numbers = self.numbers.deserialize()
-		if phones := [ n for n, p in numbers.items() if p == phone ]:
-			return phones[0]
-	
+		if numbers := self.book.numbers_for(phone.pk):
+			return numbers[0]
+
 	def assign_number(self, phone, **kwargs):
-		# generate random number
-		check_me = choice(range(1000000,10000000))
-		new_number = None
-		# cap how many loops we can do
-		for _ in range(500):
-			if str(check_me) not in self.numbers:
-				# it's free!
-				new_number = check_me
-				break
-			# increment instead of rerolling, more efficient
-			check_me += 1
-			if check_me >= 10000000:
-				# it's exceeded 7 digits, reroll
-				check_me = choice(range(1000000,10000000))
-		if new_number:
+		if new_number := self.book.free_number():
 			# only assign phone if a number was successfully assigned
-			new_number = str(new_number)
-			self.numbers[new_number] = phone
+			self.book.add(new_number, phone.pk)
 		return new_number
 
 	def at_repeat(self):
@@ -59,16 +179,20 @@ class PhoneBookScript(Script):
 		Randomly spam call someone!
 		"""
 		self.clear_dead_lines()
-		if randint(0,50) >= len(self.numbers.keys()):
+		if randint(0,50) >= len(self.book):
 			# no call
 			return
-		
-		callme = choice(self.numbers.keys())
+
+		callme = self.get_by_number(choice(list(self.book.owners)))
 		# do the phone call here, once it's a thing
 
 	def clear_dead_lines(self):
-		records = self.numbers.deserialize()
-		for key, val in self.numbers.items():
-			if not val:
-				del records[key]
-		self.numbers = records
\ No newline at end of file
+		book = self.book
+		alive = set(ObjectDB.objects.filter(id__in=list(book.phones)).values_list("id", flat=True))
+		changed = set()
+		for pk in [ pk for pk in book.phones if pk not in alive ]:
+			for number in list(book.numbers_for(pk)):
+				book.remove(number, save=False)
+				changed.add(_shard_key(number))
+		for key in changed:
+			book.save(key)
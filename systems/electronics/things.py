@@ -8,10 +8,15 @@ class Electronics(Thing):
 		super().at_object_creation()
 		self.tags.add("lightning", category="effectable")
 
-	def at_server_start(self):
-		super().at_server_start()
-		if self.tags.has('cpu', category="part"):
-			self.apps = AppHandler(self)
+	@property
+	def apps(self):
+		"""the app handler, or None if this isn't a cpu"""
+		# checked on every read, since a part can be tagged as a cpu after this is first used
+		if not self.tags.has('cpu', category="part"):
+			return None
+		if not (handler := self.__dict__.get('_app_handler')):
+			handler = self._app_handler = AppHandler(self)
+		return handler
 
 	def get_display_desc(self, looker, **kwargs):
 		desc = super().get_display_desc(looker, **kwargs)
@@ -4,6 +4,8 @@ from utils.handlers import HandlerBase
 from .skills import Skill
 
 class SkillsHandler(HandlerBase):
+	write_behind = True
+
 	def __init__(self, obj):
 		super().__init__(obj, "skills")
 	
@@ -3,7 +3,7 @@ from base_systems.effects.base import AreaEffect
 
 class FogEffect(AreaEffect):
 	name = 'fog'
-	pulse = "base_systems.effects.effects.Wet"
+	pulse = "base_systems.effects.effects.WetEffect"
 	duration = 60
 	block = ("water", "protect_against")
 
@@ -38,7 +38,7 @@ class FogEffect(AreaEffect):
 
 class RainEffect(AreaEffect):
 	name = 'rain'
-	pulse = "base_systems.effects.effects.Wet"
+	pulse = "base_systems.effects.effects.WetEffect"
 	block = ("water", "protect_against")
 	duration = 60
 
@@ -0,0 +1,64 @@
+from mock import patch, MagicMock
+from evennia.utils.test_resources import EvenniaTest
+
+from base_systems.characters import energy
+
+
+@patch("base_systems.characters.energy.delay")
+class TestLazyRecovery(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.life = energy.LifeHandler(self.char1)
+
+	def test_recovery_on_read(self, mock_delay):
+		with patch("time.time", return_value=1000):
+			self.life.energy = 50
+		self.assertEqual(self.life._data['stamp'], 1000)
+		with patch("time.time", return_value=1035):
+			# three steps of hunger-fuelled recovery
+			self.assertEqual(self.life.status, { "energy": 53, "hunger": 3 })
+		# partial steps carry over
+		self.assertEqual(self.life._data['stamp'], 1030)
+
+	def test_posture(self, mock_delay):
+		with patch("time.time", return_value=1000):
+			self.life.energy = 50
+		with patch("time.time", return_value=1020):
+			self.life.settle()
+			self.char1.tags.add("lying down", category="status")
+		with patch("time.time", return_value=1040):
+			self.assertEqual(self.life.energy, 52 + 6)
+
+	def test_fully_rested(self, mock_delay):
+		self.char1.tags.add("lying down", category="status")
+		with patch("time.time", return_value=1000):
+			self.life.energy = 95
+		# a single wake-up, for when the message is due
+		mock_delay.assert_called_once_with(20, self.life._wake)
+		self.char1.msg = MagicMock()
+		with patch("time.time", return_value=1020):
+			self.life._wake()
+		self.assertEqual(self.life._data['energy'], 100)
+		self.assertEqual(self.char1.msg.call_args_list[0].args, (("You feel fully rested.", {"type": "status"}),))
+		self.assertIsNone(self.life._task)
+
+	def test_stalled(self, mock_delay):
+		self.life._data['hunger'] = 50
+		with patch("time.time", return_value=1000):
+			self.life.energy = 60
+		# standing with no hunger left to burn never recovers
+		mock_delay.assert_not_called()
+		with patch("time.time", return_value=5000):
+			self.assertEqual(self.life.energy, 60)
+
+	def test_regain_consciousness(self, mock_delay):
+		self.life.prompt = MagicMock()
+		with patch("time.time", return_value=1000):
+			self.life.energy = 5
+		self.assertTrue(self.char1.tags.has("unconscious", category="status"))
+		# lying down and hungry, 3 per step until above exhaustion
+		mock_delay.assert_called_once_with(20, self.life._wake)
+		with patch("time.time", return_value=1020):
+			self.life._wake()
+		self.assertFalse(self.char1.tags.has("unconscious", category="status"))
+		self.assertEqual(mock_delay.call_count, 2)
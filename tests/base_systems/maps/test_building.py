@@ -0,0 +1,144 @@
+import time
+from io import StringIO
+from unittest import skip
+from mock import patch, PropertyMock
+from django.db import connection
+from evennia import create_object
+from evennia.typeclasses.tags import Tag
+from evennia.utils.test_resources import EvenniaTest
+
+from base_systems.maps.building import UID_REGISTRY, deref_uids, get_by_uid, update_or_create_object, import_build, write_build
+from base_systems.rooms.base import Room
+from base_systems.things.base import Thing
+
+
+class TestUIDRegistry(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		UID_REGISTRY.build()
+
+	def test_get_by_uid(self):
+		self.assertIsNone(get_by_uid("Otest0"))
+		self.obj1.uid = "Otest0"
+		self.assertEqual(get_by_uid("Otest0"), self.obj1)
+		with self.assertRaises(KeyError):
+			self.obj2.uid = "Otest0"
+		# changing the uid frees up the old one
+		self.obj1.uid = "Otest1"
+		self.assertIsNone(get_by_uid("Otest0"))
+		self.assertEqual(get_by_uid("Otest1"), self.obj1)
+		self.obj1.delete()
+		self.assertIsNone(get_by_uid("Otest1"))
+
+	def test_update_or_create(self):
+		obj = update_or_create_object("Otest2", key="widget", typeclass="base_systems.things.base.Thing")
+		self.assertEqual(get_by_uid("Otest2"), obj)
+		self.assertEqual(update_or_create_object("Otest2", key="gadget"), obj)
+		self.assertEqual(obj.key, "gadget")
+
+	def test_deref_uids(self):
+		self.obj1.uid = "Otest3"
+		self.obj2.uid = "Otest4"
+		value = {"one": ["uid#Otest3", ("uid#Otest4", 5)], "uid#Otest4": "uid#Otest5"}
+		# everything is already in memory, so nothing should hit the database
+		with self.assertNumQueries(0):
+			result = deref_uids(value)
+		self.assertEqual(result, {"one": [self.obj1, (self.obj2, 5)], self.obj2: None})
+
+
+class TestBuildFile(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		UID_REGISTRY.build()
+		self.room = create_object(Room, key="a yard")
+		self.room.uid = "Rtest0"
+		self.thing = create_object(Thing, key="a rock", location=self.room)
+		self.thing.uid = "Otest0"
+		self.thing.db.desc = "A big rock."
+		self.thing.db.near = {"room": self.room, "spots": ("left", "right")}
+		self.thing.tags.add("heavy", category="quality")
+		self.thing.aliases.add("boulder")
+
+	def _write(self):
+		file = StringIO()
+		write_build(file, [self.room, self.thing])
+		file.seek(0)
+		return file
+
+	def test_round_trip(self):
+		file = self._write()
+		self.thing.delete()
+		self.room.delete()
+		counts = import_build(file)
+		self.assertEqual(counts, {"created": 2, "updated": 0, "scripts": 0})
+		room = get_by_uid("Rtest0")
+		thing = get_by_uid("Otest0")
+		self.assertEqual(room.key, "a yard")
+		self.assertEqual(thing.location, room)
+		self.assertIn(thing, room.contents)
+		self.assertEqual(thing.db.desc, "A big rock.")
+		self.assertEqual(thing.db.near, {"room": room, "spots": ("left", "right")})
+		self.assertTrue(thing.tags.has("heavy", category="quality"))
+		self.assertIn("boulder", thing.aliases.all())
+
+	def test_without_bulk_rows(self):
+		file = self._write()
+		self.thing.delete()
+		self.room.delete()
+		Tag.objects.filter(db_key="heavy").delete()
+		# e.g. MySQL, which doesn't return the new rows from a bulk insert
+		features = type(connection.features)
+		with patch.object(features, "can_return_rows_from_bulk_insert", new_callable=PropertyMock, return_value=False):
+			counts = import_build(file)
+		self.assertEqual(counts["created"], 2)
+		room = get_by_uid("Rtest0")
+		thing = get_by_uid("Otest0")
+		self.assertEqual(thing.key, "a rock")
+		self.assertEqual(thing.location, room)
+		self.assertEqual(thing.db.near, {"room": room, "spots": ("left", "right")})
+		self.assertTrue(thing.tags.has("heavy", category="quality"))
+
+	def test_update(self):
+		file = self._write()
+		self.thing.key = "a pebble"
+		self.thing.db.desc = "A small rock."
+		self.thing.location = self.room1
+		self.thing.tags.remove("heavy", category="quality")
+		counts = import_build(file)
+		self.assertEqual(counts, {"created": 0, "updated": 2, "scripts": 0})
+		self.assertEqual(self.thing.key, "a rock")
+		self.assertEqual(self.thing.db.desc, "A big rock.")
+		self.assertEqual(self.thing.location, self.room)
+		self.assertIn(self.thing, self.room.contents)
+		self.assertNotIn(self.thing, self.room1.contents)
+		self.assertTrue(self.thing.tags.has("heavy", category="quality"))
+
+	def test_bad_file(self):
+		with self.assertRaises(ValueError):
+			import_build(StringIO("from base_systems.maps.building import update_or_create_object\n"))
+
+
+@skip("benchmark")
+class TestBuildSpeed(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		UID_REGISTRY.build()
+		self.rooms = []
+		for i in range(5000):
+			room = create_object(Room, key=f"room {i}")
+			room.uid = f"Rbench{i}"
+			room.db.desc = f"Room number {i}."
+			room.tags.add("bench", category="zone")
+			self.rooms.append(room)
+
+	def test_import(self):
+		file = StringIO()
+		write_build(file, self.rooms)
+		for room in self.rooms:
+			room.delete()
+		file.seek(0)
+		print(f"Importing {len(self.rooms)} rooms")
+		start = time.time()
+		import_build(file)
+		end = time.time()
+		print(f"Bulk import: {round(end-start,5)}s")
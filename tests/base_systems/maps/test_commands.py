@@ -3,7 +3,7 @@ from mock import MagicMock, patch
 from utils.colors import strip_ansi
 from utils.testing import NexusCommandTest, NexusTest
 
-from base_systems.maps import commands
+from base_systems.maps import commands, pathing
 
 class TestBuildingCmds(NexusCommandTest):
 
@@ -20,6 +20,9 @@ class TestBuildingCmds(NexusCommandTest):
 		self.assertEqual(south.name, 'south')
 		# it has an alias of s
 		self.assertIn('s', south.aliases.all())
+		# both are on the map with their directions
+		self.assertEqual(pathing.WorldGraph[self.caller.location.id][north.destination.id]['north'], 1)
+		self.assertEqual(pathing.WorldGraph[north.destination.id][self.caller.location.id]['south'], 1)
 
 		self.call(commands.CmdDig(), "house, in;enter=out;leave")
 		# create an exit in our location
@@ -0,0 +1,168 @@
+import os
+import tempfile
+from unittest.mock import patch
+from evennia.utils.test_resources import EvenniaTest
+from evennia import create_object
+
+from base_systems.exits.base import Exit
+from base_systems.maps import pathing
+from base_systems.rooms.base import Room
+
+
+class TestVisibleArea(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.center = create_object(Room, key="center")
+		self.north = create_object(Room, key="north room")
+		self.far_north = create_object(Room, key="far north room")
+		self.east = create_object(Room, key="east room")
+		self._link(self.center, self.north, "north")
+		self._link(self.north, self.far_north, "north")
+		self._link(self.center, self.east, "east")
+		pathing.build_graph()
+
+	def _link(self, room_a, room_b, direction):
+		back = { "north": "south", "east": "west" }[direction]
+		there = create_object(Exit, key=direction, location=room_a, destination=room_b)
+		there.direction = direction
+		home = create_object(Exit, key=back, location=room_b, destination=room_a)
+		home.direction = back
+
+	def test_visible_area(self):
+		area = pathing.visible_area(self.center, self.char1, 2, directions=["north", "east"])
+		self.assertEqual(area["north"], [(self.north, 1), (self.far_north, 2)])
+		self.assertEqual(area["east"], [(self.east, 1)])
+		self.assertEqual(self.center.ndb.area["north"], [self.north, self.far_north])
+		# a shorter range cuts the cone down
+		area = pathing.visible_area(self.center, self.char1, 1, directions=["north"])
+		self.assertEqual(area["north"], [(self.north, 1)])
+
+	def test_fov_cache(self):
+		pathing.visible_area(self.center, self.char1, 2, directions=["north"])
+		self.assertIn((self.center.id, "north", 2), pathing.FOVCache)
+		# cached cones don't touch the database
+		with self.assertNumQueries(0):
+			area = pathing.visible_area(self.center, self.char1, 2, directions=["north"])
+		self.assertEqual(area["north"], [(self.north, 1), (self.far_north, 2)])
+		pathing.build_graph()
+		self.assertNotIn((self.center.id, "north", 2), pathing.FOVCache)
+
+	def test_edge_audience(self):
+		disappear, appear = pathing.edge_audience(self.center, self.north, self.char1)
+		self.assertEqual(disappear, {self.east})
+		self.assertEqual(appear, {self.far_north})
+		# the second crossing is looked up without recomputing the cones
+		with patch.object(pathing, "_build_cone") as mock_cone:
+			self.assertEqual(pathing.edge_audience(self.center, self.north, self.char1), (disappear, appear))
+		mock_cone.assert_not_called()
+		pathing.build_graph()
+		self.assertFalse(pathing.AudienceCache)
+
+	def test_return_exit(self):
+		there = self.center.contents_get(content_type="exit")[0]
+		back = there.get_return_exit()
+		self.assertEqual((back.location, back.destination), (there.destination, self.center))
+		# the graph answers it without a query
+		with self.assertNumQueries(0):
+			self.assertIs(there.get_return_exit(), back)
+
+
+class TestWorldGraph(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		pathing.build_graph()
+		self.north_exit = create_object(Exit, key="north", location=self.room2, destination=self.room1)
+
+	def test_incremental_edges(self):
+		# creation adds the edge, with the exit on it
+		self.assertIs(pathing.get_exit_for_path(self.room2.id, self.room1.id), self.north_exit)
+		self.assertIsNone(pathing.WorldGraph[self.room2.id][self.room1.id]['north'])
+		# changing direction updates the weights
+		self.north_exit.direction = "north"
+		self.assertEqual(pathing.WorldGraph[self.room2.id][self.room1.id]['north'], 1)
+		# relinking moves the edge
+		room3 = create_object(Room, key="room3")
+		self.north_exit.destination = room3
+		self.assertFalse(pathing.WorldGraph.has_edge(self.room2.id, self.room1.id))
+		self.assertIs(pathing.get_exit_for_path(self.room2.id, room3.id), self.north_exit)
+		# deleting removes it
+		self.north_exit.delete()
+		self.assertFalse(pathing.WorldGraph.has_edge(self.room2.id, room3.id))
+
+	def test_shared_edge(self):
+		# the fixture exit runs alongside a second one
+		other = create_object(Exit, key="door", location=self.room1, destination=self.room2)
+		self.assertIs(pathing.get_exit_for_path(self.room1.id, self.room2.id), other)
+		other.delete()
+		self.assertIs(pathing.get_exit_for_path(self.room1.id, self.room2.id), self.exit)
+
+	def test_snapshot(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			with patch.object(pathing, "_SNAPSHOT_PATH", os.path.join(tmpdir, "worldgraph.pickle")):
+				pathing.save_graph()
+				pathing.WorldGraph.clear()
+				# only the graph version is read
+				with self.assertNumQueries(1):
+					pathing.load_graph()
+				# the snapshot is used up
+				self.assertFalse(os.path.exists(pathing._SNAPSHOT_PATH))
+		self.assertEqual(pathing.WorldGraph[self.room2.id][self.room1.id]['dbref'], f"#{self.north_exit.id}")
+		self.assertEqual(pathing.get_exit_for_path(self.room2.id, self.room1.id), self.north_exit)
+		self.north_exit.delete()
+		self.assertFalse(pathing.WorldGraph.has_edge(self.room2.id, self.room1.id))
+
+	def test_stale_snapshot(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			with patch.object(pathing, "_SNAPSHOT_PATH", os.path.join(tmpdir, "worldgraph.pickle")):
+				# a direction written past the setter leaves the graph out of date
+				self.exit.db.direction = "east"
+				with patch("base_systems.maps.pathing.logger"):
+					pathing.save_graph()
+				self.assertFalse(os.path.exists(pathing._SNAPSHOT_PATH))
+				# and one changed after the snapshot was written invalidates it
+				pathing.build_graph()
+				pathing.save_graph()
+				self.exit.direction = "west"
+				with patch.object(pathing, "build_graph", wraps=pathing.build_graph) as mock_build:
+					pathing.load_graph()
+				mock_build.assert_called_once()
+		self.assertEqual(pathing.WorldGraph[self.room1.id][self.room2.id]['west'], 1)
+
+	def test_graph_version(self):
+		version = pathing._graph_version()
+		self.exit.direction = "east"
+		self.assertGreater(pathing._graph_version(), version)
+		version = pathing._graph_version()
+		self.exit.delete()
+		self.assertGreater(pathing._graph_version(), version)
+		version = pathing._graph_version()
+		pathing.build_graph()
+		self.assertGreater(pathing._graph_version(), version)
+
+
+class TestRouting(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.rooms = [ create_object(Room, key=f"street {i}") for i in range(3) ]
+		for room_a, room_b in zip(self.rooms, self.rooms[1:]):
+			ex = create_object(Exit, key="north", location=room_a, destination=room_b)
+			ex.direction = "north"
+		pathing.build_graph()
+		self.ids = [ room.id for room in self.rooms ]
+
+	def test_path_to_target(self):
+		self.assertEqual(pathing.path_to_target(self.ids[0], self.ids[2]), self.ids)
+		self.assertEqual(pathing.path_to_target(self.ids[1], self.ids[2]), self.ids[1:])
+		# both routes came from the same tree
+		self.assertEqual(len([ key for key in pathing._RouteTrees if key[0] == self.ids[2] ]), 1)
+		self.assertIsNone(pathing.path_to_target(self.ids[2], self.ids[0]))
+		# a new exit invalidates the cached tree
+		create_object(Exit, key="shortcut", location=self.rooms[0], destination=self.rooms[2])
+		self.assertEqual(pathing.path_to_target(self.ids[0], self.ids[2]), [self.ids[0], self.ids[2]])
+
+	def test_path_in_direction(self):
+		destination, route, crashed = pathing.get_path_in_direction(self.rooms[0], "north", 2)
+		self.assertEqual((destination, route, crashed), (self.ids[2], self.ids, False))
+		# callers get their own copy of the cached route
+		route.append(0)
+		self.assertEqual(pathing.get_path_in_direction(self.ids[0], "north", 2)[1], self.ids)
@@ -0,0 +1,108 @@
+from unittest.mock import MagicMock, patch
+from evennia.utils.test_resources import EvenniaTest
+
+from base_systems.effects import timers
+from base_systems.effects.base import Effect, AreaEffect
+from utils.handlers import HANDLER_WRITES
+
+
+class SoakedEffect(Effect):
+	name = "soaked"
+
+
+class DrizzleEffect(AreaEffect):
+	name = "drizzle"
+	pulse = "tests.base_systems.test_effects.SoakedEffect"
+	block = ("water", "protect_against")
+
+
+class TickingEffect(Effect):
+	name = "ticking"
+	duration = 5
+
+	def at_tick(self, source, *args, **kwargs):
+		self.ticks = getattr(self, "ticks", 0) + 1
+
+
+@patch("base_systems.effects.timers.delay")
+class TestTimerWheel(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.wheel = timers.TimerWheel()
+
+	def test_buckets(self, mock_delay):
+		callback = MagicMock()
+		with patch("time.time", return_value=100.2):
+			self.wheel.schedule(0.5, callback, "a")
+			self.wheel.schedule(0.7, callback, "b")
+			self.wheel.schedule(3, callback, "c")
+		self.assertEqual(self.wheel.counts(), { "timers": 3, "buckets": 2 })
+		# only one task drives the wheel
+		mock_delay.assert_called_once_with(1, self.wheel.turn)
+		with patch("time.time", return_value=101.0):
+			self.wheel.turn()
+		self.assertEqual([ call.args for call in callback.call_args_list ], [("a",), ("b",)])
+		self.assertEqual(len(self.wheel), 1)
+		self.assertEqual(mock_delay.call_count, 2)
+		with patch("time.time", return_value=104.0):
+			self.wheel.turn()
+		self.assertEqual(len(self.wheel), 0)
+		# nothing left, so the wheel stops
+		self.assertEqual(mock_delay.call_count, 2)
+
+	def test_deferred_saves(self, mock_delay):
+		handler = MagicMock()
+		with patch("time.time", return_value=100.0):
+			self.wheel.schedule(0, self.wheel.defer_save, handler)
+			self.wheel.schedule(0, self.wheel.defer_save, handler)
+			self.wheel.turn()
+		handler.save.assert_called_once_with()
+
+	def test_effect_ticks(self, mock_delay):
+		with patch.object(timers, "EFFECT_TIMERS", self.wheel), patch("base_systems.effects.base.EFFECT_TIMERS", self.wheel):
+			self.char1.effects.add(TickingEffect)
+			effect = self.char1.effects.get(TickingEffect)
+			self.assertEqual(effect.ticks, 1)
+			self.assertEqual(len(self.wheel), 1)
+			due = effect.last_tick + 2*effect.duration
+			with patch.object(self.char1.effects, "save", wraps=self.char1.effects.save) as mock_save, patch("time.time", return_value=due):
+				self.wheel.turn()
+			self.assertEqual(effect.ticks, 2)
+			# the tick's write happens once, at the end of the turn
+			mock_save.assert_called_once_with()
+			self.assertEqual(len(self.wheel), 1)
+
+
+@patch("base_systems.effects.timers.delay")
+class TestAreaEffect(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		# obj2 is inside a waterproof obj1, and char2 is inside an open char1
+		self.obj1.tags.add("water", category="protect_against")
+		self.obj2.location = self.obj1
+		self.char2.location = self.char1
+
+	def test_targets(self, mock_delay):
+		self.room1.effects.add(DrizzleEffect)
+		area = self.room1.effects.get(DrizzleEffect)
+		targets = area.get_targets()
+		self.assertIn(self.obj1, targets)
+		self.assertIn(self.char2, targets)
+		self.assertNotIn(self.obj2, targets)
+
+	def test_batched_pulse(self, mock_delay):
+		with patch.object(HANDLER_WRITES, "write_many", wraps=HANDLER_WRITES.write_many) as mock_write:
+			self.room1.effects.add(DrizzleEffect)
+			mock_write.assert_called_once()
+			self.assertEqual(self.char2.attributes.get("effects", category="systems")[0][1]["sources"], { self.room1: 1 })
+			area = self.room1.effects.get(DrizzleEffect)
+			# pulsing again changes nothing, so writes nothing
+			area.at_tick(None)
+			mock_write.assert_called_once()
+			# heavier weather tops the pulse up to match
+			area.sources[None] = 2
+			area.at_tick(None)
+			self.assertEqual(mock_write.call_count, 2)
+			self.assertEqual(self.char1.effects.get(SoakedEffect).stacks, 2)
+			self.assertEqual(self.char2.attributes.get("effects", category="systems")[0][1]["sources"], { self.room1: 2 })
+		self.assertIsNone(self.obj2.effects.get(SoakedEffect))
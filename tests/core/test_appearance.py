@@ -0,0 +1,74 @@
+from mock import patch
+from unittest import skip
+import time
+
+from base_systems.effects.base import Effect
+from core.ic import base
+from utils.testing import NexusTest
+
+
+class GlowingEffect(Effect):
+	name = "glowing"
+
+
+class AppearanceTest(NexusTest):
+	def setUp(self):
+		super().setUp()
+		self.room = self.create_room()
+		self.obj = self.create_object("thing")
+		self.obj.location = self.room
+		self.player = self.create_player()
+		self.player.location = self.room
+
+	def test_display_plan(self):
+		plan = base._display_plan(type(self.obj), "{name}\n{desc}\n{nonsense}")
+		self.assertEqual(plan, (("name", "get_display_name"), ("desc", "get_display_desc")))
+		self.assertIs(base._display_plan(type(self.obj), "{name}\n{desc}\n{nonsense}"), plan)
+
+	def test_unused_components(self):
+		with patch.object(type(self.obj), "get_display_exits") as mock_exits:
+			self.obj.return_appearance(self.player, template="{desc}")
+			mock_exits.assert_not_called()
+
+	def _rerenders(self, change):
+		"""whether a cached look of the room is rendered again after change"""
+		self.room.appearance_cache = True
+		self.room.return_appearance(self.player)
+		change()
+		with patch.object(type(self.room), "get_display_desc", return_value="") as mock_desc:
+			self.room.return_appearance(self.player)
+		return mock_desc.called
+
+	def test_appearance_cache(self):
+		self.assertFalse(self._rerenders(lambda: None))
+		# the room, its contents and the looker can all change what's seen
+		self.assertTrue(self._rerenders(lambda: setattr(self.room.db, "desc", "A bare room.")))
+		self.assertTrue(self._rerenders(lambda: self.room.tags.add("dark", category="status")))
+		self.assertTrue(self._rerenders(lambda: setattr(self.obj, "key", "widget")))
+		self.assertTrue(self._rerenders(lambda: self.obj.sdesc.reset()))
+		self.assertTrue(self._rerenders(lambda: setattr(self.obj.db, "pose", "leaning on the wall")))
+		self.assertTrue(self._rerenders(lambda: self.obj.effects.add(GlowingEffect)))
+		self.assertTrue(self._rerenders(lambda: self.player.recog.add(self.obj, "my widget")))
+		self.assertTrue(self._rerenders(lambda: setattr(self.create_object("gadget"), "location", self.room)))
+
+
+@skip("benchmark")
+class TestAppearanceSpeed(NexusTest):
+	def setUp(self):
+		super().setUp()
+		self.room = self.create_room()
+		self.player = self.create_player()
+		self.player.location = self.room
+		for i in range(10):
+			self.create_object(f"thing {i}").location = self.room
+
+	def test_look_speed(self):
+		start = time.time()
+		for _ in range(200):
+			self.room.return_appearance(self.player)
+		print(f"200 looks: {time.time()-start}")
+		self.room.appearance_cache = True
+		start = time.time()
+		for _ in range(200):
+			self.room.return_appearance(self.player)
+		print(f"200 cached looks: {time.time()-start}")
@@ -100,3 +100,44 @@ class BehaviorTest(EvenniaTest):
 	def test_merge_at_lower_priority(self):
 		pass
 
+
+	@patch('core.ic.behaviors.BEHAVIOR_REGISTRY', new=_DUMMY_REGISTRY)
+	def test_dispatch_tables(self):
+		self.obj1.behaviors.add("DummyOne")
+		action = self.obj1.do_myaction
+		# the bound callable is reused until the behaviors change
+		self.assertIs(self.obj1.do_myaction, action)
+		self.obj1.behaviors.add("DummyTwo")
+		self.assertIsNot(self.obj1.do_myaction, action)
+		self.assertEqual("action two on Obj", self.obj1.do_myaction())
+		# objects with the same behaviors share their composed tables
+		self.obj2.behaviors.add("DummyOne")
+		self.obj2.behaviors.add("DummyTwo")
+		self.obj1.behaviors.load()
+		self.obj2.behaviors.load()
+		self.assertIs(self.obj1.behaviors.behaviors['myaction'], self.obj2.behaviors.behaviors['myaction'])
+		# changing one doesn't touch the other
+		self.obj2.behaviors.remove("DummyTwo")
+		self.assertEqual("action two on Obj", self.obj1.do_myaction())
+		self.assertEqual("action one on Obj2", self.obj2.do_myaction())
+
+
+@skip("benchmark")
+class TestBehaviorSpeed(EvenniaTest):
+	@patch('core.ic.behaviors.BEHAVIOR_REGISTRY', new=_DUMMY_REGISTRY)
+	def test_call_overhead(self):
+		import time
+		self.obj1.behaviors.add("DummyOne")
+		self.obj1.react.on = MagicMock()
+		start = time.time()
+		for _ in range(100000):
+			self.obj1.do_myaction()
+		print(f"100k do_ calls: {time.time()-start}")
+		start = time.time()
+		for _ in range(100000):
+			self.obj1.on_myaction()
+		print(f"100k on_ calls: {time.time()-start}")
+		start = time.time()
+		for _ in range(1000):
+			self.obj1.behaviors.load()
+		print(f"1k loads: {time.time()-start}")
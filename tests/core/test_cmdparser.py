@@ -0,0 +1,110 @@
+import time
+import weakref
+from mock import patch
+from unittest import skip
+from evennia.commands.cmdset import CmdSet
+from evennia.utils.test_resources import EvenniaTest
+
+from core import cmdparser
+from core.commands import Command
+
+
+class CmdLook(Command):
+	key = "look"
+	aliases = ["l", "look-at"]
+
+class CmdLock(Command):
+	key = "lock"
+
+class CmdDesc(Command):
+	key = "@desc"
+	aliases = ["describe"]
+
+class CmdAdmin(Command):
+	key = "shutdown"
+	locks = "cmd:perm(Developer)"
+
+class CmdHold(Command):
+	key = "hold"
+	locks = "cmd:attr(hold_allowed)"
+
+class DummyCmdSet(CmdSet):
+	def at_cmdset_creation(self):
+		for cmd in (CmdLook, CmdLock, CmdDesc, CmdAdmin, CmdHold):
+			self.add(cmd)
+
+
+def _brute_force(raw_string, cmdset, include_prefixes):
+	"""the prefix matches create_match finds for every name in the cmdset"""
+	prefixes = cmdparser._CMD_IGNORE_PREFIXES
+	string = raw_string if include_prefixes or len(raw_string) < 2 else raw_string.lstrip(prefixes)
+	matches = []
+	for cmd in cmdset:
+		for raw_cmdname in [cmd.key] + cmd.aliases:
+			cmdname = raw_cmdname if include_prefixes or len(raw_cmdname) < 2 else raw_cmdname.lstrip(prefixes)
+			if cmdname and (match := cmdparser.create_match(cmdname, string, raw_cmdname, cmd)):
+				if match[4] and match[0].startswith(match[3]):
+					matches.append(match)
+	return matches
+
+
+class TestCommandIndex(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.cmdset = DummyCmdSet()
+
+	def test_matches(self):
+		for raw_string in ("l", "lo", "look", "loo here", "look-at box", "look at", "lock door",
+		                   "@desc me", "desc", "@des=foo", "describe", "shut", "xyz", "l-at"):
+			for include_prefixes in (False, True):
+				self.assertEqual(
+					cmdparser.build_matches(raw_string, self.cmdset, include_prefixes=include_prefixes),
+					_brute_force(raw_string, self.cmdset, include_prefixes),
+					msg=raw_string,
+				)
+
+	def test_index_reuse(self):
+		index = cmdparser.get_command_index(self.cmdset)
+		self.assertIs(cmdparser.get_command_index(self.cmdset), index)
+		# changing the cmdset rebuilds it
+		self.cmdset.remove(CmdLock)
+		self.assertIsNot(cmdparser.get_command_index(self.cmdset), index)
+
+	def test_cmdparser(self):
+		matches = cmdparser.cmdparser("lo here", self.cmdset, self.char1)
+		self.assertEqual(sorted(match[0] for match in matches), ["lock", "look", "look-at"])
+		self.assertEqual(cmdparser.cmdparser("look-at box", self.cmdset, self.char1)[0][0], "look-at")
+		# locked commands don't match
+		self.assertEqual(cmdparser.cmdparser("shutdown", self.cmdset, self.obj1), [])
+
+	def test_lock_cache(self):
+		cmdparser.cmdparser("look", self.cmdset, self.obj1)
+		with patch.object(CmdLook, "access") as mock_access:
+			cmdparser.cmdparser("look", self.cmdset, self.obj1)
+			mock_access.assert_not_called()
+			# new permissions mean checking again
+			self.obj1.permissions.add("Builder")
+			cmdparser.cmdparser("look", self.cmdset, self.obj1)
+			mock_access.assert_called_once()
+
+	def test_stateful_locks(self):
+		self.assertEqual(cmdparser.cmdparser("hold", self.cmdset, self.obj1), [])
+		self.obj1.db.hold_allowed = True
+		self.assertEqual(cmdparser.cmdparser("hold", self.cmdset, self.obj1)[0][0], "hold")
+
+	def test_lock_cache_refs(self):
+		index = cmdparser.get_command_index(self.cmdset)
+		cmdparser.cmdparser("look", self.cmdset, self.obj1)
+		self.assertIn(self.obj1, index.locks)
+		self.assertIsInstance(index.locks, weakref.WeakKeyDictionary)
+
+
+@skip("benchmark")
+class TestCmdParserSpeed(EvenniaTest):
+	def test_input_throughput(self):
+		cmdset = self.char1.cmdset.current
+		inputs = ["look", "l here", "get box", "inventory", "say hello there", "@desc me", "emote waves", "xyzzy"] * 250
+		start = time.time()
+		for raw_string in inputs:
+			cmdparser.cmdparser(raw_string, cmdset, self.char1)
+		print(f"{len(inputs)} inputs against {len(cmdset.commands)} commands: {time.time()-start}")
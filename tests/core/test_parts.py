@@ -1,7 +1,12 @@
 from mock import MagicMock, patch
 from unittest import skip
+import time
+from evennia import DefaultObject, create_object
 from evennia.utils.test_resources import EvenniaTest
 
+from base_systems.things.base import Thing
+from core.ic.parts import PARTS_INDEX, PartsCacher
+
 
 class PartsTest(EvenniaTest):
 	"""
@@ -22,6 +27,31 @@ class PartsTest(EvenniaTest):
 		self.assertIn(obj3, self.obj2.parts_cache.get())
 		self.assertIn(obj3, self.obj2.parts_cache.get(direct=True))
 
+	def test_parts_index(self):
+		obj3 = self.obj2.copy(new_key="Obj3")
+		self.obj1.parts.attach(self.obj2)
+		self.obj2.parts.attach(obj3)
+		self.assertIn(self.obj2.pk, PARTS_INDEX.children(self.obj1.pk))
+		self.assertIn(obj3.pk, PARTS_INDEX.children(self.obj2.pk))
+
+		# a fresh cache loads the same parts from a rebuilt index
+		PARTS_INDEX.build()
+		cache = PartsCacher(self.obj1)
+		self.assertIn(self.obj2, cache.get())
+		self.assertIn(obj3, cache.get())
+		self.assertNotIn(obj3, cache.get(direct=True))
+
+		# copies of attached objects are indexed as attached
+		obj4 = obj3.copy(new_key="Obj4")
+		self.assertIn(obj4.pk, PARTS_INDEX.children(self.obj2.pk))
+
+		# detaching and deleting clean up the index
+		self.obj1.parts.detach(self.obj2)
+		self.assertNotIn(self.obj2.pk, PARTS_INDEX.children(self.obj1.pk))
+		pk = self.obj2.pk
+		self.obj2.delete()
+		self.assertEqual(PARTS_INDEX.children(pk), [])
+
 	def test_attach_detach(self):
 		obj3 = self.obj2.copy(new_key="Obj3")
 
@@ -116,4 +146,96 @@ class PartsTest(EvenniaTest):
 		# tag search
 		result = self.obj1.parts.search("obj", part=True)
 		self.assertIn(obj3, result)
-		self.assertNotIn(self.obj2, result)
\ No newline at end of file
+		self.assertNotIn(self.obj2, result)
+
+	def test_part_type_index(self):
+		left = self.obj2.copy(new_key="left hand")
+		right = self.obj2.copy(new_key="right hand")
+		left.tags.batch_add(("hand", "part"), ("left", "subtype"))
+		right.tags.batch_add(("hand", "part"), ("right", "subtype"))
+		self.obj1.parts.attach(left)
+		self.assertEqual(self.obj1.parts.search("hand", part=True), [left])
+		# attaching after the index is built adds to it
+		self.obj1.parts.attach(right)
+		self.assertEqual(self.obj1.parts.search("hand", part=True), [left, right])
+		self.assertEqual(self.obj1.parts.search("hand", part=True, subtype="right"), [right])
+		self.assertEqual(self.obj1.parts.search("hand", part=True, subtype=["right", "left"]), [])
+		# lookups come from the index
+		with self.assertNumQueries(0):
+			self.obj1.parts.search("Hand", part=True, subtype="left")
+		# retagging an attached part updates the index of the base and the parent
+		finger = self.obj2.copy(new_key="finger")
+		self.obj1.parts.attach(finger, part=left)
+		self.assertEqual(left.parts.search("finger", part=True), [])
+		finger.tags.add("finger", category="part")
+		self.assertEqual(self.obj1.parts.search("finger", part=True), [finger])
+		self.assertEqual(left.parts.search("finger", part=True), [finger])
+		finger.tags.remove("finger", category="part")
+		self.assertEqual(self.obj1.parts.search("finger", part=True), [])
+		# detaching removes it
+		self.obj1.parts.detach(right)
+		self.assertEqual(self.obj1.parts.search("hand", part=True), [left])
+
+@skip
+class TestPartsSpeed(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.bases = []
+		for i in range(100):
+			base = create_object(Thing, key=f"Base{i}")
+			for j in range(5):
+				base.parts.attach(create_object(Thing, key=f"Part{i}-{j}"))
+			self.bases.append(base)
+		for i in range(500):
+			create_object(Thing, key=f"Object{i}")
+
+	def test_cold_start(self):
+		def full_scan(base):
+			everything = DefaultObject.objects.all_family()
+			direct = [obj for obj in everything if obj != base and obj.partof == base]
+			objects = [obj for obj in everything if obj != base and obj.baseobj == base]
+			return objects+direct, direct
+
+		print(f"Loading parts for {len(self.bases)} objects in a world of {DefaultObject.objects.all_family().count()}")
+		start = time.time()
+		for base in self.bases:
+			full_scan(base)
+		end = time.time()
+		print(f"Full scan: {round(end-start,5)}s")
+
+		start = time.time()
+		PARTS_INDEX.build()
+		for base in self.bases:
+			PartsCacher(base)
+		end = time.time()
+		print(f"Parts index: {round(end-start,5)}s")
+
+
+@skip("benchmark")
+class TestPartSearchSpeed(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		from systems.chargen import gen
+		self.obj1.archetype = None
+		self.obj1.tags.add('generating')
+		for _ in gen.init_bodyparts(self.obj1):
+			continue
+
+	def test_part_search(self):
+		terms = ("hand", "foot", "eye", "mouth", "finger", "cpu")
+		parts = self.obj1.parts.all()
+		print(f"Searching {len(parts)} parts for {len(terms)} part types 1000 times")
+		start = time.time()
+		for _ in range(1000):
+			for term in terms:
+				[ obj for obj in self.obj1.parts.all() if obj.tags.has(term, category='part') ]
+		end = time.time()
+		print(f"Tag scan: {round(end-start,5)}s")
+
+		self.obj1.parts_cache.init()
+		start = time.time()
+		for _ in range(1000):
+			for term in terms:
+				self.obj1.parts.search(term, part=True)
+		end = time.time()
+		print(f"Type index: {round(end-start,5)}s")
@@ -1,5 +1,4 @@
 from mock import patch, Mock
-from unittest import skip
 from evennia.utils.test_resources import EvenniaTest
 
 from systems.electronics.software import apps
@@ -9,9 +8,27 @@ class AppHandlerTest(EvenniaTest):
 		super().setUp()
 		self.handler = apps.AppHandler(self.char1)
 	
-	@skip
 	def test_save_apps(self):
-		pass
+		self.handler.install_app("NaviMate")
+		self.handler.install_app("Gallery")
+		self.assertTrue(self.char1.attributes.has("navimate", category="apps"))
+		self.assertTrue(self.char1.attributes.has("gallery", category="apps"))
+		# changing one app only rewrites that one
+		with patch.object(self.char1.attributes, "add") as mock_add:
+			self.handler.get("NaviMate").stop()
+		mock_add.assert_called_once()
+		self.assertEqual(mock_add.call_args.args[0], "NaviMate")
+		handler = apps.AppHandler(self.char1)
+		self.assertEqual(set(handler.app_data), {"NaviMate", "Gallery"})
+		self.handler.delete_app("Gallery")
+		self.assertFalse(self.char1.attributes.has("gallery", category="apps"))
+
+	def test_load_legacy_apps(self):
+		self.char1.attributes.add("app_data", {"NaviMate": {"active": False}}, category="software")
+		handler = apps.AppHandler(self.char1)
+		self.assertIn("NaviMate", handler.app_data)
+		self.assertFalse(self.char1.attributes.has("app_data", category="software"))
+		self.assertTrue(self.char1.attributes.has("navimate", category="apps"))
 
 	def test_install_app(self):
 		self.assertTrue(self.handler.install_app("NaviMate"))
@@ -0,0 +1,56 @@
+from evennia import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from systems.electronics.behaviors import device_topology, _check_if_usable
+from systems.electronics.things import Electronics
+
+
+class TestDeviceTopology(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.device = create_object(Electronics, key="phone", location=self.room1)
+		self.cpu = self._add_part("cpu")
+		self.psu = self._add_part("power_source")
+		self.psu.tags.add("powered on", category="status")
+
+	def _add_part(self, part):
+		obj = create_object(Electronics, key=part, location=self.room1)
+		obj.tags.add(part, category="part")
+		self.device.parts.attach(obj)
+		return obj
+
+	def test_components(self):
+		topology = device_topology(self.cpu)
+		self.assertIs(device_topology(self.device), topology)
+		self.assertEqual(topology.cpu, self.cpu)
+		self.assertEqual(topology.psu, self.psu)
+		self.assertIsNone(topology.screen)
+		# attaching a part rebuilds it
+		screen = self._add_part("display_screen")
+		topology = device_topology(self.device)
+		self.assertEqual(topology.screen, screen)
+		# and so does detaching one
+		self.device.parts.detach(screen)
+		self.assertIsNone(device_topology(self.device).screen)
+
+	def test_usable(self):
+		self.assertTrue(_check_if_usable(self.cpu))
+		self.cpu.tags.add("disabled", category="status")
+		self.assertFalse(_check_if_usable(self.cpu))
+		self.cpu.tags.remove("disabled", category="status")
+		self.assertTrue(_check_if_usable(self.cpu))
+		# turning off the power source turns off everything
+		self.psu.tags.remove("powered on", category="status")
+		self.assertFalse(_check_if_usable(self.cpu))
+		self.psu.tags.add("powered on", category="status")
+		self.assertTrue(_check_if_usable(self.cpu))
+		self.psu.tags.clear(category="status")
+		self.assertFalse(_check_if_usable(self.cpu))
+
+	def test_apps(self):
+		chip = create_object(Electronics, key="chip", location=self.room1)
+		self.assertIsNone(chip.apps)
+		# it can become a cpu after being checked
+		chip.tags.add("cpu", category="part")
+		self.assertIsNotNone(chip.apps)
+		self.assertIs(chip.apps, chip.apps)
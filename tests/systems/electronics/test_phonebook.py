@@ -0,0 +1,88 @@
+import time
+from mock import patch
+from unittest import skip
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+
+from systems.electronics.software import phonebook
+
+
+class PhoneBookTest(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.script = create.create_script(phonebook.PhoneBookScript)
+
+	def test_lookups(self):
+		number = self.script.assign_number(self.obj1)
+		self.assertEqual(len(number), 7)
+		self.assertTrue(self.script.add_record("5550123", self.obj1))
+		self.assertFalse(self.script.add_record("5550123", self.obj2))
+		self.assertEqual(self.script.get_by_number(5550123), self.obj1)
+		self.assertEqual(self.script.get_by_phone(self.obj1), number)
+		self.assertIsNone(self.script.get_by_phone(self.obj2))
+		self.assertFalse(self.script.del_record("5550123", self.obj2))
+		self.assertTrue(self.script.del_record(number, self.obj1))
+		self.assertEqual(self.script.get_by_phone(self.obj1), "5550123")
+
+	def test_persistence(self):
+		self.script.add_record("5550123", self.obj1)
+		self.script.add_record("5551123", self.obj2)
+		# only the changed shard is written
+		self.assertEqual(self.script.attributes.get("numbers_123", category="phonebook"), {"5550123": self.obj1.pk, "5551123": self.obj2.pk})
+		book = phonebook.PhoneBookIndex(self.script)
+		self.assertEqual(book.numbers_for(self.obj2.pk), ["5551123"])
+		self.assertEqual(book.used, [5550123, 5551123])
+
+	def test_legacy_numbers(self):
+		self.script.attributes.add("numbers", {"5550123": self.obj1})
+		book = phonebook.PhoneBookIndex(self.script)
+		self.assertEqual(book.get("5550123"), self.obj1.pk)
+		self.assertFalse(self.script.attributes.has("numbers"))
+		self.assertTrue(self.script.attributes.has("numbers_123", category="phonebook"))
+
+	def test_free_number(self):
+		book = self.script.book
+		for number in range(1000000, 1000005):
+			book.add(str(number), self.obj1.pk, save=False)
+		with patch("systems.electronics.software.phonebook.randrange", return_value=0):
+			self.assertEqual(book.free_number(), "1000005")
+		book.remove("1000002", save=False)
+		with patch("systems.electronics.software.phonebook.randrange", return_value=0):
+			self.assertEqual(book.free_number(), "1000002")
+		with patch("systems.electronics.software.phonebook.randrange", return_value=1):
+			self.assertEqual(book.free_number(), "1000005")
+
+	def test_clear_dead_lines(self):
+		self.script.add_record("5550123", self.obj1)
+		self.script.add_record("5550124", self.obj2)
+		self.obj2.delete()
+		self.script.clear_dead_lines()
+		self.assertIn("5550123", self.script.book)
+		self.assertNotIn("5550124", self.script.book)
+		self.assertFalse(self.script.attributes.has("numbers_124", category="phonebook"))
+
+
+@skip("benchmark")
+class TestPhoneBookSpeed(EvenniaTest):
+	def test_100k_numbers(self):
+		script = create.create_script(phonebook.PhoneBookScript)
+		book = script.book
+		start = time.time()
+		for i in range(100000):
+			book.add(book.free_number(), self.obj1.pk if i % 2 else self.obj2.pk, save=False)
+		for key in book.shards:
+			book.save(key)
+		print(f"100k numbers assigned and saved: {time.time()-start}")
+		start = time.time()
+		book = phonebook.PhoneBookIndex(script)
+		print(f"100k numbers loaded: {time.time()-start}")
+		numbers = list(book.owners)[:1000]
+		start = time.time()
+		for number in numbers:
+			script.get_by_number(number)
+			script.get_by_phone(self.obj1)
+		print(f"1000 lookups each way: {time.time()-start}")
+		start = time.time()
+		for _ in range(1000):
+			script.assign_number(self.obj1)
+		print(f"1000 saved assignments: {time.time()-start}")
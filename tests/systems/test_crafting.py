@@ -17,6 +17,7 @@ from utils.colors import strip_ansi
 from utils.testing import NexusTest, NexusCommandTest, undelay
 from utils.timing import delay_iter
 from systems.crafting import commands, tool_prototypes, actions, automate
+from systems.crafting.index import MaterialIndex
 from data.recipes.clothing import CLOTHING_SLEEVE_SHORT, CLOTHING_TUNIC_BASE
 
 
@@ -141,6 +142,39 @@ class TestAutoCrafting(NexusTest):
 		self.assertEqual(desc, "A red linen tunic, with two short sleeves.")
 	
 
+class TestMaterialIndex(NexusTest):
+	def setUp(self):
+		super().setUp()
+		self.objs = [ self.create_object(f"piece {i}") for i in range(4) ]
+		self.objs[0].tags.add("clothing_tunic_base", category="recipe_key")
+		self.objs[1].tags.add("fabric", category="craft_material")
+		self.objs[1].tags.add("left", category="subtypes")
+		self.objs[2].tags.add("FABRIC", category="recipe_key")
+		self.objs[3].tags.add("fabric", category="craft_material")
+		self.objs[3].tags.add("right", category="subtypes")
+
+	def test_find(self):
+		index = MaterialIndex(self.objs)
+		self.assertEqual(list(index.find("fabric", "recipe_key", "craft_material")), self.objs[1:])
+		self.assertEqual(index.first("fabric", "craft_material", require=[("right", "subtypes")]), self.objs[3])
+		self.assertTrue(index.has(self.objs[0], "CLOTHING_TUNIC_BASE", "recipe_key"))
+		self.assertTrue(index.has(self.objs[1], category="subtypes"))
+		self.assertEqual(index.tags(self.objs[3], "subtypes"), ["right"])
+
+	def test_use(self):
+		index = MaterialIndex(self.objs)
+		index.use(self.objs[1])
+		self.assertEqual(index.first("fabric", "craft_material"), self.objs[3])
+		self.assertEqual(len(index), 3)
+		# selections share the fetched tags
+		subset = index.select(self.objs[2:])
+		self.assertEqual(list(subset.find("fabric", "recipe_key", "craft_material")), self.objs[2:])
+
+	def test_single_query(self):
+		with self.assertNumQueries(1):
+			MaterialIndex(self.objs)
+
+
 @patch('base_systems.actions.queue.delay', new=undelay)
 class TestCraftingAction(NexusTest):
 	def setUp(self):
@@ -432,4 +466,24 @@ class TestDrawing(NexusCommandTest):
 		pass
 
 	def test_draw_menu(self):
-		pass
\ No newline at end of file
+		pass
+
+
+@unittest.skip("benchmark")
+class TestCraftingSpeed(NexusTest):
+	def test_bulk_assembly(self):
+		stockroom = []
+		for i in range(1000):
+			if i < 100:
+				recipe = CLOTHING_TUNIC_BASE | { "tags": [("clothing_tunic_base", "recipe_key")] }
+			elif i < 300:
+				recipe = CLOTHING_SLEEVE_SHORT | { "tags": [("clothing_sleeve_short", "recipe_key")] }
+			else:
+				recipe = THREAD
+			stockroom += spawn(recipe | {"key": f"piece {i}"}, restart=False)
+		recipe = dict(ASSEMBLY) | { "adds": ["CLOTHING_SLEEVE_SHORT", "CLOTHING_SLEEVE_SHORT"], "quantity": 100 }
+		with patch.object(type(stockroom[0]), "generate_desc"), patch.object(type(stockroom[0]), "at_crafted"):
+			start = time.time()
+			automate.assemble(recipe, stockroom)
+			print(f"100 items assembled from a 1000 item stockroom: {time.time()-start}")
+		self.assertEqual(len(stockroom), 800)
@@ -1,10 +1,15 @@
-from unittest import skip
+from unittest import skip, TestCase
+from unittest.mock import patch
+import re
 import time
 from evennia.utils.test_resources import EvenniaTest
 from evennia import create_object
 
 from base_systems.things.base import Thing
 from base_systems.characters.base import Character
+from base_systems.characters.players import PlayerCharacter
+from core.ic import emotes
+from core.ic.emotes import NameIndex, ic_search, process_emote
 
 @skip
 class TestEmoteSpeed(EvenniaTest):
@@ -30,4 +35,116 @@ class TestEmoteSpeed(EvenniaTest):
 			self.char1.emote("frowns sternly")
 		end = time.time()
 		print(f"Average execution time: {round((end-start)/100,5)}s")
-		
+
+
+@skip
+class TestEmoteRenderSpeed(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.receivers = [ create_object(Character, key=f"Character{i}") for i in range(50) ]
+		self.refs = self.receivers[:5]
+
+	def _emote(self):
+		obj_mapping = { f"#{obj.id}": obj for obj in self.refs }
+		emote = " ".join(f"{{#{obj.id}}}" for obj in self.refs)
+		process_emote(self.char1, self.receivers, emote, obj_mapping, {})
+
+	def test_emote_receivers(self):
+		print(f"Emoting to {len(self.receivers)} receivers with {len(self.refs)} refs 100 times")
+		start = time.time()
+		for _ in range(100):
+			self._emote()
+		end = time.time()
+		print(f"Average execution time: {round((end-start)/100,5)}s")
+
+
+class TestEmoteRenderCache(EvenniaTest):
+	def test_shared_render(self):
+		watchers = [ create_object(PlayerCharacter, key=f"watcher{i}", location=self.room1) for i in range(3) ]
+		watchers[0].recog.add(self.char1, "Bob")
+		obj_mapping = { f"#{self.char1.id}": self.char1 }
+		with patch.object(Character, "get_display_name", autospec=True, side_effect=Character.get_display_name) as mock_name:
+			with patch.object(PlayerCharacter, "msg", autospec=True) as mock_msg:
+				process_emote(self.char1, watchers, f"{{#{self.char1.id}}} waves.", obj_mapping, {})
+		# the watcher with a recog, and the other two watchers
+		self.assertEqual(mock_name.call_count, 2)
+		seen = { call.args[0]: call.kwargs['text'][0] for call in mock_msg.call_args_list }
+		self.assertEqual(len(seen), 3)
+		self.assertIn("Bob", seen[watchers[0]])
+		self.assertNotIn("Bob", seen[watchers[1]])
+		self.assertEqual(seen[watchers[1]], seen[watchers[2]])
+
+
+class TestSendMany(EvenniaTest):
+	def test_batch(self):
+		here = create_object(PlayerCharacter, key="here", location=self.room1)
+		there = create_object(PlayerCharacter, key="there", location=self.room2)
+		batch = [ ("leaves.", [here]), ("arrives.", [there]), ("leaves.", [there]), ("vanishes.", []) ]
+		with patch.object(emotes, "parse_sdesc_markers", wraps=emotes.parse_sdesc_markers) as mock_parse:
+			with patch.object(PlayerCharacter, "msg", autospec=True) as mock_msg:
+				emotes.send_many(self.char1, batch)
+		# each distinct message is parsed once, against every receiver
+		self.assertEqual(mock_parse.call_count, 2)
+		self.assertEqual(mock_parse.call_args.args[1], [here, there])
+		seen = [ (call.args[0], call.kwargs['text'][0]) for call in mock_msg.call_args_list ]
+		self.assertEqual([ receiver for receiver, _ in seen ], [here, there, there])
+		self.assertTrue(seen[1][1].endswith("arrives."))
+
+
+class TestNameIndex(TestCase):
+	names = [
+		"tall man", "short woman", "tall-ish guard with a spear", "tallman",
+		"nice colliding sdesc-guy for tests", "red apple", "apple core", "Mr Receiver",
+	]
+
+	def _regex_match(self, words):
+		"""the original per-call regex matching, for comparison"""
+		rquery = r''
+		best = []
+		count = 0
+		for word in words:
+			rquery += r"(\b" + re.escape(word) + "|" + re.escape(word) + r"\b).*"
+			matches = [ name for name in self.names if re.search(rquery, name, re.IGNORECASE) ]
+			if not matches:
+				break
+			best = matches
+			count += 1
+		return sorted(best), count
+
+	def test_match(self):
+		index = NameIndex([ (name, name) for name in self.names ])
+		queries = [
+			["tall"], ["man"], ["tall", "man"], ["tall", "guard"], ["guard", "tall"], ["ish"],
+			["apple"], ["red", "core"], ["sdesc", "guy"], ["mr"], ["receiver"], ["xyz"],
+			["tall", "xyz"], ["all"], ["an"], ["ple", "co"], ["man", "man"],
+		]
+		for words in queries:
+			matches, count = index.match(words)
+			self.assertEqual( (sorted(name for _, name in matches), count), self._regex_match(words), words )
+
+	def test_exact(self):
+		index = NameIndex([ (name, name) for name in self.names ])
+		self.assertEqual(index.exact["mr receiver"], {"Mr Receiver"})
+
+
+class TestNameIndexCache(EvenniaTest):
+	def test_search_invalidation(self):
+		candidates = [self.obj1, self.obj2]
+		self.obj1.key = "shiny lamp"
+		self.assertEqual(ic_search(self.char1, candidates, "lamp"), [self.obj1])
+		# renaming updates the sdesc, which drops the cached index
+		self.obj1.key = "dull lamp"
+		self.assertEqual(ic_search(self.char1, candidates, "shiny"), [])
+		self.assertEqual(ic_search(self.char1, candidates, "dull"), [self.obj1])
+		# arrivals get a fresh candidate set
+		obj3 = create_object(Thing, key="shiny lamp", location=self.room1)
+		self.assertEqual(ic_search(self.char1, candidates + [obj3], "shiny"), [obj3])
+
+	def test_alias_invalidation(self):
+		candidates = [self.obj1, self.obj2]
+		self.assertEqual(ic_search(self.char1, candidates, "bauble"), [])
+		# aliases are part of the cached index
+		self.obj1.aliases.add("bauble")
+		self.assertEqual(ic_search(self.char1, candidates, "bauble"), [self.obj1])
+		self.obj1.aliases.remove("bauble")
+		self.assertEqual(ic_search(self.char1, candidates, "bauble"), [])
@@ -0,0 +1,41 @@
+from evennia.utils.test_resources import EvenniaTest
+
+from db.models import Scene, SceneLine
+
+
+class TestSceneLines(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.scene = Scene.objects.create(self.account, '')
+		for i in range(5):
+			self.scene.add_line(f"line {i}", self.char1)
+
+	def test_add_line(self):
+		self.assertEqual(len(self.scene.lines), 5)
+		self.scene.lines.add(["line 5", "line 6"])
+		self.assertEqual(self.scene.lines.all(), [f"line {i}" for i in range(7)])
+		self.assertEqual(self.scene.lines.get(-1), "line 6")
+		self.assertIn(self.char1, self.scene.writers)
+		with self.assertRaises(IndexError):
+			self.scene.lines.get(7)
+
+	def test_find(self):
+		self.scene.add_line("LINE 1 again", self.char1)
+		self.assertEqual(self.scene.lines.find("line 1"), 5)
+		self.assertEqual(self.scene.lines.find("line 3"), 3)
+		self.assertIsNone(self.scene.lines.find("nothing"))
+
+	def test_crop(self):
+		self.scene.lines.crop(1, 3)
+		self.assertEqual(self.scene.lines.all(), ["line 0", "line 3", "line 4"])
+		self.assertEqual(self.scene.lines.get(1), "line 3")
+		with self.assertRaises(ValueError):
+			self.scene.lines.crop(2, 1)
+		self.scene.lines.add("line 5")
+		self.assertEqual(self.scene.lines.all(), ["line 0", "line 3", "line 4", "line 5"])
+
+	def test_retcon_from(self):
+		self.assertTrue(self.scene.retcon_from("line 3"))
+		self.assertEqual(self.scene.lines.all(), ["line 0", "line 1", "line 2"])
+		self.assertFalse(self.scene.retcon_from("line 3"))
+		self.assertEqual(SceneLine.objects.filter(db_scene=self.scene).count(), 3)
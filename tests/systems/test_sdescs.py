@@ -205,3 +205,26 @@ class TestRPSystem(EvenniaTest):
 		self.speaker.msg = lambda text, **kwargs: setattr(self, "out0", text)
 		self.assertEqual(self.speaker.search("receiver of emotes"), self.receiver1)
 		self.assertEqual(self.speaker.search("colliding"), self.receiver2)
+
+
+class TestSdescCache(EvenniaTest):
+	def test_cached_get(self):
+		self.obj1.features.add('build', format="{persona}", persona='person')
+		self.obj1.sdesc.add(['build persona'])
+		self.assertEqual(self.obj1.sdesc.get(), "person")
+		hits = sdescs.CACHE_STATS["hits"]
+		self.assertEqual(self.obj1.sdesc.get(strip=True), "person")
+		self.assertEqual(sdescs.CACHE_STATS["hits"], hits+1)
+
+	def test_invalidation(self):
+		self.obj1.features.add('build', format="{persona}", persona='person')
+		self.obj1.sdesc.add(['build persona'])
+		self.assertEqual(self.obj1.sdesc.get(), "person")
+		# changing features resets the sdesc
+		self.obj1.features.set('build', persona='robot')
+		misses = sdescs.CACHE_STATS["misses"]
+		self.assertEqual(self.obj1.sdesc.get(), "robot")
+		self.assertEqual(sdescs.CACHE_STATS["misses"], misses+1)
+		# so does renaming an object without an sdesc list
+		self.obj2.key = "widget"
+		self.assertEqual(self.obj2.sdesc.get(), "widget")
@@ -0,0 +1,56 @@
+from mock import patch
+from evennia.utils.test_resources import EvenniaTest
+
+from utils import handlers
+
+
+class DummyHandler(handlers.HandlerBase):
+	write_behind = True
+
+	def __init__(self, obj):
+		super().__init__(obj, "dummy", default_data={})
+
+	def set(self, key, value):
+		self._data[key] = value
+		self._save()
+
+
+@patch("utils.handlers._WRITE_BEHIND", True)
+@patch("utils.handlers.delay")
+class TestWriteBehind(EvenniaTest):
+	def setUp(self):
+		super().setUp()
+		self.writer = handlers.HandlerWriter()
+		patcher = patch("utils.handlers.HANDLER_WRITES", self.writer)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.handler = DummyHandler(self.obj1)
+
+	def test_batched_writes(self, mock_delay):
+		self.handler.set("a", 1)
+		self.handler.set("b", 2)
+		self.handler.set("c", 3)
+		mock_delay.assert_called_once_with(0, self.writer.flush)
+		self.assertIsNone(self.obj1.attributes.get("dummy", category="systems"))
+		self.assertEqual(self.writer.counts(), { "pending": 1, "writes": 0, "avoided": 2 })
+		self.writer.flush()
+		self.assertEqual(self.obj1.attributes.get("dummy", category="systems"), {"a": 1, "b": 2, "c": 3})
+		self.assertEqual(self.writer.counts(), { "pending": 0, "writes": 1, "avoided": 2 })
+
+	def test_load_flushes(self, mock_delay):
+		self.handler.set("a", 1)
+		# a fresh handler sees the pending data
+		self.assertEqual(DummyHandler(self.obj1)._data, {"a": 1})
+		self.assertEqual(len(self.writer), 0)
+
+	def test_deleted_object(self, mock_delay):
+		self.handler.set("a", 1)
+		self.obj1.delete()
+		self.writer.flush()
+		self.assertEqual(self.writer.writes, 0)
+
+	def test_opt_out(self, mock_delay):
+		with patch("utils.handlers._WRITE_BEHIND", False):
+			self.handler.set("a", 1)
+		mock_delay.assert_not_called()
+		self.assertEqual(self.obj1.attributes.get("dummy", category="systems"), {"a": 1})
@@ -0,0 +1,46 @@
+from mock import patch
+from evennia.server.models import ServerConfig
+from evennia.utils.test_resources import EvenniaTest
+
+from utils import startup
+from tests.base_systems.test_effects import TickingEffect
+
+
+@patch("base_systems.effects.timers.delay")
+class TestStartup(EvenniaTest):
+	def test_mark_startup(self, mock_delay):
+		startup.mark_startup(self.obj1, "effects")
+		startup.mark_startup(self.obj1, "actions")
+		startup.mark_startup(self.obj2, "actions")
+		self.assertEqual(list(startup.startup_objects()), [self.obj1, self.obj2])
+		self.assertEqual(list(startup.startup_objects("effects")), [self.obj1])
+		# a matching tag outside the startup category doesn't count
+		self.obj2.tags.add("effects", category="other")
+		self.obj2.aliases.add("effects")
+		self.assertEqual(list(startup.startup_objects("effects")), [self.obj1])
+		startup.mark_startup(self.obj1, "effects", False)
+		self.assertFalse(self.obj1.tags.has("effects", category="startup"))
+
+	def test_ticking_effects(self, mock_delay):
+		self.obj1.effects.add(TickingEffect)
+		self.assertIn(self.obj1, startup.startup_objects("effects"))
+		self.obj1.effects.remove(TickingEffect, stacks="all")
+		self.assertNotIn(self.obj1, startup.startup_objects("effects"))
+
+	def test_start_objects(self, mock_delay):
+		ServerConfig.objects.conf("startup_indexed", delete=True)
+		with patch.object(type(self.obj1), "at_server_start") as mock_start:
+			# the first start checks everything
+			self.assertGreater(startup.start_objects(), 2)
+			mock_start.reset_mock()
+			startup.mark_startup(self.obj1, "effects")
+			self.assertEqual(startup.start_objects(), 1)
+			mock_start.assert_called_once()
+
+	def test_run_phases(self, mock_delay):
+		with patch("utils.startup.logger") as mock_logger:
+			timings = startup.run_phases("startup", (("one", lambda: 3), ("two", lambda: None)))
+		self.assertEqual(set(timings), {"one", "two", "total"})
+		message = mock_logger.log_info.call_args.args[0]
+		self.assertIn("one: ", message)
+		self.assertIn("(3)", message)
@@ -66,4 +66,79 @@ class TestColorUtils(EvenniaTest):
 		message = "Testing |bcolors|n, |lclook|ltcommands|le, |205xterm|n and |#123456hex|n."
 		output = colors.ev_to_html(message)
 		expected = 'Testing <span style="color: var(--blue1);">colors</span>, <span class="mxplink" data-command="look">commands</span>, <span style="color: #6919e1;">xterm</span> and <span style="color: #123456;">hex</span>.'
-		self.assertEqual(output, expected)
\ No newline at end of file
+		self.assertEqual(output, expected)
+	@parameterized.expand(
+		[
+			("A |rred|n |[Bthing|n", "A red thing"),
+			("|#ff0000hex|n and |[#00ff00bg|n", "hex and bg"),
+			("|123xterm |[=bgrey|n", "xterm grey"),
+			("|tbs|lclook box|lta |rbox|n|le|tbe", "a box"),
+			("|luhttps://example.com|ltsite|le", "https://example.com"),
+			("one|/two|-three|_four", "one\r\ntwo\tthree four"),
+			("||r is {{literal}} & <fine>", "|r is {literal}} & <fine>"),
+		]
+	)
+	def test_strip_ansi(self, message, expected):
+		self.assertEqual(colors.strip_ansi(message), expected)
+		# long strings bypass the cache, but strip the same
+		self.assertEqual(colors.strip_ansi(message*20), expected*20)
+
+	def test_ev_to_html_markup(self):
+		message = "a < b |tbs|lclook \"x\"|lt|[=athe x|n|le|||tbe"
+		expected = 'a &lt; b <pre><span class="mxplink" data-command="look \\&quot;x\\&quot;"><span style="background-color: #080808">the x</span></span>&#124;</pre>'
+		self.assertEqual(colors.ev_to_html(message), expected)
+
+	def test_get_name_from_rgb(self):
+		self.assertEqual(colors.get_name_from_rgb((176, 191, 26)), "acid")
+		self.assertEqual(colors.get_name_from_rgb((178, 190, 27)), "acid")
+		self.assertEqual(colors.get_name_from_rgb((176, 191, 26), styled=True), "|#b0bf1aacid|n")
+		self.assertIsNone(colors.get_name_from_rgb((0, 0, 0)))
+		self.assertEqual(
+			colors.get_names_from_rgb([(176, 191, 26), (0, 0, 0), (124, 185, 232)]),
+			["acid", None, "aero"]
+		)
+
+	def test_get_names_from_rgb(self):
+		import random
+		rng = random.Random(4)
+		rgbs = [ tuple(rng.randint(0, 255) for _ in range(3)) for _ in range(500) ]
+		# repeats and near neighbours share their lookups
+		rgbs += rgbs[:50] + [ (r, g, min(b+1, 255)) for r, g, b in rgbs[:50] ]
+		self.assertEqual(colors.get_names_from_rgb(rgbs), [ colors.get_name_from_rgb(rgb) for rgb in rgbs ])
+		# and match a scan of every color
+		for rgb in rgbs[:100]:
+			dist, _, key = min(
+				(max(abs(a-b) for a, b in zip(comp, rgb)), i, comp) for i, comp in enumerate(colors.COLOR_DATA)
+			)
+			self.assertEqual(colors.get_name_from_rgb(rgb), colors.COLOR_DATA[key] if dist < sum(rgb) else None)
+		self.assertEqual(
+			colors.get_names_from_rgb(rgbs[:20], styled=True),
+			[ colors.get_name_from_rgb(rgb, styled=True) for rgb in rgbs[:20] ]
+		)
+
+
+@unittest.skip("benchmark")
+class TestColorSpeed(EvenniaTest):
+	def test_color_name_speed(self):
+		import random
+		rgbs = [ tuple(random.randint(0, 255) for _ in range(3)) for _ in range(10000) ]
+		start = time.time()
+		colors.get_names_from_rgb(rgbs)
+		print(f"10k color names: {time.time()-start}")
+
+	def test_strip_speed(self):
+		names = [ f"a |#{i:06x}colored|n |lclook thing {i}|ltthing|le" for i in range(100) ]
+		start = time.time()
+		for _ in range(100):
+			for name in names:
+				colors.strip_ansi(name)
+		print(f"10k short strips: {time.time()-start}")
+		desc = " ".join(names)
+		start = time.time()
+		for _ in range(1000):
+			colors.strip_ansi(desc)
+		print(f"1k long strips: {time.time()-start}")
+		start = time.time()
+		for _ in range(1000):
+			colors.ev_to_html(desc)
+		print(f"1k html conversions: {time.time()-start}")
@@ -2,6 +2,7 @@
 #from evennia.utils import logger
 
 import re
+from functools import lru_cache
 from html import escape as html_escape
 from math import ceil
 
@@ -11,16 +12,36 @@ from data.colors import COLOR_DATA
 
 _RE_HEX = re.compile(r'\|#([0-9a-f]{6})', re.I)
 _RE_HEX_BG = re.compile(r'\|\[#([0-9a-f]{6})', re.I)
-_RE_XTERM = re.compile(r'\|([0-5][0-5][0-5]|\=[a-z])')
-_RE_XTERM_BG = re.compile(r'\|\[([0-5][0-5][0-5]|\=[a-z])')
+_RE_HEX_TAG = re.compile(r'\|(\[?)#([0-9a-f]{6})', re.I)
+_RE_XTERM_TAG = re.compile(r'\|(\[?)([0-5][0-5][0-5]|\=[a-z])')
 _GREYS = "abcdefghijklmnopqrstuvwxyz"
 # "ansi" styles and hex
 _RE_STYLES = re.compile(r'\|\[?([rRgGbBcCyYwWxXmMu\*\>\_n]|#[0-9a-f]{6})')
 
-_RE_MXPLINK = re.compile(r"\|lc(.*?)\|lt(.*?)\|le", re.DOTALL)
-_RE_MXPURL = re.compile(r"\|lu(.*?)\|lt(.*?)\|le", re.DOTALL)
 _RE_LINE = re.compile(r'^(-+|_+)$', re.MULTILINE)
 
+# every piece of markup the game uses, so each output format is one pass over the string.
+# the lookahead lets the regex engine skip straight to the characters a token can start with.
+_RE_MARKUP = re.compile(
+	r"(?=[|{&<>\033])(?:"
+	r"(?P<pipe>\|\|)"
+	r"|(?P<brace>\{\{)"
+	r"|(?P<table>\|tb[se])"
+	r"|(?P<link>\|l(?P<linktype>[cu])(?P<target>.*?)\|lt(?P<text>.*?)\|le)"
+	r"|(?P<hex>\|\[?#(?:[0-9a-fA-F]{6}|[0-9a-fA-F]{3}))"
+	r"|(?P<xterm>\|(?P<bg>\[?)(?P<code>[0-5]{3}|=[a-z]))"
+	r"|(?P<space>\|[/\-_>])"
+	r"|(?P<ansi>\|(?:[nu*^UiIsSrgybmcwxRGYBMCWXhH]|![RGYBMCWX]|\[[RGYBMCWXrgybmcwx]))"
+	r"|(?P<raw>\033\[[0-9;]+m)"
+	r"|(?P<html>[&<>])"
+	r")",
+	re.DOTALL
+)
+_STRIP_SPACES = { "|/": "\r\n", "|-": "\t", "|_": " ", "|>": " "*4 }
+_HTML_CHARS = { "&": "&amp;", "<": "&lt;", ">": "&gt;" }
+# strings up to this long are cached when stripped; they're mostly names and sdescs
+_STRIP_CACHE_LENGTH = 80
+
 _INDENT = 4
 
 _ANSI_COLOR_MAP = {
@@ -37,11 +58,34 @@ _ANSI_COLOR_MAP = {
 # strip all format flags including hex ones
 
 def strip_ansi(message):
-	message = message.replace("|tbs","").replace("|tbe","")
-	message = core_strip_ansi(message)
-	message = _RE_HEX.sub("", message)
-	message = _RE_HEX_BG.sub("", message)
-	return message
+	if hasattr(message, "_raw_string"):
+		# already-parsed ANSIString
+		message = core_strip_ansi(message.replace("|tbs","").replace("|tbe",""))
+		return _RE_HEX_BG.sub("", _RE_HEX.sub("", message))
+	if len(message) <= _STRIP_CACHE_LENGTH:
+		return _strip_cached(message)
+	return _strip(message)
+
+def _strip_token(match):
+	match match.lastgroup:
+		case "pipe":
+			return "|"
+		case "brace":
+			return "{"
+		case "link":
+			# commands keep their text, urls keep the url
+			return _strip(match.group("text") if match.group("linktype") == "c" else match.group("target"))
+		case "space":
+			return _STRIP_SPACES[match.group()]
+		case "html":
+			return match.group()
+		case _:
+			return ""
+
+def _strip(message):
+	return _RE_MARKUP.sub(_strip_token, message)
+
+_strip_cached = lru_cache(maxsize=4096)(_strip)
 
 # translate hex tags to XTERM tags
 def hex_to_xterm(message):
@@ -54,81 +98,28 @@ def hex_to_xterm(message):
 	Returns:
 		str: the text with converted tags
 	"""
-	def split_hex(text):
-		return ( int(text[i:i+2],16) for i in range(0,6,2) )
-		
-	def grey_int(num):
-		return round( max((num-8),0)/10 )
-
-	def hue_int(num):
-		return round(max((num-45),0)/40)
-	
-	
-	for match in reversed(list(_RE_HEX.finditer(message))):
-		start, end = match.span()
-		tag = match.group(1)
-		r, g, b = split_hex(tag)
-
-		if r == g and g == b:
-			# greyscale
-			i = grey_int(r)
-			message = message[:start] + "|=" + _GREYS[i] + message[end:]
-		
-		else:
-			xtag = "|{}{}{}".format( hue_int(r), hue_int(g), hue_int(b) )
-			message = message[:start] + xtag + message[end:]
-
-	for match in reversed(list(_RE_HEX_BG.finditer(message))):
-		start, end = match.span()
-		tag = match.group(1)
-		r, g, b = split_hex(tag)
-
-		if r == g and g == b:
-			# greyscale
-			i = grey_int(r)
-			message = message[:start] + "|[=" + _GREYS[i] + message[end:]
-		
-		else:
-			xtag = "|[{}{}{}".format( hue_int(r), hue_int(g), hue_int(b) )
-			message = message[:start] + xtag + message[end:]
+	return _RE_HEX_TAG.sub(_hex_tag_to_xterm, message)
 
-	return message
+def _hex_tag_to_xterm(match):
+	bg, tag = match.groups()
+	r, g, b = ( int(tag[i:i+2],16) for i in range(0,6,2) )
+	if r == g and g == b:
+		# greyscale
+		return f"|{bg}={_GREYS[round( max((r-8),0)/10 )]}"
+	return "|{}{}{}{}".format( bg, *( round(max((num-45),0)/40) for num in (r, g, b) ) )
 
 def xterm_to_hex(message):
+	return _RE_XTERM_TAG.sub(_xterm_tag_to_hex, message)
 
-	def hue_hex(text):
-		return format( int(text)*40+25 ,'02x')
-	
-	def grey_hex(text):
-		return format( _GREYS.index(text)*10+8 ,'02x')
-	
-	for match in reversed(list(_RE_XTERM.finditer(message))):
-		start, end = match.span()
-		tag = match.group(1)
-		if tag[0] == '=':
-			# greyscale
-			hex = grey_hex(tag[1])
-			message = message[:start] + "|#" + hex*3 + message[end:]
-
-		else:
-			r, g, b = tag
-			htag = "|#{}{}{}".format( hue_hex(r), hue_hex(g), hue_hex(b) )
-			message = message[:start] + htag + message[end:]
-
-	for match in reversed(list(_RE_XTERM_BG.finditer(message))):
-		start, end = match.span()
-		tag = match.group(1)
-		if tag[0] == '=':
-			# greyscale
-			hex = grey_hex(tag[1])
-			message = message[:start] + "|[#" + hex*3 + message[end:]
-
-		else:
-			r, g, b = tag
-			htag = "|[#{}{}{}".format( hue_hex(r), hue_hex(g), hue_hex(b) )
-			message = message[:start] + htag + message[end:]
+def _xterm_tag_to_hex(match):
+	bg, tag = match.groups()
+	return f"|{bg}#{_xterm_hex(tag)}"
 
-	return message
+def _xterm_hex(tag):
+	if tag[0] == '=':
+		# greyscale
+		return format( _GREYS.index(tag[1])*10+8 ,'02x') * 3
+	return "".join( format( int(c)*40+25 ,'02x') for c in tag )
 
 def rgb_to_hex(rgb):
 	"""
@@ -160,31 +151,7 @@ def ev_to_html(message):
 		text (str): Processed text.
 	"""
 
-	def sub_mxp_links(match):
-		"""
-		Helper method to be passed to re.sub,
-		replaces MXP links with HTML code.
-		"""
-		cmd, text = [grp.replace('"', "\\&quot;") for grp in match.groups()]
-		val = rf'<span class="mxplink" data-command="{cmd}">{text}</span>'
-		return val
-
-	def sub_mxp_urls(match):
-		"""
-		Helper method to be passed to re.sub,
-		replaces MXP links with HTML code.
-		"""
-		url, text = [grp.replace('"', "\\&quot;") for grp in match.groups()]
-		val = rf'<a href="{url}" target="_blank">{text}</a>'
-		return val	
-
-	message = message.replace('&', '&amp;').replace('<','&lt;').replace('>','&gt;')
-	message = _RE_MXPLINK.sub(sub_mxp_links, message)
-	message = _RE_MXPURL.sub(sub_mxp_urls, message)
-	message = message.replace("|tbs", "<pre>").replace("|tbe", "</pre>")
-	message = xterm_to_hex(message)
-	# escape escaped pipes
-	message = message.replace("||","&#124;").replace("|/","\n")
+	message = _html_markup(message)
 	# replace ---- with hr element
 	message = _RE_LINE.sub("<hr/>",message)
 	message = message.replace("<hr/>\n","<hr/>")
@@ -293,6 +260,37 @@ def ev_to_html(message):
 
 	return "".join(output)
 
+def _html_token(match):
+	match match.lastgroup:
+		case "html":
+			return _HTML_CHARS[match.group()]
+		case "pipe":
+			# escaped pipes
+			return "&#124;"
+		case "link":
+			target, text = [ _html_markup(grp).replace('"', "\\&quot;") for grp in match.group("target", "text") ]
+			if match.group("linktype") == "c":
+				return rf'<span class="mxplink" data-command="{target}">{text}</span>'
+			return rf'<a href="{target}" target="_blank">{text}</a>'
+		case "table":
+			return "<pre>" if match.group() == "|tbs" else "</pre>"
+		case "xterm":
+			return f"|{match.group('bg')}#{_xterm_hex(match.group('code'))}"
+		case "space":
+			match match.group():
+				case "|/":
+					return "\n"
+				case "|>":
+					return "|&gt;"
+	# everything else is styling, handled by ev_to_html
+	return match.group()
+
+def _html_markup(message):
+	"""
+	Escapes html and converts links, tables, line breaks and xterm colors, leaving the styling tags.
+	"""
+	return _RE_MARKUP.sub(_html_token, message)
+
 def add_colors(rgbA, rgbB):
 	# adds one color to another already-colored thing
 	pigmentA = (255-rgbA[0], 255-rgbA[1], 255-rgbA[2])
@@ -315,17 +313,62 @@ def blend_colors(rgbA, rgbB, numfirst=1, numsecond=1):
 	
 	return (255-cyan, 255-mag, 255-yel)
 
-def get_name_from_rgb(rgb, styled=False):
-	key = None
-	diff = sum(rgb)
-	for comp in COLOR_DATA.keys():
-		diffs = ( abs(comp[i]-rgb[i]) for i in range(3) )
-		max_diff = max(diffs)
-		if max_diff < diff:
-			key = comp
-			diff = max_diff
-	
-	if result := COLOR_DATA.get(key, None):
+# COLOR_DATA bucketed into a coarse grid over the RGB cube, for nearest-color lookups
+_GRID_CELL = 32
+_GRID_MAX = 255 // _GRID_CELL
+
+def _build_color_grid():
+	grid = {}
+	for i, rgb in enumerate(COLOR_DATA):
+		grid.setdefault(tuple(c // _GRID_CELL for c in rgb), []).append( (i, rgb) )
+	return grid
+
+_COLOR_GRID = _build_color_grid()
+# the cell offsets at each Chebyshev distance from a cell
+_RING_OFFSETS = []
+
+def _ring_offsets(k):
+	while len(_RING_OFFSETS) <= k:
+		n = len(_RING_OFFSETS)
+		span = range(-n, n+1)
+		_RING_OFFSETS.append([ (x, y, z) for x in span for y in span for z in span if max(abs(x), abs(y), abs(z)) == n ])
+	return _RING_OFFSETS[k]
+
+def _nearest_in_cell(cell, rgbs):
+	"""
+	Finds the nearest COLOR_DATA entries for triples which all fall in one grid cell,
+	scanning each ring of cells around it once for all of them.
+
+	Returns:
+		list: a (distance, index, key) tuple for each triple in rgbs
+	"""
+	best = [None] * len(rgbs)
+	for k in range(max(max(c, _GRID_MAX-c) for c in cell) + 1):
+		for dx, dy, dz in _ring_offsets(k):
+			for i, comp in _COLOR_GRID.get( (cell[0]+dx, cell[1]+dy, cell[2]+dz), () ):
+				for j, rgb in enumerate(rgbs):
+					dist = max(abs(comp[0]-rgb[0]), abs(comp[1]-rgb[1]), abs(comp[2]-rgb[2]))
+					if not best[j] or (dist, i) < best[j][:2]:
+						best[j] = (dist, i, comp)
+		# everything in the next ring is more than k cells away
+		if all(b and b[0] <= k * _GRID_CELL for b in best):
+			break
+	return best
+
+def _color_cell(rgb):
+	return tuple(int(c) // _GRID_CELL for c in rgb)
+
+@lru_cache(maxsize=4096)
+def _nearest_color(rgb):
+	"""
+	Returns (distance, key) for the COLOR_DATA key nearest to rgb by Chebyshev distance,
+	with ties going to the earlier key.
+	"""
+	dist, _, key = _nearest_in_cell(_color_cell(rgb), [rgb])[0]
+	return dist, key
+
+def _color_name(rgb, dist, key, styled):
+	if dist < sum(rgb) and (result := COLOR_DATA.get(key, None)):
 		if styled:
 			hex = rgb_to_hex(rgb)
 			return f"|{hex}{result}|n"
@@ -333,3 +376,25 @@ def get_name_from_rgb(rgb, styled=False):
 			return result
 	# no match
 	return None
+
+def get_name_from_rgb(rgb, styled=False):
+	rgb = tuple(rgb)
+	return _color_name(rgb, *_nearest_color(rgb), styled)
+
+def get_names_from_rgb(rgb_list, styled=False):
+	"""
+	Names every RGB triple in rgb_list at once. Repeated triples are only
+	looked up once, and triples in the same part of the color space share
+	a single scan of the colors around them.
+
+	Returns:
+		list: the name (or None) for each triple, in order
+	"""
+	by_cell = {}
+	for rgb in dict.fromkeys(tuple(rgb) for rgb in rgb_list):
+		by_cell.setdefault(_color_cell(rgb), []).append(rgb)
+	names = {}
+	for cell, rgbs in by_cell.items():
+		for rgb, (dist, _, key) in zip(rgbs, _nearest_in_cell(cell, rgbs)):
+			names[rgb] = _color_name(rgb, dist, key, styled)
+	return [ names[tuple(rgb)] for rgb in rgb_list ]
@@ -1,8 +1,103 @@
-from evennia.utils import logger
-from evennia.utils.dbserialize import deserialize
+from django.conf import settings
+from django.db import transaction
+from evennia.typeclasses.attributes import Attribute
+from evennia.utils import logger, delay
+from evennia.utils.dbserialize import deserialize, to_pickle
 from copy import copy
 
+from core.ic.appearance import touch_appearance
+
+# turns write-behind off for every handler, e.g. for tests
+_WRITE_BEHIND = getattr(settings, "HANDLER_WRITE_BEHIND", True)
+
+
+class HandlerWriter:
+	"""
+	Collects the saves of write-behind handlers and writes them out together,
+	once per reactor turn, in a single transaction.
+
+	A pending write is always flushed before anything reloads the same attribute,
+	and everything is flushed when the server stops.
+	"""
+	def __init__(self):
+		self._pending = {}
+		self._task = None
+		self.writes = 0
+		self.avoided = 0
+
+	def __len__(self):
+		return len(self._pending)
+
+	def counts(self):
+		"""
+		Returns:
+			dict: the number of pending, flushed and avoided attribute writes
+		"""
+		return { "pending": len(self), "writes": self.writes, "avoided": self.avoided }
+
+	def defer(self, handler):
+		key = handler._write_key()
+		if key in self._pending:
+			self.avoided += 1
+		self._pending[key] = handler
+		if not self._task:
+			self._task = delay(0, self.flush)
+
+	def flush_one(self, key):
+		"""
+		Writes out the pending save for key, if there is one.
+		"""
+		if handler := self._pending.pop(key, None):
+			self._write(handler)
+
+	def flush(self):
+		"""
+		Writes out every pending save.
+		"""
+		self._task = None
+		pending, self._pending = self._pending, {}
+		if not pending:
+			return
+		with transaction.atomic():
+			for handler in pending.values():
+				self._write(handler)
+
+	def write_many(self, handlers):
+		"""
+		Writes out the data of several handlers together, updating their existing
+		attributes with a single bulk query.
+		"""
+		updates = []
+		with transaction.atomic():
+			for handler in handlers:
+				# this supersedes any pending write
+				self._pending.pop(handler._write_key(), None)
+				if not handler.obj.pk:
+					continue
+				if attr := handler.obj.attributes.get(handler._db_attr, category=handler._db_cat, return_obj=True):
+					attr.db_value = to_pickle(handler._data)
+					updates.append(attr)
+					self.writes += 1
+				else:
+					# new attributes go through the usual path
+					self._write(handler)
+			if updates:
+				Attribute.objects.bulk_update(updates, ["db_value"])
+
+	def _write(self, handler):
+		if not handler.obj.pk:
+			# deleted while the write was pending
+			return
+		handler._write()
+		self.writes += 1
+
+HANDLER_WRITES = HandlerWriter()
+
+
 class HandlerBase:
+	# set to True to batch this handler's saves through HANDLER_WRITES
+	write_behind = False
+
 	def __init__(self, obj, db_attr, db_cat='systems', default_data={}):
 		self.obj = obj
 		self._db_attr = db_attr
@@ -10,13 +105,29 @@ class HandlerBase:
 		self._data = copy(default_data)
 		self._load()
 
+	def _write_key(self):
+		# holding the pending handler keeps obj alive, so its id can't be reused
+		return (id(self.obj), self._db_attr, self._db_cat)
+
 	def _load(self):
+		# don't read the attribute out from under a pending write
+		HANDLER_WRITES.flush_one(self._write_key())
 		if data := self.obj.attributes.get(self._db_attr, category=self._db_cat):
 			self._data = deserialize(data)
 
 	def _save(self):
+		# a deferred write is still a change to how the object looks
+		touch_appearance(self.obj)
+		if self.write_behind and _WRITE_BEHIND:
+			HANDLER_WRITES.defer(self)
+		else:
+			self._write()
+
+	def _write(self):
 		try:
-			self.obj.attributes.add(self._db_attr, self._data, category=self._db_cat)
+			# a savepoint, so a failed write doesn't break the rest of a batch
+			with transaction.atomic():
+				self.obj.attributes.add(self._db_attr, self._data, category=self._db_cat)
 		except Exception as e:
 			logger.log_err(f"Could not save handler data for {type(self)} on {self.obj} (#{self.obj.pk})! Cached data may be corrupt; reloading from database.")
 			logger.log_err(f"Cached data was: {self._data}")
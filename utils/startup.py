@@ -0,0 +1,95 @@
+"""
+Tracks which objects have work to resume when the server starts, so that startup
+only loads those and everything else warms up on first access.
+
+Objects are marked with a tag in the "startup" category, keyed by the kind of
+work: ticking effects, queued actions, pending recovery, etc.
+"""
+import time
+from evennia.objects.models import ObjectDB
+from evennia.server.models import ServerConfig
+from evennia.utils import logger
+
+_STARTUP_CAT = "startup"
+# set once every object has been checked for startup work
+_INDEXED_KEY = "startup_indexed"
+
+
+def mark_startup(obj, reason, needed=True):
+	"""
+	Records whether obj has startup work of the given kind.
+
+	Only changes the tag when the state changes, so it's cheap to call on every save.
+	"""
+	if not obj.pk:
+		return
+	has = obj.tags.has(reason, category=_STARTUP_CAT)
+	if needed and not has:
+		obj.tags.add(reason, category=_STARTUP_CAT)
+	elif has and not needed:
+		obj.tags.remove(reason, category=_STARTUP_CAT)
+
+def startup_objects(reason=None):
+	"""
+	Returns the objects with startup work, optionally of only one kind.
+	"""
+	# the tag conditions have to go in one filter call, so they all apply to the same tag
+	conditions = { "db_tags__db_category": _STARTUP_CAT, "db_tags__db_tagtype__isnull": True }
+	if reason:
+		conditions["db_tags__db_key"] = reason
+	return ObjectDB.objects.filter(**conditions).distinct()
+
+def start_objects():
+	"""
+	Runs the startup hook of every object with startup work.
+
+	The first time this runs, every object is started and checked, so objects saved
+	before the startup tags existed get marked.
+
+	Returns:
+		int: the number of objects started
+	"""
+	if ServerConfig.objects.conf(_INDEXED_KEY):
+		objects = startup_objects()
+	else:
+		objects = ObjectDB.objects.all()
+	count = 0
+	for obj in objects:
+		if not hasattr(obj, "at_server_start"):
+			continue
+		try:
+			# objects re-check their own startup work here
+			obj.at_server_start()
+		except Exception:
+			logger.log_trace(f"Startup failed for {obj} (#{obj.pk})")
+		count += 1
+	ServerConfig.objects.conf(_INDEXED_KEY, True)
+	return count
+
+def run_phases(label, phases):
+	"""
+	Runs each phase in order, logging how long each took.
+
+	Args:
+		label (str): what the phases make up, for the log
+		phases (iterable of tuples): (name, callable) pairs. A phase returning
+			an int has it reported as the number of items it handled.
+
+	Returns:
+		dict: the seconds taken by each phase, keyed by name, with a "total"
+	"""
+	timings = {}
+	report = []
+	start = time.time()
+	for name, func in phases:
+		phase_start = time.time()
+		try:
+			result = func()
+		except Exception:
+			logger.log_trace(f"{label} phase '{name}' failed")
+			result = None
+		timings[name] = elapsed = time.time() - phase_start
+		report.append(f"{name}: {elapsed:.3f}s" + (f" ({result})" if type(result) is int else ""))
+	timings["total"] = time.time() - start
+	logger.log_info(f"{label.capitalize()} took {timings['total']:.3f}s - {', '.join(report)}")
+	return timings